@@ -77,6 +77,24 @@ CAUTION:
     Don't assign values with null-terminator characters ('\x00') to strings in EnhancedStructs, as they will not be
     handled well. They will truncate and may mess up the entire parsing.
 
+Strings and chars are encoded with cp1252 by default. Each field can choose its own encoding, or be raw - holding the
+bytes themselves, without encoding or decoding them. Unpacked raw strings keep their inner null bytes, and only their
+null padding is trimmed.
+Strings with few distinct values (device names, status codes, etc.)
+can be interned, so unpacked structs share the same string objects rather than decoding a copy each.
+
+EXAMPLE:
+    >>> class Device(Struct):
+    ...     _endianess = Endianess.LittleEndian
+    ...     name = FieldType.String[16](encoding='utf-8')
+    ...     model = FieldType.String[8](intern=True)
+    ...     serial = FieldType.String[8](raw=True)
+    ...     magic = FieldType.Char[4](raw=True)
+
+    >>> d = Device(name='caf\xe9', model='X1', serial=b'\x01\x02', magic=b'DEV1')
+
+NOTE: Decoding can be deferred until a string is accessed by unpacking with Struct.view()
+
 Arrays
 ------
 You can specify constant-length array fields. They support len() and other attributes as with other fields.
@@ -152,6 +170,49 @@ EXAMPLE:
 
 NOTE: You cannot change the base class's endianess. Doing so will cause undefined behavior
 
+Slots
+-----
+Setting _slots = True makes the struct store its fields in __slots__ instead of a per-instance __dict__. This cuts the
+memory of each instance, and speeds up accessing its fields. The option is inherited by derived classes.
+
+EXAMPLE:
+    >>> class CompactPoint(Struct):
+    ...     _endianess = Endianess.LittleEndian
+    ...     _slots = True
+    ...     x = FieldType.WORD
+    ...     y = FieldType.WORD
+
+    >>> assert not hasattr(CompactPoint(x=1, y=2), '__dict__')
+    >>> assert CompactPoint.x.max == 65535      # Fields are still accessible through the class
+
+NOTE: Instances of slotted structs can't be assigned attributes other than their fields
+
+Validation
+----------
+By default, every value assigned to a field is validated at once. The _validation field changes when this happens:
+ 1. Validation.Eager - Values are validated when they are assigned (the default).
+ 2. Validation.AtPack - Values are validated all at once, by pack() and pack_into().
+ 3. Validation.Trusted - Values are never validated.
+Struct.validate() validates all fields explicitly, in any mode.
+
+EXAMPLE:
+    >>> class TrustedPoint(Struct):
+    ...     _endianess = Endianess.LittleEndian
+    ...     _validation = Validation.AtPack
+    ...     x = FieldType.WORD
+    ...     y = FieldType.WORD
+
+    >>> p = TrustedPoint(x=-1, y=2)     # Doesn't raise
+    >>> p.pack()                        # Raises ValueError
+
+The unpacking methods also accept a validation argument, overriding the class' mode for the unpacked values. Values
+unpacked by the struct module are valid by construction, so Validation.Trusted skips validating them altogether.
+
+EXAMPLE:
+    >>> p = Point.unpack(b'\x01\x00\x02\x00', validation=Validation.Trusted)
+
+NOTE: Embedded structs are unpacked with the validation mode of their own class
+
 Custom Read
 -----------
 The Struct.unpack() method supports several types of input streams:
@@ -172,6 +233,162 @@ EXAMPLE:
 SpecialSocket.read() will be called several times, with different amounts each time. However, the target and param
 arguments will always be the same ones passed to unpack()
 
+Binary file objects (anything with a readinto() method, such as open(path, 'rb') or io.BytesIO) are read using
+readinto() with a single reusable buffer, rather than allocating a new buffer for every read.
+Struct.iter_file() iterates over structs packed back-to-back in a file, up to its end. The file is read in large blocks
+into one buffer, so memory usage stays flat regardless of the file size.
+
+EXAMPLE:
+    >>> with open('points.bin', 'rb') as f:
+    ...     first = Point.unpack(f)
+    ...     rest = list(Point.iter_file(f))
+
+A callable is called once per run of fields, so a long struct may cost many small reads. BufferedCallableStream requests
+large blocks from the callable instead, and serves reads from an internal buffer. Bytes left over after unpacking a
+struct are kept for the next unpack() given the same stream, and tail() takes them back.
+
+EXAMPLE:
+    >>> stream = BufferedCallableStream(sock.recv, block_size=65536)
+    >>> first = Point.unpack(stream)
+    >>> second = Point.unpack(stream)     # Probably served from the buffer, without calling sock.recv()
+    >>> rest = stream.tail()
+
+NOTE: The callable may return fewer bytes than requested, as sock.recv() does, and must return b'' at the end
+
+Unpacking From Buffers
+----------------------
+Struct.unpack_from() unpacks a struct from any object supporting the buffer protocol (bytes, bytearray, memoryview,
+mmap, array.array, etc.) at a given offset, without copying it. It returns the struct and the amount of bytes consumed.
+
+EXAMPLE:
+    >>> buff = bytearray(b'\xff\x01\x00\x02\x00')
+    >>> p, size = Point.unpack_from(buff, 1)
+    >>> assert p.x == 1 and p.y == 2 and size == 4
+
+Struct.pack_into() is the converse - it packs a struct directly into a writable buffer (bytearray, memoryview, mmap,
+etc.) at a given offset, and returns the offset right after it.
+
+EXAMPLE:
+    >>> buff = bytearray(8)
+    >>> offset = Point(x=1, y=2).pack_into(buff)
+    >>> offset = Point(x=3, y=4).pack_into(buff, offset)
+    >>> assert buff == b'\x01\x00\x02\x00\x03\x00\x04\x00' and offset == 8
+
+Struct.pack_many() packs many structs back-to-back into a single bytearray, preallocated to their total length. Calling
+it on Struct itself packs structs of different classes.
+
+EXAMPLE:
+    >>> assert Point.pack_many([Point(x=1, y=2), Point(x=3, y=4)]) == buff
+    >>> packets = Struct.pack_many([Point(x=1, y=2), Buffered(length=2, data=b'AB')])
+
+Fixed-length structs packed back-to-back can be unpacked in bulk, using Struct.iter_unpack() over a whole buffer, or
+Struct.unpack_many() for a given amount of structs at the start of a buffer.
+
+EXAMPLE:
+    >>> points = list(Point.iter_unpack(b'\x01\x00\x02\x00\x03\x00\x04\x00'))
+    >>> assert points == Point.unpack_many(b'\x01\x00\x02\x00\x03\x00\x04\x00\xff', 2)
+
+Struct.unpack_columns() unpacks such a buffer into per-field columns, without creating a struct per record. Numeric
+fields become array.array columns, other fields become lists, and embedded structs become nested dicts of columns.
+
+EXAMPLE:
+    >>> columns = Point.unpack_columns(b'\x01\x00\x02\x00\x03\x00\x04\x00')
+    >>> assert columns == {'x': array.array('H', [1, 3]), 'y': array.array('H', [2, 4])}
+
+RecordFile gives random access to a file of fixed-length structs packed back-to-back, by memory-mapping it. It supports
+len(), indexing, slicing and iteration, and reads and unpacks only the records accessed. It can be closed at any time,
+even while iterating over it. Views of its records can't be accessed once it's closed, but zero-copy buffers of
+unpacked records remain valid.
+
+EXAMPLE:
+    >>> with RecordFile(Point, 'points.bin') as points:
+    ...     last = points[-1]
+    ...     some = points[1000000:1000010]
+
+IndexedRecordFile does the same for files of variable-length structs. It finds the record offsets in one pass over the
+file, reading only the length and selector fields, and persists them to an index sidecar file (the file path suffixed
+with '.idx'). Later opens, and refresh() on an open file, scan only records appended since the file was last indexed.
+The sidecar holds a checksum of the start and end of the indexed part of the file. If it doesn't match the file (as
+when the file was rewritten), or the sidecar is corrupt, the file is indexed again from the start.
+
+EXAMPLE:
+    >>> with IndexedRecordFile(Buffered, 'buffers.bin') as buffers:
+    ...     last = buffers[-1]
+
+Struct.parallel_unpack_file() unpacks a large file of structs using a pool of worker processes. The file is split into
+chunks on struct boundaries (found by scanning the length and selector fields, for variable-length structs), and the
+structs are returned by their order in the file - as a list, or with stream=True, as an iterator.
+
+EXAMPLE:
+    >>> packets = Buffered.parallel_unpack_file('capture.bin', workers=32)
+
+NOTE: The struct class is sent to the workers by reference, so it must be defined at a module level
+
+NumPy
+-----
+If NumPy is installed, fixed-length structs can be mapped to equivalent NumPy structured dtypes, and buffers of
+back-to-back structs can be viewed as NumPy arrays without copying them. NumPy is optional - stru doesn't require it.
+
+EXAMPLE:
+    >>> assert Point.numpy_dtype() == numpy.dtype([('x', '<u2'), ('y', '<u2')])
+    >>> points = Point.unpack_array(b'\x01\x00\x02\x00\x03\x00\x04\x00')
+    >>> assert points['x'].sum() == 4
+    >>> assert Point.from_numpy(points) == [Point(x=1, y=2), Point(x=3, y=4)]
+    >>> columns = Point.unpack_columns(b'\x01\x00\x02\x00\x03\x00\x04\x00', use_numpy=True)
+
+Pad bytes are left out of the dtype fields, but they are accounted for in the fields offsets.
+
+Views
+-----
+Struct.view() creates a lazy, read-only view of a struct packed in a buffer. A field is unpacked only when it is
+accessed, and its value is cached from then on. Offsets of fields are computed from the class layout, so reaching a
+field unpacks only the length and selector fields that precede it. Embedded structs are viewed lazily as well.
+
+EXAMPLE:
+    >>> view = Buffered.view(b'\x00\x02AB')
+    >>> assert view.length == 2 and len(view) == 4
+    >>> assert view.to_struct() == Buffered(length=2, data=b'AB')
+
+Fields can also be accessed by name, as view['length']. Fields named like attributes of the view itself (to_struct,
+offset_of or struct_class) are only reached this way.
+
+Struct.unpack() can decode only selected fields, along with the length and selector fields they depend on. The other
+fields are left None. Unpacking from a buffer reads the selected fields through a view, so skipped fields are neither
+decoded nor copied. Unpacking from a stream reads the entire struct, skipping over fixed-length fields, buffers and
+unions of fixed-length options without decoding them.
+
+EXAMPLE:
+    >>> b = Buffered.unpack(b'\x00\x02AB', fields=['length'])
+    >>> assert b.length == 2 and b.data is None
+
+Struct.scan() filters a buffer of structs packed back-to-back, evaluating the predicate on the fields it references
+alone. Primitive fields at fixed offsets are read directly, and other fields through a view. Only matching structs are
+unpacked, or viewed with views=True. The predicate is either a dict of {field name: value}, or a callable taking a view.
+
+EXAMPLE:
+    >>> readings = list(Reading.scan(day_of_telemetry, {'device_id': 17}))
+    >>> hot = list(Reading.scan(day_of_telemetry, lambda view: view.celsius > 40, views=True))
+
+Layout
+------
+Struct.layout() gives the layout of a class, computed once when the class is created: a tuple of
+FieldLayout(name, field, offset, size, format) by field order. Offsets are exact up to the first variable-length field,
+and fields following it have a RelativeOffset(field_name, delta) - delta bytes after the end of that field.
+Variable-length fields have no size, and only primitive fields have a struct module format.
+
+EXAMPLE:
+    >>> class Record(Struct):
+    ...     _endianess = Endianess.LittleEndian
+    ...     kind = FieldType.BYTE
+    ...     length = FieldType.WORD
+    ...     data = FieldType.Buffer(length)
+    ...     crc = FieldType.DWORD
+
+    >>> kind, length, data, crc = Record.layout()
+    >>> assert (length.offset, length.size, length.format) == (1, 2, '<H')
+    >>> assert struct.unpack_from(length.format, raw, length.offset) == (2,)
+    >>> assert data.size is None and crc.offset == RelativeOffset('data', 0)
+
 Unions
 ------
 You can define a union field - the field will be one of many options, depending on another field.
@@ -208,20 +425,53 @@ EXAMPLE:
     >>> assert Buffered.unpack('\x00\x02AB').data == b.data
     >>> assert len(b) == 4
 
+Buffers are packed as given, without copying them. With zero_copy=True, unpacking from a buffer (unpack_from(), view(),
+iter_unpack(), etc.) gives a memoryview of it instead of a copy. Unpacking from a stream always copies.
+
+EXAMPLE:
+    >>> class Message(Struct):
+    ...     _endianess = Endianess.BigEndian
+    ...     length = FieldType.DWORD
+    ...     payload = FieldType.Buffer(length, zero_copy=True)
+
+    >>> m, size = Message.unpack_from(huge_bytearray)
+    >>> assert isinstance(m.payload, memoryview)
+
+NOTE: A memoryview keeps the buffer it views alive, and a bytearray can't be resized while it's viewed
+
 Deferred Unpacking
 ------------------
-EnhancedStructs support unpacking from an asynchronous source.
+EnhancedStructs support unpacking from an asynchronous source, using Struct.unpack_async().
+It accepts an asyncio.StreamReader, or any coroutine function (along with parameters to pass it, as with unpack()).
+Consecutive primitive fields are read together, so a stream is awaited once per run of them, and once more for each
+buffer, union or other non-primitive field.
 
 EXAMPLE:
+    >>> reader, writer = await asyncio.open_connection('127.0.0.1', 4000)
+    >>> p = await Point.unpack_async(reader)
+
     >>> class SpecialAsyncSocket(object):
-    ...     @coroutine
-    ...     def read(self, amount_bytes, target, param):
+    ...     async def read(self, amount_bytes, target, param):
     ...         # Do something
     ...         pass
 
     >>> special_socket = SpecialAsyncSocket()
-    >>> s = yield Point.unpack_async(special_socket.read, '127.0.0.1', 4000)
+    >>> s = await Point.unpack_async(special_socket.read, '127.0.0.1', 4000)
+
 
+Incremental Decoding
+--------------------
+StructDecoder decodes a stream of structs packed back-to-back from arbitrary chunks of bytes, without performing any IO
+itself. Each call to feed() returns the structs completed by the given chunk. A struct split between chunks is resumed
+where it stopped, including in the middle of buffers and unions, so it can be plugged into any event loop.
+When a struct is invalid, the bytes of it that were read are dropped, and decoding resumes right after them. The
+structs completed before it in the same chunk are returned, and its exception is raised by the next feed() or close().
+
+EXAMPLE:
+    >>> decoder = StructDecoder(Buffered)
+    >>> assert decoder.feed(b'\x00\x02A') == []
+    >>> assert decoder.feed(b'B\x00') == [Buffered(length=2, data=b'AB')]
+    >>> decoder.close()     # Raises struct.error, as the next struct is incomplete
 
 Dynamic Length
 --------------
@@ -238,6 +488,10 @@ EnhancedStructs support dynamic length calculation:
     >>> m = MyStruct(selector=1, data=2)
     >>> assert len(m) == 8  # Now we know the union's length, so we can tell the struct's length
 
+The length of fixed-length classes is computed once, when the class is created. The length of a struct whose
+variable-length fields are buffers and unions of fixed-length options is cached, until its length or selector fields are
+assigned. The length of other structs (such as ones embedding variable-length structs) is computed on each call.
+
 Thread-Safety
 -------------
 Struct is entirely thread-safe, EXCEPT for the creation of classes and their fields.
@@ -280,13 +534,19 @@ Notes
 -----
 * Inheriting Struct causes the addition of several class-level fields. Pay attention not to override them
   with your own fields. The added fields are:
-    _endianess, _fields, _defaults
+    _endianess, _slots, _validation, _fields, _fields_by_name, _qualified_names, _defaults, _runs, _layout,
+    _length, _length_dependencies, _cached_length
+* Consecutive primitive fields are packed and unpacked together, using a single precompiled struct.Struct
 * Pascal strings are not supported
 """
 from stru.field import (UnsupportedOperationException, DependencyNotInClassException,
                         DependencyInvalidValueException, DependencyNoneException)
 from stru.field_type import FieldType
-from stru.enhanced_struct import Endianess
+from stru.enhanced_struct import Endianess, Validation
 from stru.stru_struct import Struct
+from stru.struct_view import FieldLayout, RelativeOffset
+from stru.decoder import StructDecoder
+from stru.unpack_stream import BufferedCallableStream
+from stru.record_file import RecordFile, IndexedRecordFile
 
 __all__ = ['field', 'field_type', 'enhanced_struct']
@@ -0,0 +1,422 @@
+"""
+Generation of specialized __init__(), pack(), pack_into(), unpack() and unpack_from() methods for Struct classes.
+
+Much like dataclasses, the source of each method is generated once per class. The field names, the dependencies of
+buffers and unions, and the precompiled struct.Struct objects of the class are all resolved at class creation, and
+bound as locals of the generated functions. This spares the generic per-field loop, and its dispatch through
+Field.pack() and Field.unpack(), on every call.
+
+A generated method only fits the class it was generated for. When it's reached for a derived class, through super() in
+an explicit override of the derived class, it falls back to the generic implementation of the root Struct class.
+"""
+import struct
+
+from stru.enhanced_struct import Validation
+from stru.field.field import PrimitiveField, EmbeddedStructField, UnionField, BufferField, ArrayField
+from stru.field_run import PrimitiveRun
+from stru import partial
+from stru.unpack_stream import UnpackStream
+
+GENERATED_MARKER = '__stru_generated__'
+
+
+def generate_methods(cls):
+    """
+    Generate and set __init__(), pack(), pack_into(), unpack() and unpack_from() of a Struct class.
+    Methods that the class (or one of its bases) explicitly defines are left untouched.
+    :param cls: The Struct class, after its fields and runs are set
+    """
+    if _is_replaceable(cls, '__init__'):
+        cls.__init__ = _make_init(cls)
+    if _is_replaceable(cls, 'pack'):
+        cls.pack = _make_pack(cls)
+    if _is_replaceable(cls, 'pack_into'):
+        # A class with an explicit pack() has its pack_into() copy what it packs, rather than bypass it
+        cls.pack_into = _make_pack_into(cls) if _is_replaceable(cls, 'pack') else _make_pack_into_from_pack(cls)
+    if _is_replaceable(cls, 'unpack'):
+        cls.unpack = classmethod(_make_unpack(cls))
+    if _is_replaceable(cls, 'unpack_from'):
+        cls.unpack_from = classmethod(_make_unpack_from(cls))
+
+
+def _generic_method(cls, name):
+    """
+    Get the generic implementation of a method, from the root Struct class
+    """
+    for klass in reversed(cls.__mro__):
+        if hasattr(klass, '_runs'):
+            attr = vars(klass)[name]
+            return getattr(attr, '__func__', attr)
+
+
+def _dispatch_lines(cls, namespace, name, instance, call):
+    """
+    The lines falling back to the generic implementation of a method, when it's called for a derived class
+    :param cls: The Struct class the method is generated for
+    :param namespace: The function namespace, to add locals to
+    :param name: The method name
+    :param instance: The expression of the class the method is called for
+    :param call: The arguments to call the generic implementation with
+    """
+    namespace['__stru_cls'] = cls
+    namespace['__stru_generic'] = _generic_method(cls, name)
+    return ['if {} is not __stru_cls:'.format(instance),
+            '    return __stru_generic({})'.format(call)]
+
+
+# noinspection PyProtectedMember
+# Accessing cls._fields
+def has_explicit_pack(cls):
+    """
+    Check whether packing a Struct class goes through an explicit pack(), defined by the class (or one of its bases) or
+    by a struct embedded in it. Such structs may not pack to the length told by their fields.
+    """
+    return not _is_replaceable(cls, 'pack') or any(_embeds_explicit_pack(field_obj) for field_obj in cls._fields.keys())
+
+
+def _embeds_explicit_pack(field_obj):
+    if isinstance(field_obj, EmbeddedStructField):
+        return has_explicit_pack(field_obj.base)
+    if isinstance(field_obj, UnionField):
+        return any(_embeds_explicit_pack(option) for option in field_obj.options.values())
+    if isinstance(field_obj, ArrayField):
+        return _embeds_explicit_pack(field_obj.base)
+    return False
+
+
+def _is_replaceable(cls, name):
+    """
+    Check whether a method is either generated, or the generic implementation of the root Struct class
+    """
+    for klass in cls.__mro__:
+        if name in vars(klass):
+            attr = vars(klass)[name]
+            attr = getattr(attr, '__func__', attr)
+            if getattr(attr, GENERATED_MARKER, False):
+                return True
+            # The root Struct class is the only Struct class that doesn't inherit another one
+            return not any(hasattr(base, '_runs') for base in klass.__bases__)
+    return False
+
+
+def _create_function(cls, name, args, body, namespace):
+    """
+    Compile a function, binding the given namespace as its locals
+    :param cls: The class the function is created for
+    :param name: The function name
+    :param args: A list of the function arguments
+    :param body: A list of source lines, making up the function body
+    :param namespace: A dict of {name: value} the function may access
+    """
+    source = 'def __create_fn__({locals}):\n' \
+             '  def {name}({args}):\n' \
+             '{body}\n' \
+             '  return {name}'.format(locals=', '.join(namespace.keys()),
+                                      name=name,
+                                      args=', '.join(args),
+                                      body='\n'.join('    ' + line for line in body))
+    filename = '<stru generated {}.{}>'.format(cls.__qualname__, name)
+    code_locals = {}
+    exec(compile(source, filename, 'exec'), {}, code_locals)
+    fn = code_locals['__create_fn__'](**namespace)
+    fn.__qualname__ = '{}.{}'.format(cls.__qualname__, name)
+    setattr(fn, GENERATED_MARKER, True)
+    return fn
+
+
+def _local(field_name):
+    """
+    The name of the local variable holding the value of a field, in generated functions
+    """
+    return '_f_' + field_name
+
+
+def _has_default_conversion(field_obj):
+    return (type(field_obj).to_values is PrimitiveField.to_values and
+            type(field_obj).from_values is PrimitiveField.from_values)
+
+
+# noinspection PyProtectedMember
+# Accessing cls._fields, cls._defaults and cls._qualified_names
+def _make_init(cls):
+    """
+    Generate an __init__() assigning each field exactly once, by order, with the defaults bound as argument defaults.
+    Fields are assigned by order, so buffers and unions are validated after the fields they depend on.
+    Keyword arguments that aren't fields are set afterwards, as with the generic __init__().
+    The field names are the parameters, so the generated locals are prefixed with __stru_ to never shadow them (a field
+    name can't start with __stru_, as the class body would mangle it).
+    """
+    namespace = {'__stru_object_setattr': object.__setattr__, '__stru_eager': Validation.Eager}
+    defaults = dict(cls._defaults)
+    # A struct with a custom __setattr__ gets its fields assigned through it, as the generic __init__() does
+    custom_setattr = not _is_replaceable(cls, '__setattr__')
+    args = ['__stru_self']
+    fields_call = ', '.join('{0}={0}'.format(field_name) for field_name in cls._fields.values())
+    body = _dispatch_lines(cls, namespace, '__init__', 'type(__stru_self)',
+                           ', '.join(['__stru_self'] + ([fields_call] if fields_call else []) + ['**__stru_kwargs']))
+    if not custom_setattr:
+        body.append('__stru_validate = __stru_self._validation == __stru_eager')
+
+    for index, (field_obj, field_name) in enumerate(cls._fields.items()):
+        if field_name not in defaults:
+            args.append('{}=None'.format(field_name))
+        else:
+            namespace['__stru_default_{}'.format(index)] = defaults[field_name]
+            args.append('{}=__stru_default_{}'.format(field_name, index))
+
+        if custom_setattr:
+            body.append('__stru_self.{0} = {0}'.format(field_name))
+            continue
+        field_var = '__stru_field_{}'.format(index)
+        namespace[field_var] = field_obj
+        namespace['__stru_name_{}'.format(index)] = cls._qualified_names[field_name]
+        # Assigning None is always valid, and so is a default that was validated in advance
+        condition = '{} is not None'.format(field_name)
+        if field_name in defaults and _is_valid_default(field_obj, defaults[field_name], field_name):
+            condition += ' and {} is not __stru_default_{}'.format(field_name, index)
+        body += ['if __stru_validate and {}:'.format(condition),
+                 '    {}.validate_value(__stru_self, {}, __stru_name_{})'.format(field_var, field_name, index),
+                 '__stru_object_setattr(__stru_self, {0!r}, {0})'.format(field_name)]
+
+    body += ['for __stru_name, __stru_value in __stru_kwargs.items():',
+             '    setattr(__stru_self, __stru_name, __stru_value)']
+    # Fields can only be given as keyword arguments
+    if len(args) > 1:
+        args.insert(1, '*')
+    return _create_function(cls, '__init__', args + ['**__stru_kwargs'], body, namespace)
+
+
+def _is_valid_default(field_obj, default, field_name):
+    """
+    Check whether a default value is valid regardless of the struct it's assigned to.
+    Invalid defaults keep being validated on construction, so they raise just as they would with the generic __init__().
+    """
+    try:
+        field_obj.validate_value(None, default, field_name)
+    except Exception:
+        return False
+    return True
+
+
+def _make_pack(cls):
+    namespace = {}
+    body = _dispatch_lines(cls, namespace, 'pack', 'type(self)', 'self') + _validate_at_pack_lines(namespace)
+    parts = []
+    for run_index, run, args in _pack_runs(cls, namespace):
+        if isinstance(run, PrimitiveRun):
+            namespace['_run_{}_pack'.format(run_index)] = run.struct.pack
+            parts.append('_run_{}_pack({})'.format(run_index, ', '.join(args)))
+        else:
+            parts.append(_field_pack_call(run, args, 'pack', []))
+
+    if not parts:
+        body.append("return b''")
+    elif len(parts) == 1:
+        body.append('return ' + parts[0])
+    else:
+        body += ["return b''.join(("] + ['    {},'.format(part) for part in parts] + ['))']
+    return _create_function(cls, 'pack', ['self'], body, namespace)
+
+
+def _make_pack_into(cls):
+    namespace = {}
+    body = (_dispatch_lines(cls, namespace, 'pack_into', 'type(self)', 'self, buffer, offset') +
+            _validate_at_pack_lines(namespace))
+    for run_index, run, args in _pack_runs(cls, namespace):
+        if isinstance(run, PrimitiveRun):
+            namespace['_run_{}_pack_into'.format(run_index)] = run.struct.pack_into
+            body += ['_run_{}_pack_into({})'.format(run_index, ', '.join(['buffer', 'offset'] + args)),
+                     'offset += {}'.format(len(run))]
+        else:
+            body.append('offset = ' + _field_pack_call(run, args, 'pack_into', ['buffer', 'offset']))
+    body.append('return offset')
+    return _create_function(cls, 'pack_into', ['self', 'buffer', 'offset=0'], body, namespace)
+
+
+def _make_pack_into_from_pack(cls):
+    namespace = {'_struct_error': struct.error}
+    body = ['_data = self.pack()',
+            '_end = offset + len(_data)',
+            "with memoryview(buffer) as _view, _view.cast('B') as _bytes:",
+            '    if offset < 0 or _end > len(_bytes):',
+            "        raise _struct_error('pack_into requires a buffer of at least {} bytes'.format(_end))",
+            '    _bytes[offset:_end] = _data',
+            'return _end']
+    return _create_function(cls, 'pack_into', ['self', 'buffer', 'offset=0'], body, namespace)
+
+
+def _validate_at_pack_lines(namespace):
+    """
+    The lines validating the struct before packing it, if its class defers validation to packing.
+    The mode is checked on every call, so it can be changed after the class is created.
+    """
+    namespace['_at_pack'] = Validation.AtPack
+    return ['if self._validation == _at_pack:',
+            '    self.validate()']
+
+
+# noinspection PyProtectedMember
+# Accessing cls._fields and cls._runs
+def _pack_runs(cls, namespace):
+    """
+    Iterate the runs of a class, along with the expressions of the arguments needed to pack them
+    :param cls: The Struct class
+    :param namespace: The function namespace, to add locals to
+    :return: An iterator of (run index, run, arguments). For primitive runs, the arguments are the struct values.
+             For non-primitive runs, they are the field variable, the field value and the dependency value (or None).
+    """
+    field_indices = {field_name: index for index, field_name in enumerate(cls._fields.values())}
+    for run_index, run in enumerate(cls._runs):
+        if isinstance(run, PrimitiveRun):
+            args = []
+            for field_obj, field_name in run.fields:
+                if _has_default_conversion(field_obj):
+                    args.append('self.{}'.format(field_name))
+                else:
+                    namespace['_field_{}'.format(field_indices[field_name])] = field_obj
+                    args.append('*_field_{}.to_values(self.{})'.format(field_indices[field_name], field_name))
+            yield run_index, run, args
+        else:
+            field_var = '_field_{}'.format(field_indices[run.field_name])
+            namespace[field_var] = run.field_obj
+            dependency_name = run.field_obj.get_dependency_name(cls)
+            dependency = 'self.{}'.format(dependency_name) if dependency_name is not None else None
+            yield run_index, run, [field_var, 'self.{}'.format(run.field_name), dependency]
+
+
+def _field_pack_call(run, args, method, buffer_args):
+    """
+    The expression packing a non-primitive run
+    :param run: The NonPrimitiveRun
+    :param args: The arguments generated for the run by _pack_runs()
+    :param method: Either 'pack' or 'pack_into'
+    :param buffer_args: A list of the arguments to prepend for the buffer, if packing into one
+    """
+    field_var, value, dependency = args
+    if isinstance(run.field_obj, EmbeddedStructField):
+        function, call_args = '{}.{}'.format(value, method), buffer_args
+    elif isinstance(run.field_obj, BufferField) and dependency is not None:
+        function, call_args = '{}.{}_with_length'.format(field_var, method), buffer_args + [value, dependency]
+    elif isinstance(run.field_obj, UnionField) and dependency is not None:
+        function, call_args = '{}[{}].{}'.format(field_var, dependency, method), buffer_args + [value, 'self']
+    else:
+        function, call_args = '{}.{}'.format(field_var, method), buffer_args + [value, 'self']
+    return '{}({})'.format(function, ', '.join(call_args))
+
+
+def _make_unpack(cls):
+    namespace = {'_create_stream': UnpackStream.create, '_unpack_fields': partial.unpack_fields}
+    body = _dispatch_lines(cls, namespace, 'unpack', 'cls',
+                           'cls, input_stream, *args, validation=validation, fields=fields, **kwargs')
+    body += ['if fields is not None:',
+              '    return _unpack_fields(cls, input_stream, fields, validation, *args, **kwargs)',
+             'input_stream = _create_stream(input_stream, *args, **kwargs)']
+    unpacked = _add_unpack_lines(cls, body, namespace, from_buffer=False)
+    body += _construct_lines(unpacked, '')
+    return _create_function(cls, 'unpack', ['cls', 'input_stream', '*args', 'validation=None', 'fields=None',
+                                            '**kwargs'], body, namespace)
+
+
+def _make_unpack_from(cls):
+    namespace = {}
+    body = _dispatch_lines(cls, namespace, 'unpack_from', 'cls', 'cls, buffer, offset, validation=validation')
+    body.append('_offset = offset')
+    unpacked = _add_unpack_lines(cls, body, namespace, from_buffer=True)
+    body += _construct_lines(unpacked, ', _offset - offset')
+    return _create_function(cls, 'unpack_from', ['cls', 'buffer', 'offset=0', '*', 'validation=None'], body,
+                            namespace)
+
+
+def _construct_lines(unpacked, returned_suffix):
+    """
+    The lines creating the unpacked struct and returning it
+    :param unpacked: The names of the fields unpacked, by order
+    :param returned_suffix: The source of other values to return along with the struct
+    """
+    kwargs = ', '.join('{}={}'.format(name, _local(name)) for name in unpacked)
+    fields_dict = '{{{}}}'.format(', '.join('{!r}: {}'.format(name, _local(name)) for name in unpacked))
+    return ['if validation is None or validation == cls._validation:',
+            '    return cls({}){}'.format(kwargs, returned_suffix),
+            'return cls._from_fields({}, validation){}'.format(fields_dict, returned_suffix)]
+
+
+# noinspection PyProtectedMember
+# Accessing cls._fields and cls._runs
+def _add_unpack_lines(cls, body, namespace, from_buffer):
+    """
+    Add the lines unpacking each field to a local variable
+    :param cls: The Struct class
+    :param body: The function body to add lines to
+    :param namespace: The function namespace, to add locals to
+    :param from_buffer: Whether to unpack from 'buffer' at '_offset', or read from 'input_stream'
+    :return: The names of the fields unpacked, by order
+    """
+    field_indices = {field_name: index for index, field_name in enumerate(cls._fields.values())}
+    unpacked = []
+
+    for run_index, run in enumerate(cls._runs):
+        if isinstance(run, PrimitiveRun):
+            if from_buffer:
+                namespace['_run_{}_unpack_from'.format(run_index)] = run.struct.unpack_from
+                read = '_run_{}_unpack_from(buffer, _offset)'.format(run_index)
+            else:
+                namespace['_run_{}_unpack'.format(run_index)] = run.struct.unpack
+                read = '_run_{}_unpack(input_stream.read({}))'.format(run_index, len(run))
+            if all(_has_default_conversion(field_obj) for field_obj, _ in run.fields):
+                targets = ''.join('{}, '.format(_local(field_name)) for _, field_name in run.fields)
+                body.append('{}= {}'.format(targets, read))
+            else:
+                body.append('_values = ' + read)
+                index = 0
+                for field_obj, field_name in run.fields:
+                    count = field_obj.values_count
+                    if _has_default_conversion(field_obj):
+                        body.append('{} = _values[{}]'.format(_local(field_name), index))
+                    else:
+                        field_var = '_field_{}'.format(field_indices[field_name])
+                        namespace[field_var] = field_obj
+                        body.append('{} = {}.from_values(_values[{}:{}])'.format(_local(field_name), field_var,
+                                                                                 index, index + count))
+                    index += count
+            if from_buffer:
+                body.append('_offset += {}'.format(len(run)))
+            unpacked += [field_name for _, field_name in run.fields]
+            continue
+
+        field_obj, field_name = run.field_obj, run.field_name
+        field_var = '_field_{}'.format(field_indices[field_name])
+        namespace[field_var] = field_obj
+        dependency_name = field_obj.get_dependency_name(cls)
+        if dependency_name not in unpacked:
+            dependency_name = None
+        other_fields = '{{{}}}'.format(', '.join('{!r}: {}'.format(name, _local(name)) for name in unpacked))
+
+        if isinstance(field_obj, EmbeddedStructField):
+            if from_buffer:
+                namespace['_unpack_from_{}'.format(field_var)] = field_obj.base.unpack_from
+                body += ['{}, _size = _unpack_from_{}(buffer, _offset)'.format(_local(field_name), field_var),
+                         '_offset += _size']
+            else:
+                namespace['_unpack_{}'.format(field_var)] = field_obj.base.unpack
+                body.append('{} = _unpack_{}(input_stream)'.format(_local(field_name), field_var))
+        elif from_buffer:
+            if isinstance(field_obj, BufferField) and dependency_name is not None:
+                value = '{}.unpack_from_with_length(buffer, _offset, {})'.format(field_var, _local(dependency_name))
+            elif isinstance(field_obj, UnionField) and dependency_name is not None:
+                value = '{}[{}].unpack_from(buffer, _offset, cls, {})'.format(field_var, _local(dependency_name),
+                                                                             other_fields)
+            else:
+                value = '{}.unpack_from(buffer, _offset, cls, {})'.format(field_var, other_fields)
+            body.append('{}, _offset = {}'.format(_local(field_name), value))
+        else:
+            if isinstance(field_obj, BufferField) and dependency_name is not None:
+                value = '{}.unpack_with_length(input_stream, {})'.format(field_var, _local(dependency_name))
+            elif isinstance(field_obj, UnionField) and dependency_name is not None:
+                value = '{}[{}].unpack(input_stream, cls, {})'.format(field_var, _local(dependency_name),
+                                                                     other_fields)
+            else:
+                value = '{}.unpack(input_stream, cls, {})'.format(field_var, other_fields)
+            body.append('{} = {}'.format(_local(field_name), value))
+        unpacked.append(field_name)
+
+    return unpacked
@@ -0,0 +1,71 @@
+"""
+Columnar (struct-of-arrays) unpacking of buffers of fixed-length structs.
+The fields of all records are unpacked directly into per-field columns, without creating a struct per record.
+"""
+import array
+import struct
+
+from stru.enhanced_struct import Endianess
+from stru.field.field import PrimitiveField, NumericField, NoValueField, EmbeddedStructField
+from stru.field.exceptions import UnsupportedOperationException
+
+
+def unpack_columns(cls, buffer):
+    """
+    Unpack a buffer of structs packed back-to-back into per-field columns.
+    Numeric fields become array.array columns with the typecode of their struct format, other primitive fields become
+    lists, and embedded structs become nested dicts of columns. Pad bytes are left out.
+    :param cls: The Struct class, which must be of fixed length
+    :param buffer: An object supporting the buffer protocol, whose size is a multiple of len(cls)
+    :return: A dict of {field name: column}
+    """
+    record_length = len(cls)
+    buffer_length = memoryview(buffer).nbytes
+    if record_length == 0 or buffer_length % record_length != 0:
+        raise struct.error('unpack_columns requires a buffer of a multiple of {} bytes'.format(record_length))
+    return _unpack_columns(cls, buffer, 0, record_length, buffer_length // record_length)
+
+
+# noinspection PyProtectedMember
+# Accessing cls._fields and cls._endianess
+def _unpack_columns(cls, buffer, base_offset, record_length, count):
+    columns = {}
+    offset = base_offset
+    for field_obj, field_name in cls._fields.items():
+        if isinstance(field_obj, EmbeddedStructField):
+            columns[field_name] = _unpack_columns(field_obj.base, buffer, offset, record_length, count)
+            offset += len(field_obj)
+            continue
+        if not isinstance(field_obj, PrimitiveField):
+            raise UnsupportedOperationException('Field {} of type {} can not be unpacked to a column'
+                                                .format(field_name, type(field_obj).__name__))
+
+        size = struct.calcsize(cls._endianess + field_obj.struct_format)
+        if not isinstance(field_obj, NoValueField):
+            values = _iter_field_values(cls._endianess, field_obj.struct_format, buffer, offset, size,
+                                        record_length, count)
+            if isinstance(field_obj, NumericField):
+                columns[field_name] = array.array(field_obj.struct_format, (value for value, in values))
+            else:
+                columns[field_name] = [field_obj.from_values(value) for value in values]
+        offset += size
+    return columns
+
+
+def _iter_field_values(endianess, struct_format, buffer, offset, size, record_length, count):
+    """
+    Iterate the struct module values of a single field, in all records
+    """
+    if endianess == Endianess.Native:
+        # Native format aligns fields, so padding them to the record length won't work
+        field_struct = struct.Struct(endianess + struct_format)
+        return (field_struct.unpack_from(buffer, index * record_length + offset) for index in range(count))
+
+    # Skip the rest of the record with pad bytes, so the struct module iterates over the field alone
+    field_format = endianess
+    if offset:
+        field_format += '{:d}x'.format(offset)
+    field_format += struct_format
+    if record_length - offset - size:
+        field_format += '{:d}x'.format(record_length - offset - size)
+    return struct.iter_unpack(field_format, buffer)
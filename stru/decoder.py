@@ -0,0 +1,165 @@
+"""
+Sans-IO incremental decoding of a stream of structs packed back-to-back.
+
+StructDecoder drives Struct.unpack_async() by hand: each read of the coroutine suspends it until enough bytes are fed,
+so decoding resumes mid-struct when the next chunk arrives, rather than restarting from the struct start.
+"""
+import struct
+
+from stru.field.exceptions import UnsupportedOperationException
+from stru.unpack_stream import AsyncUnpackStream
+
+
+class _ReadRequest(object):
+    """
+    An awaitable that suspends the unpacking coroutine until the decoder has the requested amount of bytes
+    """
+    __slots__ = ('amount',)
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def __await__(self):
+        data = yield self
+        return data
+
+
+class _DecoderStream(AsyncUnpackStream):
+    async def read(self, amount):
+        return await _ReadRequest(amount)
+
+
+class StructDecoder(object):
+    """
+    Decodes structs of a single class from arbitrary chunks of bytes, without performing any IO.
+    When a struct is invalid, the bytes of it that were read are dropped, and decoding resumes right after them.
+
+    EXAMPLE:
+        decoder = StructDecoder(Packet)
+        while True:
+            for packet in decoder.feed(sock.recv(4096)):
+                handle(packet)
+    """
+
+    def __init__(self, cls, validation=None):
+        """
+        :param cls: The Struct class to decode
+        :param validation: A Validation mode for the decoded values, overriding the class' mode
+        """
+        self._cls = cls
+        self._validation = validation
+        self._stream = _DecoderStream()
+        self._buffer = bytearray()
+        # The offset in the buffer of the first byte that wasn't consumed yet
+        self._offset = 0
+        # The suspended unpacking coroutine, and the amount of bytes it waits for
+        self._coroutine = None
+        self._amount = None
+        # The amount of bytes of the current struct the coroutine already read
+        self._consumed = 0
+        # The exception of an invalid struct, raised by the next call, as structs completed before it were returned
+        self._error = None
+        try:
+            self._length = len(cls)
+        except UnsupportedOperationException:
+            self._length = None
+        if self._length == 0:
+            raise struct.error('StructDecoder requires a struct of non-zero length')
+
+    @property
+    def pending(self):
+        """
+        The amount of bytes fed but not yet decoded into a complete struct
+        """
+        return len(self._buffer) - self._offset + (self._consumed if self._coroutine is not None else 0)
+
+    @property
+    def in_progress(self):
+        """
+        Whether the decoder is in the middle of a struct
+        """
+        return self._coroutine is not None or self._offset < len(self._buffer)
+
+    def feed(self, data):
+        """
+        Feed the decoder with the next chunk of bytes.
+        If a struct is invalid, its exception is raised. But if structs were completed before it, they're returned, and
+        the exception is raised by the next call to feed() or close() instead, after buffering the bytes it's given.
+        :param data: An object supporting the buffer protocol
+        :return: A list of the structs completed by this chunk, by order
+        """
+        self._buffer += data
+        self._raise_error()
+        structs = []
+        try:
+            while self._decode_next(structs):
+                pass
+        except Exception as e:
+            if not structs:
+                raise
+            self._error = e
+        finally:
+            # Dropping the consumed bytes once per chunk, rather than once per read
+            del self._buffer[:self._offset]
+            self._offset = 0
+        return structs
+
+    def close(self):
+        """
+        Signal that no more bytes will be fed
+        :raises struct.error: If the decoder is in the middle of a struct
+        """
+        self._raise_error()
+        if self.in_progress:
+            raise struct.error('The stream ended in the middle of a {} struct'.format(self._cls.__name__))
+
+    def _decode_next(self, structs):
+        """
+        Advance decoding as much as the buffered bytes allow, up to the end of a single struct
+        :param structs: The list to append a completed struct to
+        :return: Whether decoding should continue
+        """
+        available = len(self._buffer) - self._offset
+        if self._coroutine is None:
+            if available == 0:
+                return False
+            if self._length is not None:
+                # Fixed-length structs are unpacked at once, as soon as all of their bytes are available
+                if available < self._length:
+                    return False
+                try:
+                    obj, size = self._cls.unpack_from(self._buffer, self._offset, validation=self._validation)
+                except Exception:
+                    # The bytes of the invalid struct are dropped, as with variable-length structs
+                    self._offset += self._length
+                    raise
+                self._offset += size
+                structs.append(obj)
+                return True
+            self._coroutine = self._cls.unpack_async(self._stream, validation=self._validation)
+            self._consumed = 0
+            return self._send(None, structs)
+
+        if available < self._amount:
+            return False
+        data = bytes(self._buffer[self._offset:self._offset + self._amount])
+        self._offset += self._amount
+        self._consumed += self._amount
+        return self._send(data, structs)
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _send(self, data, structs):
+        try:
+            self._amount = self._coroutine.send(data).amount
+        except StopIteration as stop:
+            self._coroutine = None
+            structs.append(stop.value)
+        except BaseException:
+            # The bytes of the invalid struct that were already read are dropped
+            self._coroutine = None
+            raise
+        return True
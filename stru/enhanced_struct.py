@@ -6,6 +6,12 @@ class Endianess(object):
     Network = '!'  # Network order
 
 
+class Validation(object):
+    Eager = 'eager'  # Validate values when they're assigned
+    AtPack = 'at_pack'  # Validate values only when packing
+    Trusted = 'trusted'  # Never validate values
+
+
 class MissingEndianessException(Exception):
     pass
 
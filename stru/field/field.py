@@ -1,11 +1,15 @@
 from .exceptions import (DependencyInvalidValueException, DependencyNoneException, DependencyNotInClassException,
                          UnsupportedOperationException)
 
+import codecs
+import functools
 import struct
 
-from ..utils import str2bytes, bytes2str
+from ..utils import ENCODING
 
 BITS_PER_BYTE = 8
+# The maximal amount of distinct values an interning string field keeps
+INTERN_CACHE_SIZE = 1024
 
 
 # noinspection PyUnusedLocal
@@ -57,6 +61,17 @@ class Field(object):
         """
         raise NotImplementedError()
 
+    def pack_into(self, buffer, offset, value, source_obj):
+        """
+        Packs this field into a writable buffer
+        :param buffer: A writable object supporting the buffer protocol (bytearray, memoryview, mmap, etc.)
+        :param offset: The offset in the buffer to pack into
+        :param value: The value this field should be packed with
+        :param source_obj: The object that contains this field
+        :return: The offset right after the field
+        """
+        raise NotImplementedError()
+
     def unpack(self, input_stream, target_cls, other_fields):
         """
         Unpack this field from a buffer
@@ -66,6 +81,42 @@ class Field(object):
         """
         raise NotImplementedError()
 
+    async def unpack_async(self, input_stream, target_cls, other_fields):
+        """
+        Unpack this field from an asynchronous stream
+        :param input_stream: The stream to read from. Must have an asynchronous read(amount) function.
+        :param target_cls: The class that will be created with this field
+        :param other_fields: A dict of other fields that were previously unpacked with this stream
+        """
+        raise NotImplementedError()
+
+    def unpack_from(self, buffer, offset, target_cls, other_fields):
+        """
+        Unpack this field from a buffer, without copying it
+        :param buffer: An object supporting the buffer protocol (bytes, bytearray, memoryview, mmap, etc.)
+        :param offset: The offset in the buffer to unpack from
+        :param target_cls: The class that will be created with this field
+        :param other_fields: A dict of other fields that were previously unpacked from this buffer
+        :return: A tuple of (value, offset right after the field)
+        """
+        raise NotImplementedError()
+
+    def get_dependency_name(self, cls):
+        """
+        Get the name of the field this field depends on (such as a length or a selector field)
+        :param cls: The class containing this field
+        :return: The dependency's field name, or None if there's no dependency or it's not in the class
+        """
+        return None
+
+    @property
+    def struct_format(self):
+        """
+        The struct module format of this field, without endianess.
+        None if this field can't be expressed as a struct module format.
+        """
+        return None
+
     def _after_set_endianess(self, value):
         pass
 
@@ -80,17 +131,29 @@ class PrimitiveField(Field):
     def __init__(self, format_string):
         super(PrimitiveField, self).__init__()
         self._format = format_string
+        self._struct = struct.Struct(self.format_string)
 
     @property
     def format_string(self):
         return self.endianess + self._format
 
+    @property
+    def struct_format(self):
+        return self._format
+
+    @property
+    def values_count(self):
+        """
+        The amount of values this field takes in a struct module tuple
+        """
+        return 1
+
     @property
     def default(self):
         return self._default
 
     def __len__(self):
-        return struct.calcsize(self.format_string)
+        return self._struct.size
 
     def dynamic_length(self, obj):
         return len(self)
@@ -118,12 +181,41 @@ class PrimitiveField(Field):
         """
         return PrimitivesArrayField(length, self)
 
+    def to_values(self, value):
+        """
+        Convert a value of this field to the values the struct module should pack
+        :param value: The value of the field
+        :return: A sequence of values_count values
+        """
+        return value,
+
+    def from_values(self, values):
+        """
+        Convert values unpacked by the struct module to a value of this field
+        :param values: A sequence of values_count values
+        :return: The value of the field
+        """
+        return values[0]
+
     def pack(self, value, source_obj):
-        return struct.pack(self.format_string, value)
+        return self._struct.pack(*self.to_values(value))
+
+    def pack_into(self, buffer, offset, value, source_obj):
+        self._struct.pack_into(buffer, offset, *self.to_values(value))
+        return offset + self._struct.size
 
     def unpack(self, buf, target_cls, other_fields):
-        value, = struct.unpack(self.format_string, buf.read(len(self)))
-        return value
+        return self.from_values(self._struct.unpack(buf.read(self._struct.size)))
+
+    async def unpack_async(self, input_stream, target_cls, other_fields):
+        return self.from_values(self._struct.unpack(await input_stream.read(self._struct.size)))
+
+    def unpack_from(self, buffer, offset, target_cls, other_fields):
+        return self.from_values(self._struct.unpack_from(buffer, offset)), offset + self._struct.size
+
+    def _after_set_endianess(self, value):
+        if value is not None:
+            self._struct = struct.Struct(self.format_string)
 
 
 # noinspection PyAbstractClass
@@ -157,22 +249,23 @@ class NumericField(PrimitiveField):
     def __init__(self, format_string):
         super(NumericField, self).__init__(format_string)
         assert len(format_string) == 1
+        self._update_limits()
 
     @property
     def upper_limit(self):
-        return 2 ** self._value_bits
+        return self._max + 1
 
     @property
     def max(self):
-        return self.upper_limit - 1
+        return self._max
 
     @property
     def lower_limit(self):
-        return self.min - 1
+        return self._min - 1
 
     @property
     def min(self):
-        raise NotImplementedError()
+        return self._min
 
     def validate_value(self, obj, value, field_name):
         if value is None:
@@ -180,17 +273,30 @@ class NumericField(PrimitiveField):
         if not isinstance(value, (int, float)):
             raise TypeError(f'Expected int or float for {field_name}, '
                             f'got {value!r} of type {type(value)}')
-        if value > self.max:
+        if value > self._max:
             raise ValueError('Value {value} too large! {field}.max = {max}'
-                             .format(value=value, field=field_name, max=self.max))
-        if value < self.min:
+                             .format(value=value, field=field_name, max=self._max))
+        if value < self._min:
             raise ValueError('Value {value} too small! {field}.min = {min}'
-                             .format(value=value, field=field_name, min=self.min))
+                             .format(value=value, field=field_name, min=self._min))
 
     @property
     def _value_bits(self):
         raise NotImplementedError()
 
+    @property
+    def _min_value(self):
+        raise NotImplementedError()
+
+    def _update_limits(self):
+        # The limits depend on the field size, which depends on the endianess, so they're computed only when it's set
+        self._max = (2 ** self._value_bits) - 1
+        self._min = self._min_value
+
+    def _after_set_endianess(self, value):
+        super(NumericField, self)._after_set_endianess(value)
+        self._update_limits()
+
 
 class SignedNumericField(NumericField):
     @property
@@ -198,7 +304,7 @@ class SignedNumericField(NumericField):
         return (len(self) * BITS_PER_BYTE) - 1
 
     @property
-    def min(self):
+    def _min_value(self):
         return -(2 ** self._value_bits)
 
 
@@ -208,18 +314,92 @@ class UnsignedNumericField(NumericField):
         return len(self) * BITS_PER_BYTE
 
     @property
-    def min(self):
+    def _min_value(self):
         return 0
 
 
-class StringField(PrimitiveField):
+class EncodedField(object):
+    """
+    Mixin for fields whose values are strings, encoded to bytes in the struct.
+    The encoding can be chosen per field. In raw mode, values are the bytes themselves, and are never encoded or
+    decoded.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(EncodedField, self).__init__(*args, **kwargs)
+        self._encoding = ENCODING
+        self._raw = False
+
+    @property
+    def encoding(self):
+        """
+        The encoding of the field values, or None in raw mode
+        """
+        return None if self._raw else self._encoding
+
+    def __call__(self, default=None, encoding=None, raw=None):
+        """
+        Used to set field attributes. Supported attributes, on top of the ones of the field type:
+        * encoding
+        * raw
+        EXAMPLE:
+            name = FieldType.String[16](encoding='utf-8')
+            magic = FieldType.Char[4](raw=True)
+        :param default: A default value that will be assigned to this field
+        :param encoding: The encoding of the field values. Defaults to cp1252.
+        :param raw: Whether the field values are bytes, given as is, without encoding and decoding them
+        :return: self
+        """
+        if encoding is not None:
+            self._encoding = encoding
+        if raw is not None:
+            self._raw = raw
+        return super(EncodedField, self).__call__(default)
+
+    @property
+    def _value_type(self):
+        return bytes if self._raw else str
+
+    def _encode(self, value):
+        return value if self._raw else value.encode(self._encoding)
+
+    def _decode(self, value):
+        return value if self._raw else value.decode(self._encoding)
+
+    def _encoded_length(self, value):
+        # The default encoding takes a byte per character, so there's no need to encode the value to measure it
+        if self._raw or self._encoding == ENCODING:
+            return len(value)
+        return len(value.encode(self._encoding))
+
+
+class StringField(EncodedField, PrimitiveField):
+    def __init__(self, format_string):
+        super(StringField, self).__init__(format_string)
+        # Maps the bytes of values to their decoded values, if the field interns its values
+        self._intern_cache = None
+
+    def __call__(self, default=None, encoding=None, raw=None, intern=None):
+        """
+        Used to set field attributes. Supported attributes, on top of the ones of encoded fields:
+        * intern
+        EXAMPLE:
+            device = FieldType.String[16](intern=True)
+        :param intern: Whether unpacked values are shared between structs, rather than decoded for each of them.
+                       Up to INTERN_CACHE_SIZE distinct values are shared, so it's meant for fields with few values.
+        :return: self
+        """
+        if intern is not None:
+            self._intern_cache = {} if intern else None
+        return super(StringField, self).__call__(default, encoding, raw)
+
     def validate_value(self, obj, value, field_name):
         if value is None:
             return
-        if not isinstance(value, str):
-            raise TypeError(f'Expected str for {field_name}, '
+        if not isinstance(value, self._value_type):
+            raise TypeError(f'Expected {self._value_type.__name__} for {field_name}, '
                             f'got {value!r} of type {type(value)}')
-        if len(value) > len(self):
+        if self._encoded_length(value) > len(self):
             raise ValueError('String "{value}" too long! len({field}) = {max}'
                              .format(value=value, field=field_name, max=len(self)))
 
@@ -231,14 +411,63 @@ class StringField(PrimitiveField):
             return StringField('{:d}s'.format(num))
         raise NotImplementedError('Arrays of strings not implemented')
 
-    def pack(self, value, source_obj):
-        assert isinstance(value, str)
-        return super().pack(str2bytes(value), source_obj)
+    def to_values(self, value):
+        assert isinstance(value, self._value_type)
+        return self._encode(value),
 
-    def unpack(self, buf, target_cls, other_fields):
+    def from_values(self, values):
         # struct.unpack() doesnt stop unpacking on null terminator - it will give us the null terminator as well
-        # so we trim it
-        return bytes2str(super(StringField, self).unpack(buf, target_cls, other_fields).split(b'\x00', 1)[0])
+        # so we trim it. Raw values keep their inner null bytes, and only their null padding is trimmed, as packing
+        # pads them back.
+        value = values[0].rstrip(b'\x00') if self._raw else self._trim(values[0])
+
+        if self._intern_cache is None:
+            return self._decode(value)
+        decoded = self._intern_cache.get(value, None)
+        if decoded is None:
+            decoded = self._decode(value)
+            if len(self._intern_cache) < INTERN_CACHE_SIZE:
+                self._intern_cache[value] = decoded
+        return decoded
+
+    def _decode(self, value):
+        decoded = super(StringField, self)._decode(value)
+        if not self._raw and _null_terminator(self._encoding) is None:
+            # The terminator of this encoding isn't made of null bytes, so it's trimmed after decoding
+            decoded = decoded.split('\x00', 1)[0]
+        return decoded
+
+    def _trim(self, value):
+        """
+        Trim an encoded value at its null terminator
+        """
+        terminator = _null_terminator(self._encoding)
+        if terminator is None:
+            return value
+        width = len(terminator)
+        end = value.find(terminator)
+        # The terminator of a multi-byte encoding counts only on a character boundary
+        while end > 0 and end % width != 0:
+            end = value.find(terminator, end + 1)
+        if end >= 0:
+            return value[:end]
+        # Padding too short for a whole terminator
+        remainder = len(value) % width
+        if remainder and not any(value[-remainder:]):
+            return value[:-remainder]
+        return value
+
+
+@functools.lru_cache(maxsize=None)
+def _null_terminator(encoding):
+    """
+    Get the null terminator of an encoding, which strings are padded with
+    :return: The encoded terminator, or None if it isn't made of null bytes
+    """
+    # Encoding two terminators rather than one leaves out any byte order mark
+    single, double = '\x00'.encode(encoding), '\x00\x00'.encode(encoding)
+    terminator = double[len(single):]
+    return terminator if terminator and not any(terminator) else None
 
 
 # noinspection PyAbstractClass
@@ -281,14 +510,18 @@ class PrimitivesArrayField(PrimitiveField, ArrayField):
     def base(self):
         return self._base_field_obj
 
+    @property
+    def values_count(self):
+        return self.count
+
     def __getitem__(self, num):
         raise NotImplementedError('Multidimensional arrays not implemented')
 
-    def pack(self, values, source_obj):
-        return struct.pack(self.format_string, *values)
+    def to_values(self, values):
+        return values
 
-    def unpack(self, buf, target_cls, other_fields):
-        return list(struct.unpack(self.format_string, buf.read(struct.calcsize(self.format_string))))
+    def from_values(self, values):
+        return list(values)
 
 
 class NonPrimitivesArrayField(NonPrimitiveField, ArrayField):
@@ -314,6 +547,11 @@ class NonPrimitivesArrayField(NonPrimitiveField, ArrayField):
     def pack(self, values, source_obj):
         return ''.join(self._base_field_obj.pack(value, source_obj) for value in values)
 
+    def pack_into(self, buffer, offset, values, source_obj):
+        for value in values:
+            offset = self._base_field_obj.pack_into(buffer, offset, value, source_obj)
+        return offset
+
     def unpack(self, buf, target_cls, other_fields):
         # It looks like unpack_async in purpose, as it is the same code (with or without yields)
         values = []
@@ -322,26 +560,58 @@ class NonPrimitivesArrayField(NonPrimitiveField, ArrayField):
             values.append(value)
         return values
 
+    async def unpack_async(self, input_stream, target_cls, other_fields):
+        values = []
+        for _ in range(self.count):
+            value = await self.base.unpack_async(input_stream, target_cls, other_fields)
+            values.append(value)
+        return values
+
+    def unpack_from(self, buffer, offset, target_cls, other_fields):
+        values = []
+        for _ in range(self.count):
+            value, offset = self.base.unpack_from(buffer, offset, target_cls, other_fields)
+            values.append(value)
+        return values, offset
 
-class CharArrayField(PrimitivesArrayField):
-    def pack(self, values, source_obj):
+
+class CharArrayField(EncodedField, PrimitivesArrayField):
+    def __init__(self, count, base_field_obj):
+        super(CharArrayField, self).__init__(count, base_field_obj)
+        # The array encodes its values like its base char
+        self._encoding = base_field_obj._encoding
+        self._raw = base_field_obj._raw
+
+    def __call__(self, default=None, encoding=None, raw=None):
+        # The base char validates each value, so it must expect the same type
+        self.base(encoding=encoding, raw=raw)
+        return super(CharArrayField, self).__call__(default, encoding, raw)
+
+    def validate_value(self, obj, values, field_name):
+        if self._raw and isinstance(values, bytes):
+            values = self.to_values(values)
+        super(CharArrayField, self).validate_value(obj, values, field_name)
+
+    def to_values(self, values):
+        if self._raw:
+            # The struct module expects a 1-length bytes per char
+            return [values[index:index + 1] for index in range(len(values))] if isinstance(values, bytes) else values
         if isinstance(values, str):
             # Char can be assigned with str only, but struct module assumes
             # it is of bytes type
-            values = list(map(str2bytes, values))
+            values = list(map(self._encode, values))
         elif isinstance(values, list):
             assert all(isinstance(e, str) for e in values)
-            values = list(map(str2bytes, values))
-        return super().pack(values, source_obj)
+            values = list(map(self._encode, values))
+        return values
 
-    def unpack(self, buf, target_cls, other_fields):
-        value = super().unpack(buf, target_cls, other_fields)
-        assert isinstance(value, list)
-        assert all(isinstance(e, bytes) for e in value)
-        value = list(map(bytes2str, value))
-        return value
+    def from_values(self, values):
+        assert all(isinstance(e, bytes) for e in values)
+        return list(map(self._decode, values))
 
 
+# noinspection PyProtectedMember
+# Accessing type(obj)._fields
 class EmbeddedStructField(NonPrimitiveField):
     def __init__(self, struct_cls):
         super(EmbeddedStructField, self).__init__()
@@ -355,7 +625,14 @@ class EmbeddedStructField(NonPrimitiveField):
         return len(self.base)
 
     def dynamic_length(self, obj):
-        return len(self.base)
+        try:
+            return len(self.base)
+        except UnsupportedOperationException:
+            # The length of a variable-length struct is that of the embedded value
+            field_name = type(obj)._fields.get(self, None)
+            if field_name is None:
+                raise
+            return len(getattr(obj, field_name))
 
     def __getitem__(self, item):
         raise NotImplementedError('Arrays of embedded structs are currently not supported!')
@@ -369,9 +646,19 @@ class EmbeddedStructField(NonPrimitiveField):
     def pack(self, value, source_obj):
         return value.pack()
 
+    def pack_into(self, buffer, offset, value, source_obj):
+        return value.pack_into(buffer, offset)
+
     def unpack(self, buf, target_cls, other_fields):
         return self.base.unpack(buf)
 
+    async def unpack_async(self, input_stream, target_cls, other_fields):
+        return await self.base.unpack_async(input_stream)
+
+    def unpack_from(self, buffer, offset, target_cls, other_fields):
+        value, size = self.base.unpack_from(buffer, offset)
+        return value, offset + size
+
 
 # noinspection PyProtectedMember
 # Accessing type(obj)._fields
@@ -389,9 +676,19 @@ class UnionField(NonPrimitiveField):
             raise DependencyInvalidValueException('No option defined for selector value {}'.format(selector_value))
         return value
 
+    @property
+    def options(self):
+        return self._options
+
     def dynamic_length(self, obj):
-        selector_value = self._get_selector_value(obj)
-        return self[selector_value].dynamic_length(obj)
+        option = self[self._get_selector_value(obj)]
+        try:
+            return option.dynamic_length(obj)
+        except UnsupportedOperationException:
+            if not isinstance(option, EmbeddedStructField):
+                raise
+            # The length of a variable-length struct option is that of the union's value
+            return len(getattr(obj, type(obj)._fields[self]))
 
     def validate_value(self, obj, value, field_name):
         if value is None:
@@ -403,10 +700,25 @@ class UnionField(NonPrimitiveField):
         selector_value = self._get_selector_value(source_obj)
         return self[selector_value].pack(value, source_obj)
 
+    def pack_into(self, buffer, offset, value, source_obj):
+        selector_value = self._get_selector_value(source_obj)
+        return self[selector_value].pack_into(buffer, offset, value, source_obj)
+
     def unpack(self, buf, target_cls, other_fields):
         selector_value = other_fields[self._get_selector_name(target_cls)]
         return self[selector_value].unpack(buf, target_cls, other_fields)
 
+    async def unpack_async(self, input_stream, target_cls, other_fields):
+        selector_value = other_fields[self._get_selector_name(target_cls)]
+        return await self[selector_value].unpack_async(input_stream, target_cls, other_fields)
+
+    def unpack_from(self, buffer, offset, target_cls, other_fields):
+        selector_value = other_fields[self._get_selector_name(target_cls)]
+        return self[selector_value].unpack_from(buffer, offset, target_cls, other_fields)
+
+    def get_dependency_name(self, cls):
+        return cls._fields.get(self._selector_field_obj, None)
+
     def _get_selector_name(self, cls):
         selector_name = cls._fields.get(self._selector_field_obj, None)
         if selector_name is None:
@@ -424,9 +736,18 @@ class UnionField(NonPrimitiveField):
 # noinspection PyProtectedMember
 # Accessing type(obj)._fields
 class BufferField(NonPrimitiveField):
-    def __init__(self, length_field_obj):
+    def __init__(self, length_field_obj, zero_copy=False):
+        """
+        :param length_field_obj: The field to use as a length indicator
+        :param zero_copy: Whether unpacking from a buffer gives a memoryview of it, rather than a copy
+        """
         super(BufferField, self).__init__()
         self._length_field_obj = length_field_obj
+        self._zero_copy = zero_copy
+
+    @property
+    def zero_copy(self):
+        return self._zero_copy
 
     def dynamic_length(self, obj):
         return self._get_length_field_value(obj)
@@ -435,20 +756,93 @@ class BufferField(NonPrimitiveField):
         if value is None:
             return
         length = self._get_length_field_value(obj)
-        if not isinstance(value, bytes):
+        if not isinstance(value, (bytes, bytearray, memoryview)):
             raise TypeError('Expected bytes, got: {}'.format(type(value)))
         if len(value) > length:
             raise ValueError('Buffer "{value}" too long! len({field}) = {max}'
                              .format(value=value, field=field_name, max=length))
 
     def pack(self, value: bytes, source_obj):
-        # When packing and unpacking, we use PrimitiveField to avoid the additional processing StringField does
-        length = self._get_length_field_value(source_obj)
-        return StringField('{:d}s'.format(length)).pack(bytes2str(value), source_obj)
+        return self.pack_with_length(value, getattr(source_obj, self._get_length_field_name(type(source_obj))))
+
+    def pack_into(self, buffer, offset, value: bytes, source_obj):
+        return self.pack_into_with_length(buffer, offset, value,
+                                          getattr(source_obj, self._get_length_field_name(type(source_obj))))
 
     def unpack(self, buf, target_cls, other_fields):
+        return self.unpack_with_length(buf, other_fields[self._get_length_field_name(target_cls)])
+
+    async def unpack_async(self, input_stream, target_cls, other_fields):
         length = self._validate_length_value(other_fields[self._get_length_field_name(target_cls)])
-        return PrimitiveField('{:d}s'.format(length)).unpack(buf, target_cls, other_fields)
+        data = bytes(await input_stream.read(length))
+        if len(data) != length:
+            raise struct.error('unpack requires a buffer of {} bytes'.format(length))
+        return data
+
+    def unpack_from(self, buffer, offset, target_cls, other_fields):
+        return self.unpack_from_with_length(buffer, offset, other_fields[self._get_length_field_name(target_cls)])
+
+    def pack_with_length(self, value: bytes, length):
+        """
+        Pack this field, given the value of its length field
+        :param value: The buffer to pack
+        :param length: The value of the length field
+        """
+        length = self._validate_length_value(length)
+        if len(value) == length:
+            # Bytes are returned as is, without copying them
+            return bytes(value)
+        # Like the struct module, shorter buffers are padded with null bytes, and longer ones are truncated
+        return bytes(value[:length]) + b'\x00' * (length - len(value))
+
+    def pack_into_with_length(self, buffer, offset, value: bytes, length):
+        """
+        Pack this field into a writable buffer, given the value of its length field
+        :param buffer: A writable object supporting the buffer protocol
+        :param offset: The offset in the buffer to pack into
+        :param value: The buffer to pack
+        :param length: The value of the length field
+        :return: The offset right after the field
+        """
+        length = self._validate_length_value(length)
+        target = memoryview(buffer).cast('B')
+        if offset + length > len(target):
+            raise struct.error('pack_into requires a buffer of at least {} bytes'.format(offset + length))
+        copied = min(len(value), length)
+        target[offset:offset + copied] = memoryview(value).cast('B')[:copied]
+        target[offset + copied:offset + length] = b'\x00' * (length - copied)
+        return offset + length
+
+    def unpack_with_length(self, buf, length):
+        """
+        Unpack this field, given the value of its length field
+        :param buf: The stream to read from
+        :param length: The value of the length field
+        """
+        length = self._validate_length_value(length)
+        # Streams may reuse the buffers they return, so the data is always copied
+        data = bytes(buf.read(length))
+        if len(data) != length:
+            raise struct.error('unpack requires a buffer of {} bytes'.format(length))
+        return data
+
+    def unpack_from_with_length(self, buffer, offset, length):
+        """
+        Unpack this field from a buffer, given the value of its length field
+        :param buffer: An object supporting the buffer protocol
+        :param offset: The offset in the buffer to unpack from
+        :param length: The value of the length field
+        :return: A tuple of (value, offset right after the field)
+        """
+        length = self._validate_length_value(length)
+        source = memoryview(buffer).cast('B')
+        if offset + length > len(source):
+            raise struct.error('unpack_from requires a buffer of at least {} bytes'.format(offset + length))
+        value = source[offset:offset + length]
+        return (value if self._zero_copy else bytes(value)), offset + length
+
+    def get_dependency_name(self, cls):
+        return cls._fields.get(self._length_field_obj, None)
 
     def _get_length_field_name(self, cls):
         length_field_name = cls._fields.get(self._length_field_obj, None)
@@ -500,6 +894,13 @@ class SequenceField(NonPrimitiveField):
         return struct.pack(self.count_format_string, len(values)) + b''.join(
             self._base_field_obj.pack(value, source_obj) for value in values)
 
+    def pack_into(self, buffer, offset, values, source_obj):
+        struct.pack_into(self.count_format_string, buffer, offset, len(values))
+        offset += struct.calcsize(self.count_format_string)
+        for value in values:
+            offset = self._base_field_obj.pack_into(buffer, offset, value, source_obj)
+        return offset
+
     def unpack(self, buf, target_cls, other_fields):
         values = []
 
@@ -511,6 +912,28 @@ class SequenceField(NonPrimitiveField):
             values.append(value)
         return values
 
+    async def unpack_async(self, input_stream, target_cls, other_fields):
+        values = []
+
+        count_size = struct.calcsize(self.count_format_string)
+        count, = struct.unpack(self.count_format_string, await input_stream.read(count_size))
+
+        for _ in range(count):
+            value = await self._base_field_obj.unpack_async(input_stream, target_cls, other_fields)
+            values.append(value)
+        return values
+
+    def unpack_from(self, buffer, offset, target_cls, other_fields):
+        values = []
+
+        count, = struct.unpack_from(self.count_format_string, buffer, offset)
+        offset += struct.calcsize(self.count_format_string)
+
+        for _ in range(count):
+            value, offset = self._base_field_obj.unpack_from(buffer, offset, target_cls, other_fields)
+            values.append(value)
+        return values, offset
+
 
 class BoolField(PrimitiveField):
     def __init__(self, format_string):
@@ -522,7 +945,7 @@ class BoolField(PrimitiveField):
             raise ValueError('Tried to assign {} to boolean field {}'.format(value, field_name))
 
 
-class CharField(PrimitiveField):
+class CharField(EncodedField, PrimitiveField):
     def __init__(self, format_string):
         assert format_string == 'c'
         super(CharField, self).__init__(format_string)
@@ -535,6 +958,11 @@ class CharField(PrimitiveField):
     def min(self):
         return chr(0)
 
+    def __call__(self, default=None, encoding=None, raw=None):
+        if encoding is not None and not _is_single_byte(encoding):
+            raise ValueError("Chars are a single byte, so they can't be encoded with {}".format(encoding))
+        return super(CharField, self).__call__(default, encoding, raw)
+
     def __getitem__(self, length):
         """
         Creates an array of chars.
@@ -547,19 +975,37 @@ class CharField(PrimitiveField):
     def validate_value(self, obj, value, field_name):
         if value is None:
             return
-        if not isinstance(value, str):
-            raise ValueError('Value {} is not a string'.format(value))
+        if not isinstance(value, self._value_type):
+            raise ValueError('Value {} is not a {}'.format(value, 'bytes' if self._raw else 'string'))
         if len(value) != 1:
             raise ValueError('Expected a 1-length string (a character). Got a string of length {}'.format(len(value)))
+        if self._encoded_length(value) != 1:
+            raise ValueError('{} is encoded to more than a byte with {}'.format(value, self._encoding))
 
-    def pack(self, value, source_obj):
+    def to_values(self, value):
         if isinstance(value, str):
-            value = str2bytes(value)
-        return struct.pack(self.format_string, value)
+            value = self._encode(value)
+        return value,
 
-    def unpack(self, buf, target_cls, other_fields):
-        value, = struct.unpack(self.format_string, buf.read(len(self)))
-        return bytes2str(value)
+    def from_values(self, values):
+        return self._decode(values[0])
+
+
+@functools.lru_cache(maxsize=None)
+def _is_single_byte(encoding):
+    """
+    Check whether an encoding encodes each character to a single byte
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for byte in range(256):
+        decoder.reset()
+        try:
+            # Decoders of multi-byte encodings wait for the rest of a character
+            if decoder.decode(bytes([byte]), final=False) == '':
+                return False
+        except UnicodeDecodeError:
+            pass
+    return True
 
 
 class NoValueField(PrimitiveField):
@@ -573,11 +1019,14 @@ class NoValueField(PrimitiveField):
         if value is not None:
             raise ValueError("Field {} can't be assigned a value. Tried to assign {}".format(field_name, value))
 
-    def pack(self, value, source_obj):
+    @property
+    def values_count(self):
+        return 0
+
+    def to_values(self, value):
         assert value is None
-        return struct.pack(self.format_string)
+        return ()
 
-    def unpack(self, buf, target_cls, other_fields):
-        t = struct.unpack(self.format_string, buf.read(struct.calcsize(self.format_string)))
-        assert len(t) == 0
+    def from_values(self, values):
+        assert len(values) == 0
         return None
@@ -0,0 +1,113 @@
+import struct
+
+from stru.enhanced_struct import Endianess
+
+
+class PrimitiveRun(object):
+    """
+    A run of consecutive primitive fields, packed and unpacked together using a single precompiled struct.Struct
+    """
+
+    def __init__(self, endianess, fields):
+        """
+        :param endianess: The endianess of the struct containing the fields
+        :param fields: A list of (field_obj, field_name) tuples of primitive fields
+        """
+        self.fields = fields
+        self.struct = struct.Struct(endianess + ''.join(field_obj.struct_format for field_obj, _ in fields))
+
+        # Precompute which part of the unpacked tuple belongs to each field
+        self._slices = []
+        index = 0
+        for field_obj, field_name in fields:
+            self._slices.append((field_obj, field_name, slice(index, index + field_obj.values_count)))
+            index += field_obj.values_count
+
+    def __len__(self):
+        return self.struct.size
+
+    def pack(self, obj):
+        values = []
+        for field_obj, field_name in self.fields:
+            values.extend(field_obj.to_values(getattr(obj, field_name)))
+        return self.struct.pack(*values)
+
+    def pack_into(self, buffer, offset, obj):
+        values = []
+        for field_obj, field_name in self.fields:
+            values.extend(field_obj.to_values(getattr(obj, field_name)))
+        self.struct.pack_into(buffer, offset, *values)
+        return offset + self.struct.size
+
+    def unpack(self, input_stream, target_cls, fields_dict):
+        self.set_values(self.struct.unpack(input_stream.read(self.struct.size)), fields_dict)
+
+    async def unpack_async(self, input_stream, target_cls, fields_dict):
+        # The whole run is read at once, so an asyncio stream is awaited once per run rather than once per field
+        self.set_values(self.struct.unpack(await input_stream.read(self.struct.size)), fields_dict)
+
+    def unpack_from(self, buffer, offset, target_cls, fields_dict):
+        self.set_values(self.struct.unpack_from(buffer, offset), fields_dict)
+        return offset + self.struct.size
+
+    def set_values(self, values, fields_dict):
+        """
+        Convert values unpacked by the run's struct to field values
+        :param values: The tuple unpacked by the run's struct
+        :param fields_dict: The dict to set the field values in
+        """
+        for field_obj, field_name, values_slice in self._slices:
+            fields_dict[field_name] = field_obj.from_values(values[values_slice])
+
+
+class NonPrimitiveRun(object):
+    """
+    A run of a single non-primitive field, packed and unpacked by the field itself
+    """
+
+    def __init__(self, field_obj, field_name):
+        self.field_obj = field_obj
+        self.field_name = field_name
+        self.fields = [(field_obj, field_name)]
+
+    def pack(self, obj):
+        return self.field_obj.pack(getattr(obj, self.field_name), obj)
+
+    def pack_into(self, buffer, offset, obj):
+        return self.field_obj.pack_into(buffer, offset, getattr(obj, self.field_name), obj)
+
+    def unpack(self, input_stream, target_cls, fields_dict):
+        fields_dict[self.field_name] = self.field_obj.unpack(input_stream, target_cls, fields_dict)
+
+    async def unpack_async(self, input_stream, target_cls, fields_dict):
+        fields_dict[self.field_name] = await self.field_obj.unpack_async(input_stream, target_cls, fields_dict)
+
+    def unpack_from(self, buffer, offset, target_cls, fields_dict):
+        fields_dict[self.field_name], offset = self.field_obj.unpack_from(buffer, offset, target_cls, fields_dict)
+        return offset
+
+
+def split_to_runs(endianess, fields):
+    """
+    Split the fields of a struct to maximal runs of primitive fields, and runs of single non-primitive fields
+    :param endianess: The endianess of the struct
+    :param fields: An iterable of (field_obj, field_name) tuples, by order
+    :return: A list of PrimitiveRun and NonPrimitiveRun objects
+    """
+    runs = []
+    primitives = []
+    for field_obj, field_name in fields:
+        if field_obj.struct_format is None:
+            if primitives:
+                runs.append(PrimitiveRun(endianess, primitives))
+                primitives = []
+            runs.append(NonPrimitiveRun(field_obj, field_name))
+        else:
+            primitives.append((field_obj, field_name))
+            # Native format aligns fields, so packing them together would add padding between them
+            if endianess == Endianess.Native:
+                runs.append(PrimitiveRun(endianess, primitives))
+                primitives = []
+    if primitives:
+        runs.append(PrimitiveRun(endianess, primitives))
+    return runs
@@ -51,12 +51,14 @@ class FieldType(object):
         return UnionField(selector_field_obj, options_dict)
 
     @staticmethod
-    def Buffer(length_field_obj):
+    def Buffer(length_field_obj, zero_copy=False):
         """
         Define a variable-length buffer field
         :param length_field_obj: The field to use as a length indicator
+        :param zero_copy: Whether unpacking from a buffer (unpack_from(), view(), iter_unpack()...) gives a memoryview
+                          of it, rather than a copy. Unpacking from a stream always copies.
         """
-        return BufferField(length_field_obj)
+        return BufferField(length_field_obj, zero_copy)
 
 
 # This allows convenient use of FieldType as a constructor object
@@ -1,6 +1,9 @@
 from collections import OrderedDict
 
-from stru.field.field import Field
+from stru.codegen import generate_methods
+from stru.field.field import Field, BufferField, UnionField
+from stru.field_run import split_to_runs
+from stru.struct_view import static_length, struct_layout, view_layout
 
 
 class DifferentEndianessException(Exception):
@@ -8,6 +11,30 @@ class DifferentEndianessException(Exception):
 
 
 class MetaStruct(type):
+    def __new__(mcs, name, bases, d):
+        if not d.get('_slots', any(getattr(base, '_slots', False) for base in bases)):
+            return super(MetaStruct, mcs).__new__(mcs, name, bases, d)
+
+        # Slots can't share their names with class attributes, so the fields are taken out of the class namespace
+        fields_by_name = OrderedDict((field_name, field_obj) for base in bases
+                                     for field_obj, field_name in (getattr(base, '_fields', None) or {}).items())
+        fields_by_name.update((field_name, field_obj) for field_name, field_obj in d.items()
+                              if isinstance(field_obj, Field))
+        slotted_names = {slot for base in bases for klass in base.__mro__ for slot in vars(klass).get('__slots__', ())}
+
+        namespace = OrderedDict((k, v) for k, v in d.items() if not isinstance(v, Field))
+        namespace['__slots__'] = tuple(field_name for field_name in fields_by_name.keys()
+                                       if field_name not in slotted_names) + tuple(d.get('__slots__', ()))
+
+        # Each slotted class gets a metaclass of its own, whose data descriptors give the field objects when accessing
+        # them through the class. They take precedence over the slots' member descriptors, while accessing fields
+        # through instances still goes directly to the slots.
+        base_metaclass = mcs if issubclass(mcs, SlottedMetaStruct) else SlottedMetaStruct
+        metaclass = type(base_metaclass)('{}Meta'.format(name), (base_metaclass,),
+                                         {field_name: _class_field(field_obj)
+                                          for field_name, field_obj in fields_by_name.items()})
+        return super(MetaStruct, mcs).__new__(metaclass, name, bases, namespace)
+
     # noinspection PyProtectedMember
     # Accessing base._endianess
     def __init__(cls, name, bases, d):
@@ -32,13 +59,77 @@ class MetaStruct(type):
         cls._fields.update(local_fields)
         cls._defaults += [(field_name, field_obj.default)
                           for field_obj, field_name in local_fields.items() if hasattr(field_obj, 'default')]
+        # cls._fields_by_name is a dict({field_name: field_obj})
+        cls._fields_by_name = {field_name: field_obj for field_obj, field_name in cls._fields.items()}
+        # cls._qualified_names is a dict({field_name: 'ClassName.field_name'}), naming fields in validation errors
+        cls._qualified_names = {field_name: '{}.{}'.format(name, field_name) for field_name in cls._fields.values()}
 
         for field_obj in cls._fields.keys():
             field_obj.endianess = cls._endianess
 
+        # cls._runs is a list of PrimitiveRun and NonPrimitiveRun objects, covering all of the fields by order
+        cls._runs = split_to_runs(cls._endianess, cls._fields.items()) if cls._endianess is not None else None
+
+        # cls._layout is a tuple of FieldLayout, by field order
+        cls._layout = struct_layout(cls) if cls._endianess is not None else None
+        # cls._view_layout is a tuple of (list of _FieldAccess by order, {field name: index}), used by StructView
+        cls._view_layout = view_layout(cls) if cls._endianess is not None else None
+
+        # cls._length is the length of the class' structs, or None if it's variable
+        lengths = [static_length(field_obj) for field_obj in cls._fields.keys()]
+        cls._length = sum(lengths) if None not in lengths else None
+        # cls._length_dependencies is a frozenset of the names of the fields the length of a variable-length struct
+        # depends on, or None if it depends on other values too, in which case the length isn't cached
+        cls._length_dependencies = _length_dependencies(cls) if cls._length is None else frozenset()
+
+        # Structs without endianess can't be created, so they keep the generic methods
+        if cls._endianess is not None:
+            generate_methods(cls)
+
     @classmethod
     def __prepare__(metacls, name, bases):
         return OrderedDict()
 
     def __len__(self):
-        return sum(map(len, self._fields.keys()))
+        if self._length is None:
+            # Raises UnsupportedOperationException for the first variable-length field
+            return sum(map(len, self._fields.keys()))
+        return self._length
+
+
+class SlottedMetaStruct(MetaStruct):
+    """
+    The base of the metaclasses of Struct classes with _slots = True.
+    Each field is stored in a slot of the same name. The metaclass of each class has a property per field, so accessing
+    it through the class gives the field object instead of the slot's member descriptor.
+    """
+
+
+def _class_field(field_obj):
+    """
+    Create a metaclass property giving a field object
+    """
+    return property(lambda cls: field_obj)
+
+
+def _length_dependencies(cls):
+    """
+    Find the fields the length of a variable-length struct depends on
+    :param cls: The Struct class
+    :return: A frozenset of the field names, or None if the length depends on values other than fields' values
+    """
+    dependencies = set()
+    for field_obj in cls._fields.keys():
+        if static_length(field_obj) is not None:
+            continue
+        dependency_name = field_obj.get_dependency_name(cls)
+        if dependency_name is None:
+            return None
+        if isinstance(field_obj, UnionField):
+            # Only unions of fixed-length options get their length from the selector alone
+            if any(static_length(option) is None for option in field_obj.options.values()):
+                return None
+        elif not isinstance(field_obj, BufferField):
+            return None
+        dependencies.add(dependency_name)
+    return frozenset(dependencies)
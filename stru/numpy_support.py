@@ -0,0 +1,144 @@
+"""
+Optional NumPy support - mapping fixed-length Struct classes to equivalent NumPy structured dtypes.
+NumPy is not a dependency of stru, and is only imported once it's used. The functions here raise ImportError if it isn't
+installed.
+"""
+import struct
+
+from stru.enhanced_struct import Endianess
+from stru.field.exceptions import UnsupportedOperationException
+from stru.field.field import (PrimitiveField, PrimitivesArrayField, CharField, CharArrayField, StringField, BoolField,
+                              NoValueField, EmbeddedStructField, SignedNumericField)
+
+# NumPy has no network byte order, and its native byte order never aligns fields
+NUMPY_BYTE_ORDER = {
+    Endianess.Native: '=',
+    Endianess.StandardNative: '=',
+    Endianess.LittleEndian: '<',
+    Endianess.BigEndian: '>',
+    Endianess.Network: '>',
+}
+
+
+def _require_numpy():
+    """
+    Import NumPy, when it's first used rather than when stru is imported
+    :return: The numpy module
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('NumPy is required for this operation, but is not installed') from None
+    return numpy
+
+
+def _primitive_dtype(field_obj, endianess):
+    """
+    The NumPy dtype of a single element of a primitive field
+    """
+    numpy = _require_numpy()
+    if isinstance(field_obj, (CharField, CharArrayField)):
+        return numpy.dtype('S1')
+    if isinstance(field_obj, StringField):
+        return numpy.dtype('S{:d}'.format(len(field_obj)))
+    if isinstance(field_obj, BoolField):
+        return numpy.dtype('?')
+
+    base_field_obj = field_obj.base if isinstance(field_obj, PrimitivesArrayField) else field_obj
+    if isinstance(base_field_obj, BoolField):
+        return numpy.dtype('?')
+    size = struct.calcsize(endianess + base_field_obj.struct_format)
+    if base_field_obj.struct_format in 'fd':
+        kind = 'f'
+    elif isinstance(base_field_obj, SignedNumericField):
+        kind = 'i'
+    else:
+        kind = 'u'
+    return numpy.dtype('{}{}{:d}'.format(NUMPY_BYTE_ORDER[endianess], kind, size))
+
+
+def struct_dtype(cls):
+    """
+    Get the NumPy structured dtype equivalent to a fixed-length Struct class, computed once per class.
+    Pad bytes are left out of the dtype fields, but are kept in the offsets.
+    :param cls: The Struct class
+    :return: A numpy.dtype
+    """
+    # Looked up in the class itself, as a derived class doesn't share the dtype of its base
+    dtype = vars(cls).get('_numpy_dtype', None)
+    if dtype is None:
+        dtype = _struct_dtype(cls)
+        cls._numpy_dtype = dtype
+    return dtype
+
+
+def _struct_dtype(cls):
+    numpy = _require_numpy()
+    # Raises UnsupportedOperationException for variable-length structs
+    length = len(cls)
+
+    names, formats, offsets = [], [], []
+    offset = 0
+    # noinspection PyProtectedMember
+    # Accessing cls._fields
+    for field_obj, field_name in cls._fields.items():
+        if isinstance(field_obj, EmbeddedStructField):
+            field_dtype = struct_dtype(field_obj.base)
+            size = len(field_obj)
+        elif isinstance(field_obj, PrimitiveField):
+            size = struct.calcsize(cls._endianess + field_obj.struct_format)
+            if isinstance(field_obj, NoValueField):
+                offset += size
+                continue
+            field_dtype = _primitive_dtype(field_obj, cls._endianess)
+            if isinstance(field_obj, PrimitivesArrayField):
+                field_dtype = numpy.dtype((field_dtype, (field_obj.count,)))
+        else:
+            raise UnsupportedOperationException('Field {} of type {} has no NumPy equivalent'
+                                                .format(field_name, type(field_obj).__name__))
+        names.append(field_name)
+        formats.append(field_dtype)
+        offsets.append(offset)
+        offset += size
+
+    return numpy.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': length})
+
+
+def from_row(cls, row):
+    """
+    Create a struct from a row of a NumPy structured array
+    :param cls: The Struct class
+    :param row: A row of an array with dtype struct_dtype(cls)
+    """
+    fields_dict = {}
+    record = None
+    # noinspection PyProtectedMember
+    # Accessing cls._fields and cls._endianess
+    for field_obj, field_name in cls._fields.items():
+        if isinstance(field_obj, NoValueField):
+            value = None
+        elif isinstance(field_obj, (CharField, CharArrayField, StringField)):
+            # NumPy strips trailing nulls from bytes values, so the exact bytes are read from the record itself
+            if record is None:
+                record = row.tobytes()
+            field_dtype, offset = row.dtype.fields[field_name][:2]
+            value = field_obj.from_values(struct.unpack(cls._endianess + field_obj.struct_format,
+                                                        record[offset:offset + field_dtype.itemsize]))
+        elif isinstance(field_obj, EmbeddedStructField):
+            value = from_row(field_obj.base, row[field_name])
+        elif isinstance(field_obj, PrimitivesArrayField):
+            value = field_obj.from_values(row[field_name].tolist())
+        else:
+            value = field_obj.from_values((row[field_name].item(),))
+        fields_dict[field_name] = value
+    return cls(**fields_dict)
+
+
+def array_columns(structured_array):
+    """
+    Split a NumPy structured array to a dict of per-field column views. Embedded structs become nested dicts.
+    :param structured_array: An array with a structured dtype, such as the one Struct.unpack_array() returns
+    """
+    return {name: array_columns(structured_array[name]) if structured_array.dtype[name].names is not None
+            else structured_array[name]
+            for name in structured_array.dtype.names}
@@ -0,0 +1,130 @@
+"""
+Parallel unpacking of large files of structs packed back-to-back, using a pool of processes.
+
+The file is split into chunks that start and end on struct boundaries. Boundaries of fixed-length structs are computed
+from their length, and those of variable-length structs are found by scanning the file for the struct offsets, reading
+only the fields their lengths depend on. Each worker process reads and unpacks its own chunks.
+The Struct class is sent to the workers by reference, so it must be importable (defined at a module level).
+"""
+import collections
+import concurrent.futures
+import io
+import itertools
+import mmap
+import os
+import struct
+
+from stru.field.exceptions import UnsupportedOperationException
+from stru.field.field import BufferField, EmbeddedStructField, UnionField, ArrayField
+from stru.record_file import scan_record_offsets
+
+DEFAULT_CHUNK_SIZE = 1 << 22
+
+
+def chunk_boundaries(cls, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Split a file of structs to chunks of about chunk_size bytes, each starting and ending on a struct boundary
+    :param cls: The Struct class
+    :param path: The path of the file
+    :param chunk_size: The approximate size of each chunk
+    :return: A list of (start, end) offsets
+    :raises struct.error: If the file ends in the middle of a struct
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    try:
+        record_length = len(cls)
+    except UnsupportedOperationException:
+        record_length = None
+
+    if record_length is not None:
+        if record_length == 0 or size % record_length != 0:
+            raise struct.error('The size of {} is not a multiple of {} bytes'.format(path, record_length))
+        step = max(1, chunk_size // record_length) * record_length
+        starts = list(range(0, size, step))
+    else:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            offsets, end = scan_record_offsets(cls, mapped)
+        if end != size:
+            raise struct.error('{} ends in the middle of a {} struct'.format(path, cls.__name__))
+        starts = []
+        for offset in offsets:
+            if not starts or offset - starts[-1] >= chunk_size:
+                starts.append(offset)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def parallel_unpack_file(cls, path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, validation=None):
+    """
+    Iterate over the structs in a file, unpacking chunks of it in parallel worker processes
+    :param cls: The Struct class, which must be importable by the workers
+    :param path: The path of the file
+    :param workers: The amount of worker processes. Defaults to the amount of CPUs.
+    :param chunk_size: The approximate amount of bytes each worker unpacks at a time
+    :param validation: A Validation mode for the unpacked values, overriding the class' mode
+    :return: An iterator of structs, by their order in the file
+    """
+    boundaries = chunk_boundaries(cls, path, chunk_size)
+    if not boundaries:
+        return
+    workers = workers if workers is not None else os.cpu_count() or 1
+    remaining = iter(boundaries)
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        # Only a few chunks are submitted ahead of the one consumed, so unconsumed results don't pile up
+        pending = collections.deque(executor.submit(_unpack_chunk, cls, path, start, end, validation)
+                                    for start, end in itertools.islice(remaining, 2 * workers))
+        while pending:
+            structs = pending.popleft().result()
+            next_chunk = next(remaining, None)
+            if next_chunk is not None:
+                pending.append(executor.submit(_unpack_chunk, cls, path, *next_chunk, validation))
+            yield from structs
+
+
+# noinspection PyProtectedMember
+# Accessing cls._fields
+def _unpack_chunk(cls, path, start, end, validation):
+    """
+    Unpack the structs in a chunk of a file. Runs in a worker process.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    try:
+        len(cls)
+    except UnsupportedOperationException:
+        pass
+    else:
+        # Chunks of fixed-length structs are unpacked in bulk
+        return list(cls.iter_unpack(data, validation=validation))
+
+    if any(_is_zero_copy(field_obj) for field_obj in cls._fields.keys()):
+        # Memoryviews can't be sent back to the parent process, so zero-copy buffers are copied by reading the chunk as
+        # a stream
+        return list(cls.iter_file(io.BytesIO(data), validation=validation))
+
+    structs = []
+    offset = 0
+    while offset < len(data):
+        obj, size = cls.unpack_from(data, offset, validation=validation)
+        structs.append(obj)
+        offset += size
+    return structs
+
+
+def _is_zero_copy(field_obj):
+    """
+    Check whether unpacking a field from a buffer may give memoryviews of it
+    """
+    if isinstance(field_obj, BufferField):
+        return field_obj.zero_copy
+    if isinstance(field_obj, EmbeddedStructField):
+        # noinspection PyProtectedMember
+        # Accessing base._fields
+        return any(_is_zero_copy(base_field_obj) for base_field_obj in field_obj.base._fields.keys())
+    if isinstance(field_obj, UnionField):
+        return any(_is_zero_copy(option) for option in field_obj.options.values())
+    if isinstance(field_obj, ArrayField):
+        return _is_zero_copy(field_obj.base)
+    return False
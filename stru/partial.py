@@ -0,0 +1,129 @@
+"""
+Partial unpacking of structs, decoding only selected fields.
+
+Fields that weren't selected are skipped over without decoding them, as long as their length can be told without
+decoding them: fixed-length fields, buffers, and unions of fixed-length options. Buffers are unpacked through a view,
+so skipped fields aren't even copied.
+"""
+import struct
+
+from stru.enhanced_struct import Validation
+from stru.field.field import BufferField, UnionField
+from stru.field_run import PrimitiveRun
+from stru.struct_view import StructView, static_length
+from stru.unpack_stream import UnpackStream
+
+
+# noinspection PyProtectedMember
+# Accessing cls._fields_by_name
+def required_fields(cls, field_names):
+    """
+    Find the fields needed to unpack selected fields
+    :param cls: The Struct class
+    :param field_names: The names of the selected fields
+    :return: A set of the selected fields' names, and of the names of the length and selector fields they depend on
+    """
+    required = set()
+    pending = list(field_names)
+    while pending:
+        field_name = pending.pop()
+        if field_name in required:
+            continue
+        field_obj = cls._fields_by_name.get(field_name, None)
+        if field_obj is None:
+            raise AttributeError("'{}' has no field '{}'".format(cls.__name__, field_name))
+        required.add(field_name)
+        dependency_name = field_obj.get_dependency_name(cls)
+        if dependency_name is not None:
+            pending.append(dependency_name)
+    return required
+
+
+def unpack_fields(cls, input_stream, field_names, validation=None, *args, **kwargs):
+    """
+    Unpack selected fields of a struct. Fields that weren't selected (or needed by the selected ones) are left None.
+    :param cls: The Struct class
+    :param input_stream: An object supporting the buffer protocol, or any input accepted by Struct.unpack
+    :param field_names: The names of the fields to unpack
+    :param validation: A Validation mode for the unpacked values, overriding the class' mode
+    :return: The partially unpacked struct
+    """
+    required = required_fields(cls, field_names)
+    if _supports_buffer_protocol(input_stream):
+        values = _unpack_from_view(cls, input_stream, required)
+    else:
+        values = _unpack_from_stream(cls, UnpackStream.create(input_stream, *args, **kwargs), required)
+    return _create_partial(cls, values, validation)
+
+
+def _supports_buffer_protocol(obj):
+    """
+    Check whether an input is a buffer, unpacked through a view rather than read as a stream
+    """
+    try:
+        memoryview(obj).release()
+    except TypeError:
+        return False
+    return True
+
+
+def _unpack_from_view(cls, buffer, required):
+    view = cls.view(buffer)
+    values = {}
+    for field_name in required:
+        value = view[field_name]
+        values[field_name] = value.to_struct() if isinstance(value, StructView) else value
+    return values
+
+
+# noinspection PyProtectedMember
+# Accessing cls._runs
+def _unpack_from_stream(cls, input_stream, required):
+    """
+    Read an entire struct from a stream, decoding only the required fields, and fields whose length can't be told
+    otherwise. Primitive fields are always decoded, as reading them in a single run costs about as much as skipping
+    them.
+    """
+    fields_dict = {}
+    for run in cls._runs:
+        if isinstance(run, PrimitiveRun) or run.field_name in required:
+            run.unpack(input_stream, cls, fields_dict)
+            continue
+        length = _skipped_length(run.field_obj, cls, fields_dict)
+        if length is None:
+            run.unpack(input_stream, cls, fields_dict)
+        elif len(input_stream.read(length)) != length:
+            raise struct.error('unpack requires a buffer of {} bytes'.format(length))
+    return {field_name: fields_dict[field_name] for field_name in required}
+
+
+def _skipped_length(field_obj, cls, fields_dict):
+    """
+    Get the length of a field from the fields unpacked before it, without unpacking the field
+    :return: The length in bytes, or None if the field has to be unpacked to tell its length
+    """
+    length = static_length(field_obj)
+    if length is not None:
+        return length
+    dependency_name = field_obj.get_dependency_name(cls)
+    if dependency_name is None:
+        return None
+    if isinstance(field_obj, BufferField):
+        # noinspection PyProtectedMember
+        # Validating the length, as unpacking would
+        return field_obj._validate_length_value(fields_dict[dependency_name])
+    if isinstance(field_obj, UnionField):
+        return static_length(field_obj[fields_dict[dependency_name]])
+    return None
+
+
+# noinspection PyProtectedMember
+# Accessing cls._fields_by_name and cls._qualified_names
+def _create_partial(cls, values, validation):
+    obj = cls.__new__(cls)
+    for field_name in cls._fields_by_name.keys():
+        object.__setattr__(obj, field_name, values.get(field_name, None))
+    if (validation if validation is not None else cls._validation) == Validation.Eager:
+        for field_name, value in values.items():
+            cls._fields_by_name[field_name].validate_value(obj, value, cls._qualified_names[field_name])
+    return obj
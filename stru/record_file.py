@@ -0,0 +1,310 @@
+"""
+Random access to files of structs packed back-to-back.
+
+RecordFile serves files of fixed-length structs, whose record offsets are computed from the record length.
+IndexedRecordFile serves files of variable-length structs, whose record offsets are kept in an index sidecar file.
+"""
+import array
+import mmap
+import operator
+import os
+import struct
+import sys
+import zlib
+
+# The index sidecar holds a header, followed by the offset of each record
+INDEX_TYPECODE = 'Q'
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'SIDX'
+INDEX_VERSION = 1
+# The header holds the magic, the version, the amount of offsets, the offset the file was indexed up to, and a checksum
+# of the first and last bytes of the indexed part of the file, which tells if the file was rewritten since
+INDEX_HEADER = struct.Struct('<4sIQQI4x')
+INDEX_CHECKED_BYTES = 4096
+# The approximate amount of bytes of fixed-length records unpacked at a time when iterating over a RecordFile
+ITER_BLOCK_SIZE = 1 << 16
+
+
+class _MappedRecords(object):
+    """
+    The base of read-only sequences of the structs in a memory-mapped file.
+    Once closed, views of its records can't be accessed. Zero-copy buffers of unpacked records remain valid, and keep
+    the file mapped until they're released.
+    """
+
+    def __init__(self, cls, path, validation):
+        self._cls = cls
+        self._validation = validation
+        self._file = open(path, 'rb')
+        self._mmap = b''
+
+    @property
+    def struct_class(self):
+        return self._cls
+
+    def __len__(self):
+        raise NotImplementedError()
+
+    def __getitem__(self, index):
+        self._check_open()
+        if isinstance(index, slice):
+            return [self._unpack(current) for current in range(*index.indices(len(self)))]
+        return self._unpack(self._normalize_index(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            self._check_open()
+            yield self._unpack(index)
+
+    def view(self, index):
+        """
+        Create a lazy, read-only view of a record, without unpacking it
+        :param index: The record index
+        :return: A StructView
+        """
+        self._check_open()
+        return self._cls.view(self._mmap, self._record_offset(self._normalize_index(index)))
+
+    def close(self):
+        self._unmap()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _map(self):
+        """
+        Map the current contents of the file
+        :return: The size of the file
+        """
+        self._unmap()
+        size = os.fstat(self._file.fileno()).st_size
+        # Empty files can't be mapped
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else b''
+        return size
+
+    def _check_open(self):
+        if self._file.closed:
+            raise ValueError('{} records file is closed'.format(self._cls.__name__))
+
+    def _unmap(self):
+        if isinstance(self._mmap, mmap.mmap):
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Zero-copy buffers still export the map, which is unmapped once the last of them is released
+                pass
+        self._mmap = b''
+
+    def _record_offset(self, index):
+        raise NotImplementedError()
+
+    def _normalize_index(self, index):
+        index = operator.index(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('{} record index out of range'.format(self._cls.__name__))
+        return index
+
+    def _unpack(self, index):
+        return self._cls.unpack_from(self._mmap, self._record_offset(index), validation=self._validation)[0]
+
+
+class RecordFile(_MappedRecords):
+    """
+    A read-only sequence of the structs in a file of fixed-length records, backed by a memory map.
+    Only the records accessed are read and unpacked, so reaching any record takes the same time.
+
+    EXAMPLE:
+        with RecordFile(Point, 'points.bin') as points:
+            last = points[-1]
+            some = points[1000000:1000010]
+    """
+
+    def __init__(self, cls, path, validation=None):
+        """
+        :param cls: The Struct class of the records, which must be of fixed length
+        :param path: The path of the file
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        """
+        # Raises UnsupportedOperationException for variable-length structs
+        self._record_length = len(cls)
+        if self._record_length == 0:
+            raise struct.error('RecordFile requires a struct of non-zero length')
+
+        super(RecordFile, self).__init__(cls, path, validation)
+        try:
+            size = self._map()
+            if size % self._record_length != 0:
+                raise struct.error('The size of {} is not a multiple of {} bytes'.format(path, self._record_length))
+        except BaseException:
+            self.close()
+            raise
+        self._count = size // self._record_length
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        self._check_open()
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step == 1 and start < stop:
+                # Contiguous records are unpacked in bulk. The map's buffer is released right away, so it can be closed.
+                with memoryview(self._mmap) as mapped, \
+                        mapped[start * self._record_length:stop * self._record_length] as records:
+                    return list(self._cls.iter_unpack(records, validation=self._validation))
+        return super(RecordFile, self).__getitem__(index)
+
+    def __iter__(self):
+        # Records are unpacked a block at a time, so no buffer of the map is held between them
+        block_count = max(1, ITER_BLOCK_SIZE // self._record_length)
+        for start in range(0, self._count, block_count):
+            yield from self[start:start + block_count]
+
+    def _record_offset(self, index):
+        return index * self._record_length
+
+
+class IndexedRecordFile(_MappedRecords):
+    """
+    A read-only sequence of the structs in a file of variable-length records, backed by a memory map.
+    The offsets of the records are found in one pass over the file, reading only the fields their lengths depend on
+    (such as length and selector fields), and are persisted to an index sidecar file. Once indexed, reaching any
+    record takes the same time.
+    The file is assumed to be append-only. Records appended after the file was indexed are indexed by refresh(), which
+    scans only the appended part of the file. A trailing record that wasn't completely written yet is left out.
+    If the file was truncated or rewritten since it was indexed, or the index sidecar is corrupt, the file is indexed
+    again from the start.
+
+    EXAMPLE:
+        with IndexedRecordFile(Packet, 'capture.bin') as packets:
+            last = packets[-1]
+            packets.refresh()   # Index packets appended since
+    """
+
+    def __init__(self, cls, path, index_path=None, validation=None):
+        """
+        :param cls: The Struct class of the records
+        :param path: The path of the file
+        :param index_path: The path of the index sidecar file. Defaults to the file path, suffixed with INDEX_SUFFIX.
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        """
+        super(IndexedRecordFile, self).__init__(cls, path, validation)
+        self._index_path = index_path if index_path is not None else path + INDEX_SUFFIX
+        try:
+            self._offsets, self._indexed_end, self._checksum = _read_index(self._index_path)
+            self.refresh()
+        except BaseException:
+            self.close()
+            raise
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def refresh(self):
+        """
+        Map the current contents of the file, and index the records appended to it since it was last indexed
+        """
+        size = self._map()
+        unchanged_count = len(self._offsets)
+        # If the file was truncated or rewritten, it's no longer append-only, so it's indexed again from the start
+        rebuild = (self._checksum is None or self._indexed_end > size or
+                   _prefix_checksum(self._mmap, self._indexed_end) != self._checksum)
+        if rebuild:
+            self._offsets, self._indexed_end = array.array(INDEX_TYPECODE), 0
+            unchanged_count = 0
+
+        offsets, offset = scan_record_offsets(self._cls, self._mmap, self._indexed_end)
+        self._offsets.extend(offsets)
+
+        if rebuild or offset != self._indexed_end:
+            self._indexed_end = offset
+            self._checksum = _prefix_checksum(self._mmap, offset)
+            _write_index(self._index_path, self._offsets, self._indexed_end, self._checksum, unchanged_count)
+
+    def _record_offset(self, index):
+        return self._offsets[index]
+
+
+def scan_record_offsets(cls, buffer, offset=0):
+    """
+    Find the offsets of structs packed back-to-back in a buffer, reading only the fields their lengths depend on
+    :param cls: The Struct class
+    :param buffer: An object supporting the buffer protocol
+    :param offset: The offset of the first struct in the buffer
+    :return: A tuple of (array of struct offsets, the offset right after the last complete struct)
+    """
+    offsets = array.array(INDEX_TYPECODE)
+    size = memoryview(buffer).nbytes
+    while offset < size:
+        try:
+            length = len(cls.view(buffer, offset))
+        except struct.error:
+            # The fields the struct length depends on are cut off
+            break
+        if length == 0:
+            raise struct.error('Scanning requires structs of non-zero length')
+        if offset + length > size:
+            break
+        offsets.append(offset)
+        offset += length
+    return offsets, offset
+
+
+def _prefix_checksum(buffer, end):
+    """
+    Compute the checksum of the first and last bytes of the first end bytes of a buffer
+    """
+    checksum = zlib.crc32(buffer[:min(end, INDEX_CHECKED_BYTES)])
+    return zlib.crc32(buffer[max(INDEX_CHECKED_BYTES, end - INDEX_CHECKED_BYTES):end], checksum)
+
+
+def _read_index(index_path):
+    """
+    Read an index sidecar file
+    :return: A tuple of (array of record offsets, the offset the file was indexed up to, checksum of the indexed part).
+             If the sidecar is missing or corrupt, the checksum is None.
+    """
+    offsets = array.array(INDEX_TYPECODE)
+    try:
+        with open(index_path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return offsets, 0, None
+
+    # A sidecar torn by an interrupted write, or of another format, is ignored
+    if len(data) < INDEX_HEADER.size or (len(data) - INDEX_HEADER.size) % offsets.itemsize != 0:
+        return offsets, 0, None
+    magic, version, count, indexed_end, checksum = INDEX_HEADER.unpack_from(data)
+    if magic != INDEX_MAGIC or version != INDEX_VERSION:
+        return offsets, 0, None
+    offsets.frombytes(data[INDEX_HEADER.size:])
+    # Index files are little-endian, so they're portable between machines
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    if len(offsets) != count or (offsets and offsets[-1] >= indexed_end):
+        return array.array(INDEX_TYPECODE), 0, None
+    return offsets, indexed_end, checksum
+
+
+def _write_index(index_path, offsets, indexed_end, checksum, unchanged_count):
+    """
+    Write an index sidecar file. Only the entries after the first unchanged_count offsets are written.
+    The header is written last, so a sidecar torn by an interrupted write doesn't match its header.
+    """
+    entries = array.array(INDEX_TYPECODE, offsets[unchanged_count:])
+    if sys.byteorder == 'big':
+        entries.byteswap()
+
+    mode = 'r+b' if unchanged_count > 0 and os.path.exists(index_path) else 'wb'
+    with open(index_path, mode) as f:
+        f.seek(INDEX_HEADER.size + unchanged_count * entries.itemsize)
+        entries.tofile(f)
+        f.truncate()
+        f.seek(0)
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(offsets), indexed_end, checksum))
@@ -0,0 +1,97 @@
+"""
+Filtering buffers of structs packed back-to-back, without unpacking the structs that don't match.
+
+Predicates are evaluated on the fields they reference alone. Primitive fields at fixed offsets are read directly with
+their precompiled struct.Struct, and other fields are read through a lazy view of the struct. Only matching structs
+are unpacked.
+"""
+import struct
+
+from stru.struct_view import StructView, RelativeOffset
+
+
+class _FieldCheck(object):
+    """
+    Compares a single field of a struct to an expected value
+    """
+
+    def __init__(self, layout, expected):
+        self.field_name = layout.name
+        self.field_obj = layout.field
+        self.expected = expected
+        # Primitive fields at fixed offsets are read without a view
+        direct = layout.format is not None and not isinstance(layout.offset, RelativeOffset)
+        self.struct = struct.Struct(layout.format) if direct else None
+        self.offset = layout.offset if direct else None
+
+
+# noinspection PyProtectedMember
+# Accessing cls._length
+def scan_records(cls, buffer, where, offset=0, views=False, validation=None):
+    """
+    Iterate over the structs in a buffer that match a predicate
+    :param cls: The Struct class
+    :param buffer: An object supporting the buffer protocol, holding structs packed back-to-back
+    :param where: A dict of {field name: value} that matching structs have, or a callable taking a StructView and
+                  returning whether the struct matches
+    :param offset: The offset of the first struct in the buffer
+    :param views: Whether to give a StructView of each matching struct, rather than unpacking it
+    :param validation: A Validation mode for the unpacked values, overriding the class' mode
+    :return: An iterator of the matching structs (or views)
+    :raises struct.error: If the buffer ends in the middle of a struct
+    """
+    if callable(where):
+        checks, predicate = None, where
+    else:
+        layouts = {layout.name: layout for layout in cls.layout()}
+        for field_name in where:
+            if field_name not in layouts:
+                raise AttributeError("'{}' has no field '{}'".format(cls.__name__, field_name))
+        checks, predicate = [_FieldCheck(layouts[name], value) for name, value in where.items()], None
+
+    record_length = cls._length
+    size = memoryview(buffer).nbytes
+    if record_length is not None:
+        if record_length == 0 or (size - offset) % record_length != 0:
+            raise struct.error('scan requires a buffer whose size is a multiple of {} bytes'.format(record_length))
+    return _iter_matches(cls, buffer, offset, size, record_length, checks, predicate, views, validation)
+
+
+def _iter_matches(cls, buffer, offset, size, record_length, checks, predicate, views, validation):
+    while offset < size:
+        view = None
+        if checks is not None:
+            matches = True
+            for check in checks:
+                if check.struct is not None:
+                    value = check.field_obj.from_values(check.struct.unpack_from(buffer, offset + check.offset))
+                else:
+                    if view is None:
+                        view = StructView(cls, buffer, offset)
+                    value = view[check.field_name]
+                    if isinstance(value, StructView):
+                        value = value.to_struct()
+                if value != check.expected:
+                    matches = False
+                    break
+        else:
+            view = StructView(cls, buffer, offset)
+            matches = predicate(view)
+
+        if record_length is not None:
+            length = record_length
+        else:
+            if view is None:
+                view = StructView(cls, buffer, offset)
+            length = len(view)
+            if length == 0:
+                raise struct.error('scan requires structs of non-zero length')
+            if offset + length > size:
+                raise struct.error('The buffer ends in the middle of a {} struct'.format(cls.__name__))
+
+        if matches:
+            if views:
+                yield view if view is not None else StructView(cls, buffer, offset)
+            else:
+                yield cls.unpack_from(buffer, offset, validation=validation)[0]
+        offset += length
@@ -1,13 +1,30 @@
-from stru.enhanced_struct import MissingEndianessException
-from stru.field.field import Field
+import struct
+
+from stru.enhanced_struct import MissingEndianessException, Validation
+from stru.field_run import PrimitiveRun
 from stru.meta_struct import MetaStruct
-from stru.unpack_stream import UnpackStream
+from stru.struct_view import StructView, static_length
+from stru import codegen, columns, numpy_support, parallel, partial, scanning
+from stru.unpack_stream import UnpackStream, AsyncUnpackStream, FileStream
 
 
 class Struct(metaclass=MetaStruct):
+    # The length of a variable-length struct, cached until a field it depends on is assigned
+    __slots__ = ('_cached_length',)
     _endianess = None
+    _slots = False
+    _validation = Validation.Eager
     _fields = None
+    _fields_by_name = None
+    _qualified_names = None
     _defaults = None
+    _runs = None
+    _layout = None
+    _view_layout = None
+    _length = None
+    _length_dependencies = None
+    # The NumPy dtype of the struct, computed when it's first requested
+    _numpy_dtype = None
 
     def __init__(self, **kwargs):
         if self._endianess is None:
@@ -25,7 +42,17 @@ class Struct(metaclass=MetaStruct):
             setattr(self, k, v)
 
     def __len__(self):
-        return sum(field_obj.dynamic_length(self) for field_obj in type(self)._fields.keys())
+        cls = type(self)
+        if cls._length is not None:
+            return cls._length
+        if cls._length_dependencies is None:
+            return sum(field_obj.dynamic_length(self) for field_obj in cls._fields.keys())
+
+        length = getattr(self, '_cached_length', None)
+        if length is None:
+            length = sum(field_obj.dynamic_length(self) for field_obj in cls._fields.keys())
+            object.__setattr__(self, '_cached_length', length)
+        return length
 
     def __eq__(self, other):
         if type(self) != type(other):
@@ -36,28 +63,357 @@ class Struct(metaclass=MetaStruct):
     def __ne__(self, other):
         return not (self == other)
 
-    def pack(self):
-        struct_parts = []
+    def __getstate__(self):
+        """
+        The attributes of the struct, stored either in its __dict__ or in slots, without its cached length
+        """
+        state = dict(getattr(self, '__dict__', {}))
+        for klass in type(self).__mro__:
+            slots = vars(klass).get('__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in ('_cached_length', '__dict__', '__weakref__') and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        # The fields are restored by order, and without validating them again. Restoring them through __setattr__, in
+        # the order of the slots, would validate fields before the fields they depend on (possibly of a base class).
+        cls = type(self)
+        for field_name in cls._fields.values():
+            if field_name in state:
+                object.__setattr__(self, field_name, state[field_name])
+        for name, value in state.items():
+            if name not in cls._fields_by_name:
+                object.__setattr__(self, name, value)
+
+    def validate(self):
+        """
+        Validate the values of all fields, raising the exception of the first invalid one
+        """
+        cls = type(self)
+        for field_obj, field_name in cls._fields.items():
+            field_obj.validate_value(self, getattr(self, field_name), cls._qualified_names[field_name])
 
-        for field_obj, field_name in type(self)._fields.items():
-            packed_value = field_obj.pack(getattr(self, field_name), self)
-            struct_parts.append(packed_value)
+    def pack(self):
+        if self._validation == Validation.AtPack:
+            self.validate()
+        return b''.join([run.pack(self) for run in type(self)._runs])
 
-        return b''.join(struct_parts)
+    def pack_into(self, buffer, offset=0):
+        """
+        Pack the struct directly into a writable buffer, without intermediate allocations
+        :param buffer: A writable object supporting the buffer protocol (bytearray, memoryview, mmap, etc.)
+        :param offset: The offset in the buffer to pack into
+        :return: The offset right after the packed struct
+        """
+        if self._validation == Validation.AtPack:
+            self.validate()
+        for run in type(self)._runs:
+            offset = run.pack_into(buffer, offset, self)
+        return offset
 
     @classmethod
-    def unpack(cls, input_stream, *args, **kwargs):
+    def unpack(cls, input_stream, *args, validation=None, fields=None, **kwargs):
+        """
+        Unpack a struct from a buffer or a stream
+        :param input_stream: bytes, a file object, or a callable taking the amount of bytes to read, followed by *args
+                             and **kwargs. The keyword arguments of unpack() itself (validation, fields) aren't passed
+                             on to the callable.
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        :param fields: The names of the fields to unpack, along with the fields they depend on. The other fields are
+                       left None, and skipped over without decoding them where possible.
+        """
+        if fields is not None:
+            return partial.unpack_fields(cls, input_stream, fields, validation, *args, **kwargs)
         input_stream = UnpackStream.create(input_stream, *args, **kwargs)
         fields_dict = {}
-        for field_obj, field_name in cls._fields.items():
-            value = field_obj.unpack(input_stream, cls, fields_dict)
-            fields_dict.update({field_name: value})
-        return cls(**fields_dict)
+        for run in cls._runs:
+            run.unpack(input_stream, cls, fields_dict)
+        return cls._from_fields(fields_dict, validation)
+
+    @classmethod
+    def pack_many(cls, structs):
+        """
+        Pack structs back-to-back into a single buffer, preallocated to their total length.
+        Calling it on Struct itself packs structs of different classes.
+        :param structs: An iterable of instances of this class (or of classes derived from it)
+        :return: A bytearray of the packed structs
+        """
+        structs = list(structs)
+        # The lengths of fixed-length classes are computed once, rather than once per struct
+        class_lengths = {}
+        # Structs of classes with an explicit pack() are packed by it, and copied into the buffer
+        explicit_pack_classes = set()
+        packed = {}
+        size = 0
+        for index, obj in enumerate(structs):
+            obj_cls = type(obj)
+            if obj_cls not in class_lengths:
+                if not isinstance(obj, cls):
+                    raise TypeError('Expected instances of {}, got {}'.format(cls.__name__, obj_cls.__name__))
+                if codegen.has_explicit_pack(obj_cls):
+                    explicit_pack_classes.add(obj_cls)
+                    class_lengths[obj_cls] = None
+                else:
+                    class_lengths[obj_cls] = static_length(obj_cls)
+            length = class_lengths[obj_cls]
+            if obj_cls in explicit_pack_classes:
+                packed[index] = obj.pack()
+                length = len(packed[index])
+            elif length is None:
+                length = len(obj)
+            size += length
+
+        buffer = bytearray(size)
+        offset = 0
+        for index, obj in enumerate(structs):
+            if index in packed:
+                data = packed[index]
+                buffer[offset:offset + len(data)] = data
+                offset += len(data)
+            else:
+                offset = obj.pack_into(buffer, offset)
+        return buffer
+
+    @classmethod
+    async def unpack_async(cls, input_stream, *args, validation=None, **kwargs):
+        """
+        Unpack a struct from an asynchronous source, such as an asyncio.StreamReader
+        :param input_stream: An asyncio.StreamReader (or any object with a readexactly(amount) coroutine), or a
+                             coroutine function taking the amount of bytes to read, followed by *args and **kwargs.
+                             The validation keyword argument isn't passed on to the coroutine function.
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        :return: The unpacked struct
+        """
+        input_stream = AsyncUnpackStream.create(input_stream, *args, **kwargs)
+        fields_dict = {}
+        for run in cls._runs:
+            await run.unpack_async(input_stream, cls, fields_dict)
+        return cls._from_fields(fields_dict, validation)
+
+    @classmethod
+    def unpack_from(cls, buffer, offset=0, *, validation=None):
+        """
+        Unpack a struct from a buffer, without copying it
+        :param buffer: An object supporting the buffer protocol (bytes, bytearray, memoryview, mmap, array.array...)
+        :param offset: The offset in the buffer to unpack from
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        :return: A tuple of (struct, amount of bytes consumed)
+        """
+        fields_dict = {}
+        end = offset
+        for run in cls._runs:
+            end = run.unpack_from(buffer, end, cls, fields_dict)
+        return cls._from_fields(fields_dict, validation), end - offset
+
+    @classmethod
+    def _from_fields(cls, fields_dict, validation):
+        """
+        Create a struct from unpacked field values
+        :param fields_dict: A dict of {field name: value}, of all fields
+        :param validation: A Validation mode overriding the class' mode, or None to use the class' mode
+        """
+        if validation is None or validation == cls._validation:
+            return cls(**fields_dict)
+        if validation == Validation.Eager:
+            obj = cls(**fields_dict)
+            obj.validate()
+            return obj
+
+        # Values unpacked by the struct module are trusted, so they're set without validation
+        obj = cls.__new__(cls)
+        for field_name, value in fields_dict.items():
+            object.__setattr__(obj, field_name, value)
+        return obj
+
+    @classmethod
+    def layout(cls):
+        """
+        Get the layout of the struct's fields, computed once when the class is created.
+        Offsets are exact up to the first variable-length field. Fields following it have a RelativeOffset, from the end
+        of the last variable-length field preceding them.
+        :return: A tuple of FieldLayout(name, field, offset, size, format), by field order
+        """
+        if cls._layout is None:
+            raise MissingEndianessException("Can't lay out a Struct without endianess")
+        return cls._layout
+
+    @classmethod
+    def view(cls, buffer, offset=0):
+        """
+        Create a lazy, read-only view of a struct packed in a buffer.
+        Fields are unpacked only when they are accessed, and cached from then on.
+        :param buffer: An object supporting the buffer protocol
+        :param offset: The offset of the struct in the buffer
+        :return: A StructView
+        """
+        return StructView(cls, buffer, offset)
+
+    @classmethod
+    def scan(cls, buffer, where, offset=0, *, views=False, validation=None):
+        """
+        Iterate over the structs packed back-to-back in a buffer that match a predicate, reading only the fields the
+        predicate references. Structs that don't match aren't unpacked.
+        :param buffer: An object supporting the buffer protocol
+        :param where: A dict of {field name: value} that matching structs have, or a callable taking a StructView and
+                      returning whether the struct matches
+        :param offset: The offset of the first struct in the buffer
+        :param views: Whether to give a StructView of each matching struct, rather than unpacking it
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        :return: An iterator of the matching structs (or views)
+        """
+        return scanning.scan_records(cls, buffer, where, offset, views, validation)
+
+    @classmethod
+    def iter_unpack(cls, buffer, *, validation=None):
+        """
+        Iterate over structs packed back-to-back in a buffer. Supported only for fixed-length structs.
+        :param buffer: An object supporting the buffer protocol, whose size is a multiple of len(cls)
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        :return: An iterator of structs
+        """
+        record_length = len(cls)
+        if record_length == 0:
+            raise struct.error('iter_unpack requires a struct of non-zero length')
+
+        if len(cls._runs) == 1 and isinstance(cls._runs[0], PrimitiveRun):
+            # The whole struct is one run, so the struct module can do the iteration for us
+            return cls._iter_run_values(cls._runs[0], cls._runs[0].struct.iter_unpack(buffer), validation)
+
+        buffer_length = memoryview(buffer).nbytes
+        if buffer_length % record_length != 0:
+            raise struct.error('iter_unpack requires a buffer of a multiple of {} bytes'.format(record_length))
+        return (cls.unpack_from(buffer, offset, validation=validation)[0]
+                for offset in range(0, buffer_length, record_length))
+
+    @classmethod
+    def unpack_many(cls, buffer, count, *, validation=None):
+        """
+        Unpack structs packed back-to-back at the start of a buffer. Supported only for fixed-length structs.
+        :param buffer: An object supporting the buffer protocol
+        :param count: The amount of structs to unpack
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        :return: A list of structs
+        """
+        size = count * len(cls)
+        view = memoryview(buffer).cast('B')
+        if view.nbytes < size:
+            raise struct.error('unpack_many requires a buffer of at least {} bytes'.format(size))
+        return list(cls.iter_unpack(view[:size], validation=validation)) if count > 0 else []
+
+    @classmethod
+    def iter_file(cls, file_obj, block_size=FileStream.DEFAULT_BLOCK_SIZE, *, validation=None):
+        """
+        Iterate over structs packed back-to-back in a binary file, up to its end.
+        The file is read in blocks into a single reusable buffer, so memory usage stays flat regardless of its size.
+        :param file_obj: A binary file object supporting readinto() (io.RawIOBase, io.BufferedReader, etc.)
+        :param block_size: The minimal amount of bytes to read from the file at once
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        :return: An iterator of structs
+        :raises struct.error: If the file ends in the middle of a struct
+        """
+        stream = FileStream(file_obj, read_ahead=True, block_size=block_size)
+        if len(cls._runs) == 1 and isinstance(cls._runs[0], PrimitiveRun) and len(cls._runs[0]) > 0:
+            yield from cls._iter_file_records(stream, cls._runs[0], block_size, validation)
+            return
+        while not stream.at_eof():
+            yield cls.unpack(stream, validation=validation)
+
+    @classmethod
+    def _iter_file_records(cls, stream, run, block_size, validation):
+        """
+        Iterate over structs of a single run in a file, unpacking a block of them at a time
+        """
+        block_length = max(1, block_size // len(run)) * len(run)
+        while True:
+            data = stream.read(block_length)
+            complete_length = len(data) - len(data) % len(run)
+            yield from cls._iter_run_values(run, run.struct.iter_unpack(data[:complete_length]), validation)
+            if complete_length < len(data):
+                raise struct.error('The file ended in the middle of a {} struct'.format(cls.__name__))
+            if len(data) < block_length:
+                return
+
+    @classmethod
+    def parallel_unpack_file(cls, path, workers=None, chunk_size=parallel.DEFAULT_CHUNK_SIZE, *, validation=None,
+                             stream=False):
+        """
+        Unpack the structs packed back-to-back in a file, using a pool of worker processes.
+        The file is split into chunks on struct boundaries, which are found by scanning it for variable-length structs.
+        The class is sent to the workers by reference, so it must be importable (defined at a module level).
+        :param path: The path of the file
+        :param workers: The amount of worker processes. Defaults to the amount of CPUs.
+        :param chunk_size: The approximate amount of bytes each worker unpacks at a time
+        :param validation: A Validation mode for the unpacked values, overriding the class' mode
+        :param stream: Whether to return an iterator yielding structs as their chunks are unpacked, rather than a list
+        :return: The structs, by their order in the file
+        :raises struct.error: If the file ends in the middle of a struct
+        """
+        structs = parallel.parallel_unpack_file(cls, path, workers, chunk_size, validation)
+        return structs if stream else list(structs)
+
+    @classmethod
+    def numpy_dtype(cls):
+        """
+        Get the NumPy structured dtype equivalent to this struct. Supported only for fixed-length structs.
+        Requires NumPy.
+        """
+        return numpy_support.struct_dtype(cls)
+
+    @classmethod
+    def unpack_array(cls, buffer):
+        """
+        View a buffer of structs packed back-to-back as a NumPy structured array, without copying it.
+        Supported only for fixed-length structs. Requires NumPy.
+        :param buffer: An object supporting the buffer protocol, whose size is a multiple of len(cls)
+        :return: A numpy.ndarray of dtype cls.numpy_dtype()
+        """
+        # noinspection PyProtectedMember
+        numpy = numpy_support._require_numpy()
+        return numpy.frombuffer(buffer, dtype=cls.numpy_dtype())
+
+    @classmethod
+    def from_numpy(cls, rows):
+        """
+        Create structs from rows of a NumPy structured array, such as the one unpack_array() returns
+        :param rows: A structured array, or a single row of one
+        :return: A struct if given a single row, or a list of structs otherwise
+        """
+        if rows.ndim == 0:
+            return numpy_support.from_row(cls, rows)
+        return [numpy_support.from_row(cls, row) for row in rows]
+
+    @classmethod
+    def unpack_columns(cls, buffer, use_numpy=False):
+        """
+        Unpack a buffer of structs packed back-to-back into per-field columns, without creating a struct per record.
+        Supported only for fixed-length structs.
+        :param buffer: An object supporting the buffer protocol, whose size is a multiple of len(cls)
+        :param use_numpy: Whether to return NumPy arrays (requires NumPy), rather than array.array columns
+        :return: A dict of {field name: column}. Embedded structs are given as nested dicts of columns.
+        """
+        if use_numpy:
+            return numpy_support.array_columns(cls.unpack_array(buffer))
+        return columns.unpack_columns(cls, buffer)
+
+    @classmethod
+    def _iter_run_values(cls, run, values_iterator, validation):
+        for values in values_iterator:
+            fields_dict = {}
+            run.set_values(values, fields_dict)
+            yield cls._from_fields(fields_dict, validation)
 
     def __setattr__(self, key, value):
-        field_obj = getattr(type(self), key)
-        if isinstance(field_obj, Field):
-            field_obj.validate_value(self, value, '{}.{}'.format(type(self).__name__, key))
+        cls = type(self)
+        field_obj = cls._fields_by_name.get(key, None)
+        if field_obj is None:
+            # Only existing class attributes may be set
+            getattr(cls, key)
+        else:
+            if cls._validation == Validation.Eager:
+                field_obj.validate_value(self, value, cls._qualified_names[key])
+            if cls._length_dependencies and key in cls._length_dependencies:
+                object.__setattr__(self, '_cached_length', None)
         return super(Struct, self).__setattr__(key, value)
 
     def __delattr__(self, item):
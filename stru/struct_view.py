@@ -0,0 +1,204 @@
+import collections
+import struct
+
+from stru.field.exceptions import UnsupportedOperationException
+from stru.field.field import PrimitiveField, EmbeddedStructField, UnionField, BufferField
+
+
+def static_length(field_obj):
+    """
+    Get the length of a field, if it doesn't depend on the containing object
+    :return: The length in bytes, or None if the field is of variable length
+    """
+    try:
+        return len(field_obj)
+    except UnsupportedOperationException:
+        return None
+
+
+# An offset known only relative to the end of a variable-length field: delta bytes after the end of field_name
+RelativeOffset = collections.namedtuple('RelativeOffset', ('field_name', 'delta'))
+
+
+class FieldLayout(collections.namedtuple('FieldLayout', ('name', 'field', 'offset', 'size', 'format'))):
+    """
+    The location of a field inside its struct, as far as it can be known from the class alone.
+    offset is the offset from the struct start, or a RelativeOffset if a variable-length field precedes the field.
+    size is the field length, or None if it's of variable length.
+    format is the struct module format of primitive fields, with the endianess of the containing struct, or None.
+    """
+    __slots__ = ()
+
+
+# noinspection PyProtectedMember
+# Accessing cls._fields and cls._endianess
+def struct_layout(cls):
+    """
+    Compute the layout of a Struct class
+    :param cls: The Struct class, with endianess
+    :return: A tuple of FieldLayout, by field order
+    """
+    layouts = []
+    offset = 0
+    for field_obj, field_name in cls._fields.items():
+        size = static_length(field_obj)
+        field_format = cls._endianess + field_obj.struct_format if isinstance(field_obj, PrimitiveField) else None
+        layouts.append(FieldLayout(field_name, field_obj, offset, size, field_format))
+        if size is None:
+            offset = RelativeOffset(field_name, 0)
+        elif isinstance(offset, RelativeOffset):
+            offset = RelativeOffset(offset.field_name, offset.delta + size)
+        else:
+            offset += size
+    return tuple(layouts)
+
+
+class _FieldAccess(object):
+    """
+    What a view needs to know to unpack a field
+    """
+
+    def __init__(self, layout, dependency_name):
+        self.field_obj = layout.field
+        self.field_name = layout.name
+        # The offset from the struct start, or None if a variable-length field precedes this field
+        self.offset = layout.offset if not isinstance(layout.offset, RelativeOffset) else None
+        # The field length, or None if it's of variable length
+        self.length = layout.size
+        # The struct.Struct of primitive fields, with the endianess of the containing struct
+        self.struct = struct.Struct(layout.format) if layout.format is not None else None
+        self.dependency_name = dependency_name
+
+
+# noinspection PyProtectedMember
+# Accessing cls._layout
+def view_layout(cls):
+    """
+    Prepare viewing a Struct class
+    :param cls: The Struct class, with its layout computed
+    :return: A tuple of (list of _FieldAccess by order, {field name: index})
+    """
+    layouts = [_FieldAccess(layout, layout.field.get_dependency_name(cls)) for layout in cls._layout]
+    return layouts, {layout.field_name: index for index, layout in enumerate(layouts)}
+
+
+class StructView(object):
+    """
+    A lazy, read-only view of a struct packed in a buffer.
+    A field is unpacked only when it is accessed, and its value is cached from then on.
+    Embedded structs are viewed lazily as well.
+    Fields are accessed as attributes, or by view[field_name]. Fields named like attributes of the view itself (such as
+    to_struct) are only reached by view[field_name].
+    """
+    __slots__ = ('_cls', '_buffer', '_offset', '_layouts', '_indices', '_values', '_offsets')
+
+    def __init__(self, cls, buffer, offset=0):
+        """
+        :param cls: The Struct class to view the buffer as
+        :param buffer: An object supporting the buffer protocol
+        :param offset: The offset of the struct in the buffer
+        """
+        object.__setattr__(self, '_cls', cls)
+        object.__setattr__(self, '_buffer', buffer)
+        object.__setattr__(self, '_offset', offset)
+        # noinspection PyProtectedMember
+        # Accessing cls._view_layout
+        layouts, indices = cls._view_layout
+        object.__setattr__(self, '_layouts', layouts)
+        object.__setattr__(self, '_indices', indices)
+        object.__setattr__(self, '_values', {})
+        # Offsets of fields (from the buffer start) that were computed so far, by field index
+        object.__setattr__(self, '_offsets', {0: offset})
+
+    @property
+    def struct_class(self):
+        return self._cls
+
+    def __getattr__(self, item):
+        if item not in self._indices:
+            raise AttributeError("'{}' view has no field '{}'".format(self._cls.__name__, item))
+        return self[item]
+
+    def __getitem__(self, field_name):
+        try:
+            return self._values[field_name]
+        except KeyError:
+            pass
+        index = self._indices.get(field_name, None)
+        if index is None:
+            raise KeyError("'{}' view has no field '{}'".format(self._cls.__name__, field_name))
+        return self._unpack_field(index)
+
+    def __setattr__(self, key, value):
+        raise AttributeError('{} views are read-only'.format(self._cls.__name__))
+
+    def __delattr__(self, item):
+        raise AttributeError('{} views are read-only'.format(self._cls.__name__))
+
+    def __len__(self):
+        """
+        The length of the viewed struct. Only the fields needed to compute it are unpacked.
+        """
+        return self._field_offset(len(self._layouts)) - self._offset
+
+    def offset_of(self, field_name):
+        """
+        Get the offset of a field in the buffer. Only the fields needed to compute it are unpacked.
+        """
+        return self._field_offset(self._indices[field_name])
+
+    def to_struct(self):
+        """
+        Unpack the entire viewed struct
+        """
+        return self._cls.unpack_from(self._buffer, self._offset)[0]
+
+    def _unpack_field(self, index):
+        layout = self._layouts[index]
+        offset = self._field_offset(index)
+        if isinstance(layout.field_obj, EmbeddedStructField):
+            value = StructView(layout.field_obj.base, self._buffer, offset)
+        elif layout.struct is not None:
+            value = layout.field_obj.from_values(layout.struct.unpack_from(self._buffer, offset))
+        else:
+            value, end = layout.field_obj.unpack_from(self._buffer, offset, self._cls, self)
+            self._offsets[index + 1] = end
+        self._values[layout.field_name] = value
+        return value
+
+    def _field_offset(self, index):
+        """
+        Get the offset of a field in the buffer, by its index. Index len(fields) stands for the struct end.
+        """
+        if index < len(self._layouts) and self._layouts[index].offset is not None:
+            return self._offset + self._layouts[index].offset
+        if index in self._offsets:
+            return self._offsets[index]
+
+        # Walk forward from the closest field whose offset is already known
+        known = index - 1
+        while known not in self._offsets and self._layouts[known].offset is None:
+            known -= 1
+        offset = self._field_offset(known)
+        for current in range(known, index):
+            offset += self._field_length(current, offset)
+            self._offsets[current + 1] = offset
+        return offset
+
+    def _field_length(self, index, offset):
+        layout = self._layouts[index]
+        if layout.length is not None:
+            return layout.length
+        if isinstance(layout.field_obj, BufferField) and layout.dependency_name is not None:
+            # noinspection PyProtectedMember
+            # Validating the length, as unpacking would
+            return layout.field_obj._validate_length_value(self[layout.dependency_name])
+        if isinstance(layout.field_obj, UnionField) and layout.dependency_name is not None:
+            option_length = static_length(layout.field_obj[self[layout.dependency_name]])
+            if option_length is not None:
+                return option_length
+        # The length can't be known without unpacking the field
+        value = self[layout.field_name]
+        if isinstance(layout.field_obj, EmbeddedStructField):
+            return len(value)
+        return self._offsets[index + 1] - offset
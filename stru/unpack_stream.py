@@ -14,6 +14,8 @@ class UnpackStream(object):
     def create(cls, stream_obj, *args, **kwargs):
         if isinstance(stream_obj, cls):
             return stream_obj
+        elif hasattr(stream_obj, 'readinto'):
+            return FileStream(stream_obj, *args, **kwargs)
         elif callable(stream_obj):
             return CallableStream(stream_obj, *args, **kwargs)
         elif isinstance(stream_obj, str):
@@ -62,3 +64,154 @@ class CallableStream(UnpackStream):
     def read(self, amount):
         data = self._get_next(amount, *self._args, **self._kwargs)
         return data
+
+
+class BufferedCallableStream(UnpackStream):
+    """
+    Like CallableStream, but requests large blocks from the callable, and serves reads from an internal buffer.
+    The callable may return fewer bytes than requested (like socket.recv()), and must return an empty buffer on EOF.
+    Bytes left in the buffer after unpacking a struct are kept for the next unpack() given this stream, or can be
+    taken back with tail().
+    """
+    DEFAULT_BLOCK_SIZE = 4096
+
+    def __init__(self, get_next, *args, block_size=DEFAULT_BLOCK_SIZE, **kwargs):
+        super(BufferedCallableStream, self).__init__(*args, **kwargs)
+        self._get_next = get_next
+        self._block_size = block_size
+        self._buff = bytearray()
+        # The offset in the buffer of the first byte that wasn't read yet
+        self._offset = 0
+
+    def read(self, amount):
+        while len(self._buff) - self._offset < amount:
+            data = self._get_next(max(self._block_size, amount - (len(self._buff) - self._offset)),
+                                  *self._args, **self._kwargs)
+            if not data:
+                break
+            # Dropping the read bytes only when refilling, rather than on every read
+            del self._buff[:self._offset]
+            self._offset = 0
+            self._buff += data
+
+        data = bytes(self._buff[self._offset:self._offset + amount])
+        self._offset += len(data)
+        return data
+
+    def tail(self):
+        """
+        Take the bytes that were received from the callable, but weren't read yet
+        """
+        data = bytes(self._buff[self._offset:])
+        self._buff = bytearray()
+        self._offset = 0
+        return data
+
+    def __len__(self):
+        return len(self._buff) - self._offset
+
+
+class FileStream(UnpackStream):
+    """
+    Reads from a binary file object (io.RawIOBase, io.BufferedReader, io.BytesIO, etc.), using readinto() with a single
+    reusable buffer. Reads return memoryviews of the buffer, which are valid only until the next read.
+    With read_ahead, the file is read in blocks of at least block_size bytes, so its position runs ahead of the data
+    read from the stream. Otherwise, exactly the amount of bytes requested are read from the file.
+    """
+    DEFAULT_BLOCK_SIZE = 65536
+
+    def __init__(self, file_obj, *args, read_ahead=False, block_size=DEFAULT_BLOCK_SIZE, **kwargs):
+        super(FileStream, self).__init__(*args, **kwargs)
+        self._file = file_obj
+        self._read_ahead = read_ahead
+        self._block_size = block_size
+        self._buff = bytearray(block_size if read_ahead else 0)
+        self._view = memoryview(self._buff)
+        # The buffered bytes that weren't read yet are self._buff[self._start:self._end]
+        self._start = 0
+        self._end = 0
+
+    def read(self, amount):
+        if self._end - self._start < amount:
+            self._fill(amount)
+        start = self._start
+        self._start = min(start + amount, self._end)
+        return self._view[start:self._start]
+
+    def at_eof(self):
+        """
+        Check whether all of the file was read, reading more of it if needed
+        """
+        if self._start == self._end:
+            self._fill(1)
+        return self._start == self._end
+
+    def _fill(self, amount):
+        """
+        Read from the file until at least amount bytes are buffered, or until the file ends
+        """
+        available = self._end - self._start
+        size = max(amount, self._block_size) if self._read_ahead else amount
+        if size > len(self._buff):
+            # The old buffer isn't resized, as memoryviews of it that were returned may still be alive
+            buff = bytearray(size)
+            buff[:available] = self._view[self._start:self._end]
+            self._buff = buff
+            self._view = memoryview(buff)
+        else:
+            self._view[:available] = self._view[self._start:self._end]
+        self._start, self._end = 0, available
+
+        while self._end < amount:
+            count = self._file.readinto(self._view[self._end:size])
+            if not count:
+                break
+            self._end += count
+
+
+class AsyncUnpackStream(object):
+    """
+    A stream for Struct.unpack_async(), whose read(amount) function is a coroutine
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._args = args
+        self._kwargs = kwargs
+
+    async def read(self, amount):
+        raise NotImplementedError()
+
+    @classmethod
+    def create(cls, stream_obj, *args, **kwargs):
+        if isinstance(stream_obj, cls):
+            return stream_obj
+        elif hasattr(stream_obj, 'readexactly'):
+            return StreamReaderStream(stream_obj, *args, **kwargs)
+        elif callable(stream_obj):
+            return AsyncCallableStream(stream_obj, *args, **kwargs)
+        else:
+            raise TypeError("Can't use object of type {} as asynchronous input stream"
+                            .format(type(stream_obj).__name__))
+
+
+class StreamReaderStream(AsyncUnpackStream):
+    """
+    Reads from an asyncio.StreamReader (or any object with a readexactly(amount) coroutine)
+    """
+
+    def __init__(self, reader, *args, **kwargs):
+        super(StreamReaderStream, self).__init__(*args, **kwargs)
+        self._reader = reader
+
+    async def read(self, amount):
+        # Raises asyncio.IncompleteReadError if the stream ends in the middle of the struct
+        return await self._reader.readexactly(amount)
+
+
+class AsyncCallableStream(AsyncUnpackStream):
+    def __init__(self, get_next, *args, **kwargs):
+        super(AsyncCallableStream, self).__init__(*args, **kwargs)
+        self._get_next = get_next
+
+    async def read(self, amount):
+        return await self._get_next(amount, *self._args, **self._kwargs)
@@ -1,4 +1,5 @@
 from io import BytesIO
+import asyncio
 
 
 # noinspection PyPep8Naming
@@ -92,6 +93,27 @@ class StructTestCase(object):
         self.assertEqual(self.cls.unpack(BytesIO(self.buff).read).pack(), self.buff)
         self.assertEqual(self.cls.unpack(BytesIO(self.obj.pack()).read), self.obj)
 
+    def test_unpack_from(self):
+        for buffer_type in (bytes, bytearray, memoryview):
+            self.assertEqual(self.cls.unpack_from(buffer_type(self.buff)), (self.obj, len(self.buff)))
+            self.assertEqual(self.cls.unpack_from(buffer_type(b'\xaa' * 3 + self.buff + b'\xbb'), 3),
+                             (self.obj, len(self.buff)))
+
+    def test_pack_into(self):
+        for buffer_type in (bytearray, memoryview):
+            buffer = buffer_type(bytearray(len(self.buff) + 4))
+            self.assertEqual(self.obj.pack_into(buffer, 3), len(self.buff) + 3)
+            self.assertEqual(bytes(buffer), b'\x00' * 3 + self.buff + b'\x00')
+
+    def test_unpack_async(self):
+        async def unpack():
+            reader = asyncio.StreamReader()
+            reader.feed_data(self.buff)
+            reader.feed_eof()
+            return await self.cls.unpack_async(reader)
+
+        self.assertEqual(asyncio.run(unpack()), self.obj)
+
     def test_max_min_limits(self):
         for field, _const in self.get_fields():
             self.assertEqual(field.max, _const.MAX)
@@ -0,0 +1,58 @@
+from stru import BufferedCallableStream
+from stru_tests.test_field_runs import Header
+
+from io import BytesIO
+import struct
+import unittest
+
+
+class RecordingSource(object):
+    def __init__(self, buff, max_chunk=None):
+        self._stream = BytesIO(buff)
+        self._max_chunk = max_chunk
+        self.calls = []
+
+    def read(self, amount, *args, **kwargs):
+        self.calls.append((amount, args, kwargs))
+        if self._max_chunk is not None:
+            amount = min(amount, self._max_chunk)
+        return self._stream.read(amount)
+
+
+class BufferedCallableStreamTests(unittest.TestCase):
+    def setUp(self):
+        self.objects = [Header(magic=1, version=2, flags=[3, 4], name='ab', length=2, data=b'xy', crc=5, tag='t'),
+                        Header(magic=6, version=7, flags=[8, 9], name='cd', length=5, data=b'12345', crc=10,
+                               tag='u')]
+        self.buff = b''.join(obj.pack() for obj in self.objects)
+
+    def test_single_block(self):
+        source = RecordingSource(self.buff + b'tail')
+        stream = BufferedCallableStream(source.read, 'arg', key='value')
+        self.assertEqual([Header.unpack(stream) for _ in self.objects], self.objects)
+        # Both structs are served from a single block
+        self.assertEqual(source.calls, [(BufferedCallableStream.DEFAULT_BLOCK_SIZE, ('arg',), {'key': 'value'})])
+        self.assertEqual(stream.tail(), b'tail')
+        self.assertEqual(stream.tail(), b'')
+
+    def test_partial_chunks(self):
+        source = RecordingSource(self.buff, max_chunk=3)
+        stream = BufferedCallableStream(source.read, block_size=8)
+        self.assertEqual([Header.unpack(stream) for _ in self.objects], self.objects)
+        self.assertEqual(len(stream), 0)
+
+    def test_read_larger_than_block(self):
+        source = RecordingSource(self.buff)
+        stream = BufferedCallableStream(source.read, block_size=2)
+        self.assertEqual(stream.read(20), self.buff[:20])
+        self.assertEqual(source.calls[0][0], 20)
+
+    def test_eof(self):
+        stream = BufferedCallableStream(RecordingSource(self.buff[:-1]).read)
+        Header.unpack(stream)
+        with self.assertRaises(struct.error):
+            Header.unpack(stream)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ from stru import (Endianess, FieldType, UnsupportedOperationException,
 from stru.stru_struct import Struct
 from stru_tests.struct_test_case import StructTestCase
 
+import struct
 import unittest
 
 
@@ -13,6 +14,13 @@ class Boo(Struct):
     c = FieldType.Buffer(a)
 
 
+class ZeroCopy(Struct):
+    _endianess = Endianess.Network
+    length = FieldType.WORD
+    data = FieldType.Buffer(length, zero_copy=True)
+    crc = FieldType.BYTE
+
+
 class BuffersTests(StructTestCase, unittest.TestCase):
     def create_target(self):
         obj = Boo(a=4, b=2, c=b'abcd')
@@ -46,6 +54,52 @@ class BuffersWithNullTerminatorsTests(StructTestCase, unittest.TestCase):
         return obj, buff
 
 
+class UndecodableBytesTests(StructTestCase, unittest.TestCase):
+    def create_target(self):
+        # Bytes that are undefined in the 8 bit encoding of strings
+        obj = Boo(a=4, b=2, c=b'\x81\x8d\x8f\x90')
+        buff = b'\x04\x02\x81\x8d\x8f\x90'
+        return obj, buff
+
+
+class ShortBufferTests(unittest.TestCase):
+    def test_padded(self):
+        obj = Boo(a=4, b=2, c=b'ab')
+        self.assertEqual(obj.pack(), b'\x04\x02ab\x00\x00')
+        buffer = bytearray(b'\xff' * 6)
+        obj.pack_into(buffer)
+        self.assertEqual(buffer, b'\x04\x02ab\x00\x00')
+
+    def test_truncated_input(self):
+        with self.assertRaises(struct.error):
+            Boo.unpack(b'\x04\x02abc')
+        with self.assertRaises(struct.error):
+            Boo.unpack_from(b'\x04\x02abc')
+
+
+class ZeroCopyTests(StructTestCase, unittest.TestCase):
+    def create_target(self):
+        obj = ZeroCopy(length=3, data=b'abc', crc=7)
+        buff = b'\x00\x03abc\x07'
+        return obj, buff
+
+    def test_memoryview_result(self):
+        buffer = bytearray(self.buff)
+        obj, _ = ZeroCopy.unpack_from(buffer)
+        self.assertIsInstance(obj.data, memoryview)
+        self.assertEqual(obj.data, b'abc')
+        # The value is a view of the buffer, not a copy
+        buffer[2] = ord('x')
+        self.assertEqual(obj.data, b'xbc')
+        self.assertEqual(obj.pack(), b'\x00\x03xbc\x07')
+
+    def test_stream_copies(self):
+        self.assertIsInstance(ZeroCopy.unpack(self.buff).data, bytes)
+
+    def test_view(self):
+        self.assertIsInstance(ZeroCopy.view(self.buff).data, memoryview)
+
+
 class BufferExceptionsTests(unittest.TestCase):
     def test_invalid_length(self):
         with self.assertRaises(DependencyInvalidValueException):
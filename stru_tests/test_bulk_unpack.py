@@ -0,0 +1,67 @@
+from stru import Struct, Endianess, FieldType, UnsupportedOperationException
+from stru_tests.test_embedded_structs import Inner1
+
+import struct
+import unittest
+
+
+class Sample(Struct):
+    _endianess = Endianess.BigEndian
+    timestamp = FieldType.QWORD
+    channel = FieldType.BYTE
+    flags = FieldType.Bool[3]
+    value = FieldType.Double
+    label = FieldType.String[4]
+
+
+class Nested(Struct):
+    _endianess = Endianess.LittleEndian
+    a = FieldType.WORD
+    inner = FieldType.Struct(Inner1)
+
+
+class Variable(Struct):
+    _endianess = Endianess.LittleEndian
+    length = FieldType.BYTE
+    data = FieldType.Buffer(length)
+
+
+class BulkUnpackTests(unittest.TestCase):
+    def setUp(self):
+        self.samples = [Sample(timestamp=i, channel=i % 4, flags=[True, False, i % 2 == 0], value=i / 2,
+                               label='s{}'.format(i)) for i in range(10)]
+        self.buff = b''.join(sample.pack() for sample in self.samples)
+
+    def test_iter_unpack(self):
+        self.assertEqual(list(Sample.iter_unpack(self.buff)), self.samples)
+        self.assertEqual(list(Sample.iter_unpack(bytearray(self.buff))), self.samples)
+        self.assertEqual(list(Sample.iter_unpack(b'')), [])
+
+    def test_unpack_many(self):
+        self.assertEqual(Sample.unpack_many(self.buff, 10), self.samples)
+        self.assertEqual(Sample.unpack_many(memoryview(self.buff), 3), self.samples[:3])
+        self.assertEqual(Sample.unpack_many(self.buff, 0), [])
+
+    def test_multiple_runs(self):
+        objects = [Nested(a=i, inner=Inner1(a=-i, b=True)) for i in range(5)]
+        buff = b''.join(obj.pack() for obj in objects)
+        self.assertEqual(list(Nested.iter_unpack(buff)), objects)
+        self.assertEqual(Nested.unpack_many(buff + b'\x00', 4), objects[:4])
+
+    def test_invalid_buffer_size(self):
+        with self.assertRaises(struct.error):
+            list(Sample.iter_unpack(self.buff[:-1]))
+        with self.assertRaises(struct.error):
+            list(Nested.iter_unpack(b'\x00' * (len(Nested) + 1)))
+        with self.assertRaises(struct.error):
+            Sample.unpack_many(self.buff, 11)
+
+    def test_variable_length(self):
+        with self.assertRaises(UnsupportedOperationException):
+            Variable.iter_unpack(b'\x01a')
+        with self.assertRaises(UnsupportedOperationException):
+            Variable.unpack_many(b'\x01a', 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
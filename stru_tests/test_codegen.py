@@ -0,0 +1,157 @@
+from stru import Struct, Endianess, FieldType, Validation
+from stru.codegen import GENERATED_MARKER
+from stru_tests.test_field_runs import Header
+from stru_tests.test_unions import Onion, MyWord
+
+import struct
+import unittest
+
+
+class Checksummed(Struct):
+    _endianess = Endianess.BigEndian
+    a = FieldType.WORD
+
+    def pack(self):
+        return super().pack() + b'\xff'
+
+
+class DerivedChecksummed(Checksummed):
+    b = FieldType.WORD
+
+
+class Outer(Struct):
+    _endianess = Endianess.BigEndian
+    inner = FieldType.Struct(Checksummed)
+    b = FieldType.BYTE
+
+
+class Base(Struct):
+    _endianess = Endianess.LittleEndian
+    a = FieldType.WORD
+
+
+class Overriding(Base):
+    b = FieldType.WORD(default=7)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+    def pack(self):
+        return super().pack()
+
+    def pack_into(self, buffer, offset=0):
+        return super().pack_into(buffer, offset)
+
+    @classmethod
+    def unpack(cls, input_stream, *args, **kwargs):
+        return super().unpack(input_stream, *args, **kwargs)
+
+    @classmethod
+    def unpack_from(cls, buffer, offset=0, *, validation=None):
+        return super().unpack_from(buffer, offset, validation=validation)
+
+
+class Defaulted(Struct):
+    _endianess = Endianess.LittleEndian
+    length = FieldType.BYTE(default=2)
+    data = FieldType.Buffer(length)
+    invalid = FieldType.BYTE(default=256)
+
+
+class Recording(Struct):
+    _endianess = Endianess.LittleEndian
+    a = FieldType.BYTE(default=1)
+    b = FieldType.BYTE
+
+    def __setattr__(self, key, value):
+        object.__setattr__(self, 'assigned', getattr(self, 'assigned', []) + [key])
+        super().__setattr__(key, value)
+
+
+class Shadowing(Struct):
+    _endianess = Endianess.LittleEndian
+    _validation = Validation.Eager
+    _eager = FieldType.BYTE
+    _validate = FieldType.BYTE
+    _object_setattr = FieldType.BYTE(default=3)
+    self = FieldType.BYTE
+    kwargs = FieldType.BYTE
+
+
+class CodegenTests(unittest.TestCase):
+    def test_methods_generated(self):
+        for cls in (Header, Onion):
+            self.assertTrue(getattr(cls.__init__, GENERATED_MARKER))
+            self.assertTrue(getattr(cls.pack, GENERATED_MARKER))
+            self.assertTrue(getattr(cls.unpack.__func__, GENERATED_MARKER))
+        self.assertFalse(hasattr(Struct.pack, GENERATED_MARKER))
+
+    def test_same_as_generic(self):
+        objects = [Header(magic=1, version=2, flags=[3, 4], name='ab', length=2, data=b'xy', crc=5, tag='t'),
+                   Onion(a=-10, b='ab', c=0xFF, d=[1, 2, 3]),
+                   Onion(a=1, b=400, c=1, d=MyWord(a=2))]
+        for obj in objects:
+            cls = type(obj)
+            buff = Struct.pack(obj)
+            self.assertEqual(obj.pack(), buff)
+            self.assertEqual(cls.unpack(buff), Struct.unpack.__func__(cls, buff))
+
+    def test_explicit_methods_kept(self):
+        self.assertFalse(hasattr(Checksummed.pack, GENERATED_MARKER))
+        self.assertIs(DerivedChecksummed.pack, Checksummed.pack)
+        self.assertEqual(DerivedChecksummed(a=1, b=2).pack(), b'\x00\x01\x00\x02\xff')
+
+    def test_pack_into_follows_explicit_pack(self):
+        obj = Outer(inner=Checksummed(a=1), b=2)
+        self.assertEqual(obj.pack(), b'\x00\x01\xff\x02')
+        buff = bytearray(5)
+        self.assertEqual(obj.pack_into(buff, 1), 5)
+        self.assertEqual(buff, b'\x00\x00\x01\xff\x02')
+        with self.assertRaises(struct.error):
+            Checksummed(a=1).pack_into(bytearray(2))
+
+    def test_super_reaches_base_methods(self):
+        # The base class' generated methods fall back to the generic ones for the derived class' fields
+        obj = Overriding(a=1)
+        self.assertEqual(obj.b, 7)
+        obj.b = 2
+        self.assertEqual(obj.pack(), b'\x01\x00\x02\x00')
+        buff = bytearray(4)
+        self.assertEqual(obj.pack_into(buff), 4)
+        self.assertEqual(buff, b'\x01\x00\x02\x00')
+        self.assertEqual(Overriding.unpack(b'\x01\x00\x02\x00'), obj)
+        self.assertEqual(Overriding.unpack_from(b'\x01\x00\x02\x00'), (obj, 4))
+        self.assertEqual(Base(a=1).pack(), b'\x01\x00')
+
+    def test_init_assigns_by_order(self):
+        # The buffer is validated after its length field, regardless of the keyword arguments order
+        obj = Defaulted(data=b'xy', invalid=1)
+        self.assertEqual((obj.length, obj.data, obj.invalid), (2, b'xy', 1))
+        with self.assertRaises(ValueError):
+            Defaulted(data=b'xyz', invalid=1)
+
+    def test_init_invalid_default(self):
+        with self.assertRaises(ValueError):
+            Defaulted()
+
+    def test_init_unknown_keyword(self):
+        with self.assertRaises(AttributeError):
+            Header(not_a_field=1)
+
+    def test_init_custom_setattr(self):
+        self.assertEqual(Recording(b=2).assigned, ['a', 'b'])
+
+    def test_init_positional(self):
+        with self.assertRaises(TypeError):
+            Header(1)
+
+    def test_init_fields_named_like_locals(self):
+        obj = Shadowing(_eager=1, _validate=2, self=4, kwargs=5)
+        self.assertEqual((obj._eager, obj._validate, obj._object_setattr, obj.self, obj.kwargs), (1, 2, 3, 4, 5))
+        self.assertEqual(Shadowing.unpack(obj.pack()), obj)
+        with self.assertRaises(ValueError):
+            Shadowing(_eager=256)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+from stru import Struct, Endianess, FieldType, UnsupportedOperationException
+from stru_tests.test_bulk_unpack import Sample, Nested, Variable
+from stru_tests.test_embedded_structs import Inner1
+
+import array
+import struct
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Telemetry(Struct):
+    _endianess = Endianess.LittleEndian
+    device_id = FieldType.WORD
+    pad = FieldType.PadByte
+    temperature = FieldType.Float
+    status = FieldType.Char
+
+
+class NativeTelemetry(Struct):
+    _endianess = Endianess.Native
+    a = FieldType.BYTE
+    b = FieldType.DWORD
+
+
+class ColumnsTests(unittest.TestCase):
+    def setUp(self):
+        self.records = [Telemetry(device_id=i, temperature=i * 1.5, status='ok'[i % 2]) for i in range(6)]
+        self.buff = b''.join(record.pack() for record in self.records)
+
+    def test_unpack_columns(self):
+        columns = Telemetry.unpack_columns(self.buff)
+        self.assertEqual(list(columns), ['device_id', 'temperature', 'status'])
+        self.assertEqual(columns['device_id'], array.array('H', range(6)))
+        self.assertEqual(columns['temperature'], array.array('f', [i * 1.5 for i in range(6)]))
+        self.assertEqual(columns['status'], ['o', 'k'] * 3)
+
+    def test_columns_match_records(self):
+        samples = [Sample(timestamp=i, channel=i % 4, flags=[True, False, i % 2 == 0], value=i / 2,
+                          label='s{}'.format(i)) for i in range(5)]
+        columns = Sample.unpack_columns(b''.join(sample.pack() for sample in samples))
+        for field_name in ('timestamp', 'channel', 'flags', 'value', 'label'):
+            self.assertEqual(list(columns[field_name]), [getattr(sample, field_name) for sample in samples])
+
+    def test_embedded(self):
+        objects = [Nested(a=i, inner=Inner1(a=-i, b=i % 2 == 0)) for i in range(4)]
+        columns = Nested.unpack_columns(b''.join(obj.pack() for obj in objects))
+        self.assertEqual(columns['a'], array.array('H', range(4)))
+        self.assertEqual(columns['inner']['a'], array.array('l', [0, -1, -2, -3]))
+        self.assertEqual(columns['inner']['b'], [True, False, True, False])
+
+    def test_native(self):
+        objects = [NativeTelemetry(a=i, b=i * 1000) for i in range(3)]
+        columns = NativeTelemetry.unpack_columns(b''.join(obj.pack() for obj in objects))
+        self.assertEqual(columns['b'], array.array('L', [0, 1000, 2000]))
+
+    def test_empty(self):
+        self.assertEqual(Telemetry.unpack_columns(b''), {'device_id': array.array('H'),
+                                                         'temperature': array.array('f'),
+                                                         'status': []})
+
+    def test_invalid_buffer_size(self):
+        with self.assertRaises(struct.error):
+            Telemetry.unpack_columns(self.buff[:-1])
+
+    def test_variable_length(self):
+        with self.assertRaises(UnsupportedOperationException):
+            Variable.unpack_columns(b'\x01a')
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        columns = Telemetry.unpack_columns(self.buff, use_numpy=True)
+        self.assertEqual(columns['device_id'].tolist(), list(range(6)))
+        self.assertEqual(columns['temperature'].tolist(), [i * 1.5 for i in range(6)])
+
+        objects = [Nested(a=i, inner=Inner1(a=-i, b=True)) for i in range(4)]
+        columns = Nested.unpack_columns(b''.join(obj.pack() for obj in objects), use_numpy=True)
+        self.assertEqual(columns['inner']['a'].tolist(), [0, -1, -2, -3])
+
+
+if __name__ == '__main__':
+    unittest.main()
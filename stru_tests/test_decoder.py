@@ -0,0 +1,113 @@
+from stru import Struct, Endianess, FieldType, StructDecoder, Validation
+from stru.field import DependencyInvalidValueException
+from stru_tests.test_field_runs import Header
+from stru_tests.test_unpack_async import Versioned
+
+import struct
+import unittest
+
+
+class Fixed(Struct):
+    _endianess = Endianess.BigEndian
+    a = FieldType.WORD
+    b = FieldType.BYTE
+
+
+class Named(Struct):
+    _endianess = Endianess.BigEndian
+    a = FieldType.BYTE
+    name = FieldType.String[2]
+
+
+class DecoderTests(unittest.TestCase):
+    def setUp(self):
+        self.objects = [Header(magic=1, version=2, flags=[3, 4], name='ab', length=2, data=b'xy', crc=5, tag='t'),
+                        Header(magic=6, version=7, flags=[8, 9], name='cd', length=0, data=b'', crc=10, tag='u'),
+                        Header(magic=11, version=12, flags=[13, 14], name='ef', length=5, data=b'12345', crc=15,
+                               tag='v')]
+        self.buff = b''.join(obj.pack() for obj in self.objects)
+
+    def _feed_chunks(self, decoder, buff, chunk_size):
+        decoded = []
+        for index in range(0, len(buff), chunk_size):
+            decoded += decoder.feed(buff[index:index + chunk_size])
+        return decoded
+
+    def test_single_chunk(self):
+        decoder = StructDecoder(Header)
+        self.assertEqual(decoder.feed(self.buff), self.objects)
+        self.assertFalse(decoder.in_progress)
+        decoder.close()
+
+    def test_chunk_sizes(self):
+        for chunk_size in (1, 2, 3, 7, 16):
+            decoder = StructDecoder(Header)
+            self.assertEqual(self._feed_chunks(decoder, self.buff, chunk_size), self.objects)
+            self.assertEqual(decoder.pending, 0)
+
+    def test_resumes_mid_buffer(self):
+        first = self.objects[0].pack()
+        decoder = StructDecoder(Header)
+        # Split in the middle of the buffer, right after its length field was read
+        self.assertEqual(decoder.feed(first[:15]), [])
+        self.assertTrue(decoder.in_progress)
+        self.assertEqual(decoder.pending, 15)
+        self.assertEqual(decoder.feed(first[15:] + b'\x06'), [self.objects[0]])
+        self.assertEqual(decoder.pending, 1)
+
+    def test_fixed_length(self):
+        decoder = StructDecoder(Fixed)
+        self.assertEqual(decoder.feed(b'\x00\x01\x02\x00'), [Fixed(a=1, b=2)])
+        self.assertEqual(decoder.pending, 1)
+        self.assertEqual(decoder.feed(b'\x03\x04\x00\x05\x06'), [Fixed(a=3, b=4), Fixed(a=5, b=6)])
+
+    def test_union(self):
+        objects = [Versioned(version=1, data=2), Versioned(version=2, data=self.objects[0])]
+        decoder = StructDecoder(Versioned, validation=Validation.Trusted)
+        self.assertEqual(self._feed_chunks(decoder, b''.join(obj.pack() for obj in objects), 3), objects)
+
+    def test_close_incomplete(self):
+        decoder = StructDecoder(Header)
+        decoder.feed(self.buff[:-1])
+        with self.assertRaises(struct.error):
+            decoder.close()
+
+    def test_invalid_struct(self):
+        decoder = StructDecoder(Versioned)
+        with self.assertRaises(DependencyInvalidValueException):
+            decoder.feed(b'\x03')
+        # Decoding continues with the next struct
+        self.assertEqual(decoder.feed(b'\x01\x00\x02'), [Versioned(version=1, data=2)])
+
+    def test_invalid_struct_after_complete_ones(self):
+        decoder = StructDecoder(Versioned)
+        # The structs completed before the invalid one are returned, and its exception is raised by the next call
+        self.assertEqual(decoder.feed(b'\x01\x00\x05\x09\x09'), [Versioned(version=1, data=5)])
+        self.assertEqual(decoder.pending, 1)
+        with self.assertRaises(DependencyInvalidValueException):
+            decoder.feed(b'\x01')
+        # The invalid struct's byte was dropped, so the next one is decoded as a struct start
+        self.assertEqual(decoder.pending, 2)
+        with self.assertRaises(DependencyInvalidValueException):
+            decoder.feed(b'\x00\x07')
+        self.assertEqual(decoder.feed(b''), [Versioned(version=1, data=7)])
+        self.assertFalse(decoder.in_progress)
+
+    def test_close_raises_pending_error(self):
+        decoder = StructDecoder(Versioned)
+        decoder.feed(b'\x01\x00\x05\x09')
+        with self.assertRaises(DependencyInvalidValueException):
+            decoder.close()
+        decoder.close()
+
+    def test_invalid_fixed_length(self):
+        decoder = StructDecoder(Named)
+        with self.assertRaises(UnicodeDecodeError):
+            decoder.feed(b'\x01\x81a')
+        # The whole invalid struct is dropped
+        self.assertEqual(decoder.pending, 0)
+        self.assertEqual(decoder.feed(b'\x02ab'), [Named(a=2, name='ab')])
+
+
+if __name__ == '__main__':
+    unittest.main()
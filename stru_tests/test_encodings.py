@@ -0,0 +1,94 @@
+from stru import Struct, Endianess, FieldType
+from stru.field.field import INTERN_CACHE_SIZE
+from stru_tests.struct_test_case import StructTestCase
+
+import unittest
+
+
+class Encoded(Struct):
+    _endianess = Endianess.LittleEndian
+    name = FieldType.String[8](encoding='utf-8')
+    raw_name = FieldType.String[4](raw=True)
+    device = FieldType.String[4](intern=True)
+    grade = FieldType.Char(encoding='latin-1')
+    wide = FieldType.String[7](encoding='utf-16-le')
+    raw_grade = FieldType.Char(raw=True)
+    tag = FieldType.Char[3](raw=True)
+
+
+class EncodingsTests(StructTestCase, unittest.TestCase):
+    def create_target(self):
+        obj = Encoded(name='héllo', raw_name=b'\x81b', device='dev', grade='é', wide='\u0100b',
+                      raw_grade=b'\xff', tag=[b'a', b'b', b'\x00'])
+        buff = ('héllo'.encode('utf-8') + b'\x00\x00' b'\x81b\x00\x00' b'dev\x00' b'\xe9'
+                b'\x00\x01b\x00\x00\x00\x00' b'\xff' b'ab\x00')
+        return obj, buff
+
+    def test_encoding_attribute(self):
+        self.assertEqual(Encoded.name.encoding, 'utf-8')
+        self.assertIsNone(Encoded.raw_name.encoding)
+        self.assertEqual(Encoded.device.encoding, 'cp1252')
+
+    def test_encoded_length_validated(self):
+        self.obj.name = 'é' * 4
+        with self.assertRaises(ValueError):
+            # 9 characters would fit in a single byte encoding, but take 10 bytes in utf-8
+            self.obj.name = 'é' * 5
+
+    def test_multi_byte_terminator(self):
+        # Null bytes inside characters aren't terminators
+        field = FieldType.String[8](encoding='utf-16-le')
+        self.assertEqual(field.from_values(('a\u0100'.encode('utf-16-le') + b'\x00\x00\x00\x00',)), 'a\u0100')
+        self.assertEqual(FieldType.String[8](encoding='utf-16').from_values(('ab'.encode('utf-16') + b'\x00\x00',)),
+                         'ab')
+        self.assertEqual(FieldType.String[4](encoding='utf-7').from_values((b'a+-\x00',)), 'a+')
+
+    def test_raw_untouched(self):
+        value = b'a\x00bc'
+        self.assertIs(FieldType.String[4](raw=True).from_values((value,)), value)
+        # Only the padding is trimmed, as packing pads the value back
+        self.assertEqual(FieldType.String[4](raw=True).from_values((b'a\x00b\x00',)), b'a\x00b')
+
+    def test_raw_unpadded_round_trip(self):
+        self.obj.raw_name = b'a'
+        self.assertEqual(Encoded.unpack(self.obj.pack()), self.obj)
+
+    def test_multi_byte_char_encodings(self):
+        for encoding in ('utf-8', 'utf-16-le'):
+            with self.assertRaises(ValueError):
+                FieldType.Char(encoding=encoding)
+            with self.assertRaises(ValueError):
+                FieldType.Char[4](encoding=encoding)
+        self.assertEqual(FieldType.Char(encoding='cp437').encoding, 'cp437')
+
+    def test_char_encoded_length_validated(self):
+        with self.assertRaises(UnicodeEncodeError):
+            self.obj.grade = '\u20ac'
+
+    def test_raw_types(self):
+        with self.assertRaises(TypeError):
+            self.obj.raw_name = 'ab'
+        with self.assertRaises(TypeError):
+            self.obj.name = b'ab'
+        with self.assertRaises(ValueError):
+            self.obj.raw_grade = 'a'
+        with self.assertRaises(ValueError):
+            self.obj.tag = b'abcd'
+        self.obj.tag = b'xyz'
+        self.assertEqual(self.obj.pack()[-3:], b'xyz')
+
+    def test_interned(self):
+        first, second = self.cls.unpack(self.buff), self.cls.unpack(self.buff)
+        self.assertIs(first.device, second.device)
+        self.assertIsNot(first.name, second.name)
+
+    def test_intern_cache_bounded(self):
+        field = FieldType.String[8](intern=True)
+        for index in range(INTERN_CACHE_SIZE + 10):
+            field.from_values(('{:d}'.format(index).encode(),))
+        self.assertEqual(field.from_values((b'99999',)), '99999')
+        self.assertEqual(len(field._intern_cache), INTERN_CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
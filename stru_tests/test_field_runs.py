@@ -0,0 +1,62 @@
+from stru import Struct, Endianess, FieldType
+from stru.field_run import PrimitiveRun, NonPrimitiveRun
+from stru_tests.struct_test_case import StructTestCase
+
+import struct
+import unittest
+
+
+class Header(Struct):
+    _endianess = Endianess.LittleEndian
+    magic = FieldType.DWORD
+    version = FieldType.WORD
+    flags = FieldType.BYTE[2]
+    pad = FieldType.PadByte
+    name = FieldType.String[3]
+    length = FieldType.WORD
+    data = FieldType.Buffer(length)
+    crc = FieldType.WORD
+    tag = FieldType.Char
+
+
+class NativeHeader(Struct):
+    _endianess = Endianess.Native
+    a = FieldType.BYTE
+    b = FieldType.DWORD
+
+
+class FieldRunsTests(StructTestCase, unittest.TestCase):
+    def create_target(self):
+        obj = Header(magic=1, version=2, flags=[3, 4], name='ab', length=2, data=b'xy', crc=5, tag='t')
+        buff = (b'\x01\x00\x00\x00' b'\x02\x00' b'\x03\x04' b'\x00' b'ab\x00' b'\x02\x00' b'xy'
+                b'\x05\x00' b't')
+        return obj, buff
+
+    def test_lengths(self):
+        self.assertEqual(len(self.obj), len(self.buff))
+
+    def test_runs(self):
+        self.assertEqual([type(run) for run in Header._runs], [PrimitiveRun, NonPrimitiveRun, PrimitiveRun])
+        self.assertEqual([field_name for _, field_name in Header._runs[0].fields],
+                         ['magic', 'version', 'flags', 'pad', 'name', 'length'])
+        self.assertEqual(Header._runs[0].struct.format, '<LH2Bx3sH')
+        self.assertEqual(len(Header._runs[0]), 14)
+
+    def test_single_read_per_run(self):
+        amounts = []
+
+        def read(amount):
+            amounts.append(amount)
+            data = self.buff[sum(amounts) - amount:sum(amounts)]
+            return data
+
+        self.assertEqual(Header.unpack(read), self.obj)
+        self.assertEqual(amounts, [14, 2, 3])
+
+    def test_native_fields_not_coalesced(self):
+        self.assertEqual(len(NativeHeader._runs), 2)
+        self.assertEqual(NativeHeader(a=1, b=2).pack(), struct.pack('@B', 1) + struct.pack('@L', 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
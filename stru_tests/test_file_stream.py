@@ -0,0 +1,84 @@
+from stru import Struct, Endianess, FieldType
+from stru.unpack_stream import FileStream
+from stru_tests.test_field_runs import Header
+
+import io
+import struct
+import unittest
+
+
+class Sample(Struct):
+    _endianess = Endianess.LittleEndian
+    a = FieldType.WORD
+    b = FieldType.SignedDWORD
+
+
+class CountingRaw(io.RawIOBase):
+    """
+    A raw file returning at most max_chunk bytes per readinto()
+    """
+
+    def __init__(self, buff, max_chunk):
+        self._stream = io.BytesIO(buff)
+        self._max_chunk = max_chunk
+        self.calls = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        self.calls += 1
+        data = self._stream.read(min(len(b), self._max_chunk))
+        b[:len(data)] = data
+        return len(data)
+
+
+class FileStreamTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = [Header(magic=index, version=2, flags=[3, 4], name='ab', length=index % 4,
+                               data=b'x' * (index % 4), crc=5, tag='t') for index in range(50)]
+        self.headers_buff = b''.join(obj.pack() for obj in self.headers)
+        self.samples = [Sample(a=index, b=-index) for index in range(1000)]
+        self.samples_buff = b''.join(obj.pack() for obj in self.samples)
+
+    def test_unpack_file(self):
+        self.assertEqual(Header.unpack(io.BufferedReader(CountingRaw(self.headers_buff, 7))), self.headers[0])
+        f = io.BytesIO(self.headers_buff)
+        self.assertEqual([Header.unpack(f) for _ in range(3)], self.headers[:3])
+        # Unpacking doesn't read ahead of the struct
+        self.assertEqual(f.tell(), sum(len(obj.pack()) for obj in self.headers[:3]))
+
+    def test_iter_file_variable_length(self):
+        for block_size in (1, 5, 64, 65536):
+            raw = CountingRaw(self.headers_buff, 100)
+            self.assertEqual(list(Header.iter_file(raw, block_size)), self.headers)
+
+    def test_iter_file_fixed_length(self):
+        for block_size in (1, 6, 100, 65536):
+            raw = CountingRaw(self.samples_buff, 1000)
+            self.assertEqual(list(Sample.iter_file(raw, block_size)), self.samples)
+
+    def test_iter_file_block_reads(self):
+        raw = CountingRaw(self.samples_buff, len(self.samples_buff))
+        self.assertEqual(list(Sample.iter_file(raw, 600)), self.samples)
+        # One read per block, and one more to find the end of the file
+        self.assertEqual(raw.calls, len(self.samples_buff) // 600 + 1)
+
+    def test_iter_file_truncated(self):
+        for cls, buff in ((Header, self.headers_buff), (Sample, self.samples_buff)):
+            unpacked = []
+            with self.assertRaises(struct.error):
+                for obj in cls.iter_file(io.BytesIO(buff[:-1])):
+                    unpacked.append(obj)
+            self.assertEqual(len(unpacked), 49 if cls is Header else 999)
+
+    def test_reused_buffer(self):
+        stream = FileStream(io.BytesIO(b'abcdefgh'), read_ahead=True, block_size=4)
+        self.assertEqual(bytes(stream.read(3)), b'abc')
+        self.assertEqual(bytes(stream.read(3)), b'def')
+        self.assertEqual(bytes(stream.read(3)), b'gh')
+        self.assertTrue(stream.at_eof())
+
+
+if __name__ == '__main__':
+    unittest.main()
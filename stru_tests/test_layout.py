@@ -0,0 +1,64 @@
+from stru import Struct, Endianess, FieldType, FieldLayout, RelativeOffset
+from stru.enhanced_struct import MissingEndianessException
+
+import struct
+import unittest
+
+
+class Record(Struct):
+    _endianess = Endianess.LittleEndian
+    kind = FieldType.BYTE
+    length = FieldType.WORD
+    data = FieldType.Buffer(length)
+    crc = FieldType.DWORD
+    name = FieldType.String[3]
+    body = FieldType.Union(kind, {1: FieldType.BYTE, 2: FieldType.WORD})
+    tail = FieldType.BYTE
+
+
+class Fixed(Struct):
+    _endianess = Endianess.BigEndian
+    a = FieldType.WORD
+    b = FieldType.Struct(Record)
+    c = FieldType.DWORD[2]
+
+
+class LayoutTest(unittest.TestCase):
+    def test_layout(self):
+        self.assertEqual(Record.layout(), (
+            FieldLayout('kind', Record.kind, 0, 1, '<B'),
+            FieldLayout('length', Record.length, 1, 2, '<H'),
+            FieldLayout('data', Record.data, 3, None, None),
+            FieldLayout('crc', Record.crc, RelativeOffset('data', 0), 4, '<L'),
+            FieldLayout('name', Record.name, RelativeOffset('data', 4), 3, '<3s'),
+            FieldLayout('body', Record.body, RelativeOffset('data', 7), None, None),
+            FieldLayout('tail', Record.tail, RelativeOffset('body', 0), 1, '<B'),
+        ))
+
+    def test_computed_once(self):
+        self.assertIs(Record.layout(), Record.layout())
+        self.assertIsInstance(Record.layout(), tuple)
+
+    def test_read_field(self):
+        obj = Record(kind=2, length=3, data=b'abc', crc=7, name='xy', body=5, tail=1)
+        buff = obj.pack()
+        length = Record.layout()[1]
+        self.assertEqual(struct.unpack_from(length.format, buff, length.offset), (3,))
+
+        crc = Record.layout()[3]
+        crc_offset = Record.view(buff).offset_of('data') + 3 + crc.offset.delta
+        self.assertEqual(struct.unpack_from(crc.format, buff, crc_offset), (7,))
+
+    def test_non_primitive_format(self):
+        b = Fixed.layout()[1]
+        self.assertEqual((b.offset, b.size, b.format), (2, None, None))
+        self.assertEqual(Fixed.layout()[2].offset, RelativeOffset('b', 0))
+        self.assertEqual(Fixed.layout()[2].format, '>2L')
+
+    def test_missing_endianess(self):
+        with self.assertRaises(MissingEndianessException):
+            Struct.layout()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+from stru import Struct, Endianess, FieldType, UnsupportedOperationException
+
+import unittest
+
+
+class Fixed(Struct):
+    _endianess = Endianess.LittleEndian
+    a = FieldType.BYTE
+    b = FieldType.DWORD
+
+
+class Framed(Struct):
+    _endianess = Endianess.LittleEndian
+    kind = FieldType.BYTE
+    length = FieldType.WORD
+    body = FieldType.Union(kind, {
+        1: FieldType.WORD,
+        2: FieldType.Struct(Fixed),
+    })
+    data = FieldType.Buffer(length)
+
+
+class SlottedFramed(Framed):
+    _slots = True
+
+
+class Embedding(Struct):
+    _endianess = Endianess.LittleEndian
+    a = FieldType.BYTE
+    inner = FieldType.Struct(Framed)
+
+
+class Selecting(Struct):
+    _endianess = Endianess.LittleEndian
+    kind = FieldType.BYTE
+    value = FieldType.Union(kind, {
+        1: FieldType.BYTE,
+        2: FieldType.Struct(Framed),
+    })
+
+
+class LengthsTest(unittest.TestCase):
+    def test_static_length(self):
+        self.assertEqual(Fixed._length, 5)
+        self.assertEqual(len(Fixed), 5)
+        self.assertEqual(len(Fixed(a=1, b=2)), 5)
+
+    def test_variable_class_length(self):
+        self.assertIsNone(Framed._length)
+        with self.assertRaises(UnsupportedOperationException):
+            len(Framed)
+
+    def test_length_dependencies(self):
+        self.assertEqual(Framed._length_dependencies, frozenset(['kind', 'length']))
+        self.assertEqual(Fixed._length_dependencies, frozenset())
+        self.assertIsNone(Embedding._length_dependencies)
+
+    def test_cache_invalidation(self):
+        for cls in (Framed, SlottedFramed):
+            obj = cls(kind=1, length=3, body=7, data=b'abc')
+            self.assertEqual(len(obj), 8)
+            self.assertEqual(len(obj), len(obj.pack()))
+
+            obj.length = 5
+            self.assertEqual(len(obj), 10)
+            obj.kind = 2
+            obj.body = Fixed(a=1, b=2)
+            self.assertEqual(len(obj), 13)
+            self.assertEqual(len(obj), len(obj.pack()))
+
+            # Fields the length doesn't depend on keep the cached length
+            obj.data = b'a'
+            self.assertEqual(len(obj), 13)
+
+            del obj.length
+            obj.length = 0
+            self.assertEqual(len(obj), 8)
+
+    def test_unpacked_length(self):
+        obj = Framed.unpack(b'\x01\x02\x00\x07\x00ab')
+        self.assertEqual(len(obj), 7)
+        obj.length = 1
+        self.assertEqual(len(obj), 6)
+
+    def test_embedded_variable_length(self):
+        inner = Framed(kind=1, length=2, body=7, data=b'ab')
+        obj = Embedding(a=1, inner=inner)
+        self.assertEqual(len(obj), 8)
+        # The length isn't cached, so it follows changes to the embedded struct
+        inner.length = 4
+        self.assertEqual(len(obj), 10)
+        self.assertEqual(len(obj), len(obj.pack()))
+
+    def test_union_variable_length_option(self):
+        obj = Selecting(kind=2, value=Framed(kind=1, length=2, body=7, data=b'ab'))
+        self.assertEqual(len(obj), 8)
+        self.assertEqual(len(obj), len(obj.pack()))
+        obj.kind = 1
+        obj.value = 3
+        self.assertEqual(len(obj), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+from stru import Struct, Endianess, FieldType, UnsupportedOperationException
+import stru
+from stru_tests.test_bulk_unpack import Sample, Nested, Variable
+from stru_tests.test_embedded_structs import Inner1
+from stru_tests.test_supported_types import GiantStruct
+
+import gc
+import os
+import subprocess
+import sys
+import unittest
+import weakref
+from unittest import mock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Padded(Struct):
+    _endianess = Endianess.Network
+    a = FieldType.DWORD
+    pad = FieldType.PadByte
+    chars = FieldType.Char[2]
+    b = FieldType.SignedWORD[2]
+
+
+class Nulls(Struct):
+    _endianess = Endianess.LittleEndian
+    char = FieldType.Char
+    chars = FieldType.Char[2]
+    raw_chars = FieldType.Char[2](raw=True)
+    raw_name = FieldType.String[4](raw=True)
+    name = FieldType.String[4]
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class NumpyTests(unittest.TestCase):
+    def test_dtype(self):
+        dtype = Padded.numpy_dtype()
+        self.assertEqual(dtype.itemsize, len(Padded))
+        self.assertEqual(dtype.names, ('a', 'chars', 'b'))
+        self.assertEqual(dtype.fields['a'], (numpy.dtype('>u4'), 0))
+        self.assertEqual(dtype.fields['chars'], (numpy.dtype(('S1', (2,))), 5))
+        self.assertEqual(dtype.fields['b'], (numpy.dtype(('>i2', (2,))), 7))
+
+    def test_embedded_dtype(self):
+        self.assertEqual(Nested.numpy_dtype().fields['inner'], (Inner1.numpy_dtype(), 2))
+        self.assertEqual(Inner1.numpy_dtype().fields['a'][0], numpy.dtype('>i4'))
+
+    def test_unpack_array(self):
+        samples = [Sample(timestamp=i, channel=i % 4, flags=[True, False, i % 2 == 0], value=i / 2,
+                          label='s{}'.format(i)) for i in range(10)]
+        array = Sample.unpack_array(b''.join(sample.pack() for sample in samples))
+        self.assertEqual(array.shape, (10,))
+        self.assertEqual(array['timestamp'].tolist(), list(range(10)))
+        self.assertEqual(array['value'].sum(), sum(i / 2 for i in range(10)))
+        self.assertEqual(Sample.from_numpy(array), samples)
+        self.assertEqual(Sample.from_numpy(array[3]), samples[3])
+
+    def test_round_trip(self):
+        objects = [Padded(a=1, chars=['a', 'b'], b=[-1, 2]), Padded(a=3, chars=['c', 'd'], b=[4, -5])]
+        self.assertEqual(Padded.from_numpy(Padded.unpack_array(b''.join(obj.pack() for obj in objects))), objects)
+
+        nested = [Nested(a=i, inner=Inner1(a=-i, b=True)) for i in range(3)]
+        self.assertEqual(Nested.from_numpy(Nested.unpack_array(b''.join(obj.pack() for obj in nested))), nested)
+
+    def test_nulls(self):
+        # NumPy strips trailing nulls from bytes, while the fields keep them
+        data = b'\x00' b'a\x00' b'\x00\x00' b'a\x00\x00\x00' b'b\x00\x00\x00'
+        obj = Nulls.unpack(data)
+        self.assertEqual(obj.char, '\x00')
+        self.assertEqual(obj.raw_chars, [b'\x00', b'\x00'])
+        self.assertEqual(obj.raw_name, b'a')
+        self.assertEqual(Nulls.from_numpy(Nulls.unpack_array(data)[0]), obj)
+        self.assertEqual(Nulls.from_numpy(Nulls.unpack_array(data * 2)), [obj, obj])
+
+    def test_dtype_class_collected(self):
+        class Temporary(Struct):
+            _endianess = Endianess.BigEndian
+            a = FieldType.BYTE
+
+        self.assertIs(Temporary.numpy_dtype(), Temporary.numpy_dtype())
+        reference = weakref.ref(Temporary)
+        del Temporary
+        gc.collect()
+        self.assertIsNone(reference())
+
+    def test_all_types(self):
+        dtype = GiantStruct.numpy_dtype()
+        self.assertEqual(dtype.itemsize, len(GiantStruct))
+        self.assertEqual(dtype.fields['flt'][0], numpy.dtype('<f4'))
+        self.assertEqual(dtype.fields['lon'][0], numpy.dtype('<i4'))
+
+    def test_variable_length(self):
+        with self.assertRaises(UnsupportedOperationException):
+            Variable.numpy_dtype()
+
+
+class MissingNumpyTests(unittest.TestCase):
+    def test_lazy_import(self):
+        code = 'import sys, stru; assert "numpy" not in sys.modules'
+        subprocess.check_call([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(stru.__file__)))
+
+    def test_import_error(self):
+        # A None entry in sys.modules makes importing NumPy raise ImportError
+        with mock.patch.dict(sys.modules, {'numpy': None}):
+            with self.assertRaises(ImportError):
+                Sample.unpack_array(b'')
+            with self.assertRaises(ImportError):
+                Sample.unpack_columns(b'', use_numpy=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
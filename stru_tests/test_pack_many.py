@@ -0,0 +1,46 @@
+from stru import Struct
+from stru_tests.test_codegen import Checksummed, Outer
+from stru_tests.test_field_runs import Header, NativeHeader
+from stru_tests.test_file_stream import Sample
+
+import unittest
+
+
+class PackManyTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = [Header(magic=index, version=2, flags=[3, 4], name='ab', length=index % 5,
+                               data=b'x' * (index % 5), crc=5, tag='t') for index in range(20)]
+        self.samples = [Sample(a=index, b=-index) for index in range(20)]
+
+    def test_fixed_length(self):
+        buffer = Sample.pack_many(self.samples)
+        self.assertIsInstance(buffer, bytearray)
+        self.assertEqual(buffer, b''.join(obj.pack() for obj in self.samples))
+
+    def test_variable_length(self):
+        self.assertEqual(Header.pack_many(iter(self.headers)), b''.join(obj.pack() for obj in self.headers))
+
+    def test_heterogeneous(self):
+        structs = [obj for pair in zip(self.headers, self.samples) for obj in pair]
+        self.assertEqual(Struct.pack_many(structs), b''.join(obj.pack() for obj in structs))
+
+    def test_explicit_pack(self):
+        structs = [Checksummed(a=1), self.samples[1], Outer(inner=Checksummed(a=2), b=3), Checksummed(a=4)]
+        self.assertEqual(Struct.pack_many(structs), b''.join(obj.pack() for obj in structs))
+        self.assertEqual(Outer.pack_many([structs[2]]), b'\x00\x02\xff\x03')
+        self.assertEqual(Checksummed.pack_many([Checksummed(a=1)]), b'\x00\x01\xff')
+
+    def test_native(self):
+        obj = NativeHeader(a=1, b=2)
+        self.assertEqual(NativeHeader.pack_many([obj, obj]), obj.pack() * 2)
+
+    def test_empty(self):
+        self.assertEqual(Header.pack_many([]), b'')
+
+    def test_wrong_class(self):
+        with self.assertRaises(TypeError):
+            Header.pack_many([self.samples[0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+from stru.parallel import chunk_boundaries
+from stru_tests.test_buffers import ZeroCopy
+from stru_tests.test_field_runs import Header
+from stru_tests.test_file_stream import Sample
+
+import os
+import struct
+import tempfile
+import unittest
+
+
+class ParallelUnpackTests(unittest.TestCase):
+    def setUp(self):
+        self.headers = [Header(magic=index, version=2, flags=[3, 4], name='ab', length=index % 5,
+                               data=b'x' * (index % 5), crc=5, tag='t') for index in range(200)]
+        self.samples = [Sample(a=index, b=-index) for index in range(1000)]
+
+    def _write(self, records):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b''.join(record.pack() for record in records))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_fixed_length(self):
+        path = self._write(self.samples)
+        self.assertEqual(Sample.parallel_unpack_file(path, workers=2, chunk_size=1000), self.samples)
+
+    def test_variable_length(self):
+        path = self._write(self.headers)
+        self.assertEqual(Header.parallel_unpack_file(path, workers=2, chunk_size=300), self.headers)
+
+    def test_zero_copy(self):
+        records = [ZeroCopy(length=index % 7, data=b'z' * (index % 7), crc=index % 256) for index in range(300)]
+        path = self._write(records)
+        structs = list(ZeroCopy.parallel_unpack_file(path, workers=2, chunk_size=200))
+        self.assertEqual(structs, records)
+        self.assertTrue(all(isinstance(obj.data, bytes) for obj in structs))
+
+    def test_stream(self):
+        path = self._write(self.headers)
+        structs = Header.parallel_unpack_file(path, workers=2, chunk_size=100, stream=True)
+        self.assertEqual(next(structs), self.headers[0])
+        self.assertEqual(list(structs), self.headers[1:])
+
+    def test_chunk_boundaries(self):
+        path = self._write(self.headers)
+        boundaries = chunk_boundaries(Header, path, 300)
+        self.assertGreater(len(boundaries), 1)
+        self.assertEqual(boundaries[0][0], 0)
+        self.assertEqual(boundaries[-1][1], os.path.getsize(path))
+        for (_, end), (start, _) in zip(boundaries, boundaries[1:]):
+            self.assertEqual(end, start)
+
+        self.assertEqual(chunk_boundaries(Sample, self._write(self.samples), 1000),
+                         [(start, min(start + 996, 6000)) for start in range(0, 6000, 996)])
+
+    def test_empty(self):
+        self.assertEqual(Header.parallel_unpack_file(self._write([])), [])
+
+    def test_truncated(self):
+        path = self._write(self.headers)
+        with open(path, 'ab') as f:
+            f.write(b'\x00')
+        with self.assertRaises(struct.error):
+            Header.parallel_unpack_file(path, workers=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
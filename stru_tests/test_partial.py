@@ -0,0 +1,91 @@
+from stru import Struct, Endianess, FieldType, Validation
+
+import array
+import io
+import struct
+import unittest
+
+
+class Point(Struct):
+    _endianess = Endianess.LittleEndian
+    x = FieldType.BYTE
+    y = FieldType.BYTE
+
+
+class Blob(Struct):
+    _endianess = Endianess.LittleEndian
+    length = FieldType.BYTE
+    data = FieldType.Buffer(length)
+
+
+class Message(Struct):
+    _endianess = Endianess.LittleEndian
+    msg_type = FieldType.BYTE
+    length = FieldType.WORD
+    payload = FieldType.Buffer(length)
+    seq = FieldType.DWORD
+    body = FieldType.Union(msg_type, {1: FieldType.WORD, 2: FieldType.Struct(Point)})
+    blob = FieldType.Struct(Blob)
+    origin = FieldType.Struct(Point)
+
+
+class CountingReader(object):
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+        self.reads = []
+
+    def __call__(self, amount):
+        self.reads.append(amount)
+        return self._data.read(amount)
+
+
+class PartialUnpackTest(unittest.TestCase):
+    def setUp(self):
+        self.obj = Message(msg_type=2, length=5, payload=b'hello', seq=7, body=Point(x=1, y=2),
+                           blob=Blob(length=2, data=b'ab'), origin=Point(x=5, y=6))
+        self.buff = self.obj.pack()
+
+    def test_buffer(self):
+        for buff in (self.buff, bytearray(self.buff), memoryview(self.buff), array.array('B', self.buff)):
+            obj = Message.unpack(buff, fields=['msg_type', 'seq'])
+            self.assertEqual((obj.msg_type, obj.seq), (2, 7))
+            self.assertIsNone(obj.payload)
+            self.assertIsNone(obj.origin)
+
+    def test_dependencies(self):
+        obj = Message.unpack(self.buff, fields=['payload', 'body'])
+        self.assertEqual((obj.msg_type, obj.length, obj.payload, obj.body), (2, 5, b'hello', Point(x=1, y=2)))
+        self.assertIsNone(obj.seq)
+
+    def test_embedded(self):
+        obj = Message.unpack(self.buff, fields=['origin'])
+        self.assertEqual(obj.origin, Point(x=5, y=6))
+
+    def test_all_fields(self):
+        self.assertEqual(Message.unpack(self.buff, fields=list(Message._fields_by_name)), self.obj)
+
+    def test_stream(self):
+        reader = CountingReader(self.buff + b'next')
+        obj = Message.unpack(reader, fields=['seq', 'origin'])
+        self.assertEqual((obj.msg_type, obj.seq, obj.origin), (None, 7, Point(x=5, y=6)))
+        self.assertIsNone(obj.blob)
+        # The payload is skipped over in a single read, and the stream is left at the end of the struct
+        self.assertIn(5, reader.reads)
+        self.assertEqual(reader(4), b'next')
+
+    def test_short_stream(self):
+        with self.assertRaises(struct.error):
+            Message.unpack(CountingReader(self.buff[:5]), fields=['seq'])
+
+    def test_unknown_field(self):
+        with self.assertRaises(AttributeError):
+            Message.unpack(self.buff, fields=['nothing'])
+
+    def test_validation(self):
+        buff = Point(x=1, y=2).pack()
+        self.assertEqual(Point.unpack(buff, fields=['x'], validation=Validation.Trusted).x, 1)
+        self.assertEqual(Point.unpack(buff, fields=['x']).x, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
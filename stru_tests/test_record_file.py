@@ -0,0 +1,212 @@
+from stru import Struct, Endianess, FieldType, RecordFile, IndexedRecordFile
+from stru.field import UnsupportedOperationException
+from stru import record_file
+from stru.record_file import INDEX_HEADER, INDEX_SUFFIX
+from stru_tests.test_buffers import ZeroCopy
+from stru_tests.test_bulk_unpack import Variable
+from stru_tests.test_field_runs import Header
+
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+
+class Record(Struct):
+    _endianess = Endianess.BigEndian
+    index = FieldType.DWORD
+    value = FieldType.SignedWORD
+    tag = FieldType.String[2]
+
+
+class RecordFileTests(unittest.TestCase):
+    def setUp(self):
+        self.records = [Record(index=index, value=-index, tag='t') for index in range(100)]
+        self.path = self._write(b''.join(record.pack() for record in self.records))
+
+    def _write(self, data):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_indexing(self):
+        with RecordFile(Record, self.path) as records:
+            self.assertEqual(len(records), 100)
+            self.assertEqual(records[0], self.records[0])
+            self.assertEqual(records[57], self.records[57])
+            self.assertEqual(records[-1], self.records[-1])
+            for index in (100, -101):
+                with self.assertRaises(IndexError):
+                    records[index]
+
+    def test_slicing(self):
+        with RecordFile(Record, self.path) as records:
+            self.assertEqual(records[10:20], self.records[10:20])
+            self.assertEqual(records[-5:], self.records[-5:])
+            self.assertEqual(records[::7], self.records[::7])
+            self.assertEqual(records[20:10], [])
+
+    def test_iteration(self):
+        with RecordFile(Record, self.path) as records:
+            self.assertEqual(list(records), self.records)
+
+    def test_view(self):
+        with RecordFile(Record, self.path) as records:
+            view = records.view(-2)
+            self.assertEqual(view.index, 98)
+            self.assertEqual(view.to_struct(), self.records[98])
+            del view
+
+    def test_empty(self):
+        with RecordFile(Record, self._write(b'')) as records:
+            self.assertEqual(len(records), 0)
+            self.assertEqual(list(records), [])
+            self.assertEqual(records[:], [])
+
+    def test_invalid_size(self):
+        with self.assertRaises(struct.error):
+            RecordFile(Record, self._write(b'\x00' * 9))
+
+    def test_close_while_iterating(self):
+        records = RecordFile(Record, self.path)
+        # Records are unpacked a block at a time, so the records of the current block are still given after closing
+        with mock.patch.object(record_file, 'ITER_BLOCK_SIZE', 1):
+            iterator = iter(records)
+            self.assertEqual(next(iterator), self.records[0])
+        view = records.view(1)
+        records.close()
+        with self.assertRaises(ValueError):
+            next(iterator)
+        with self.assertRaises(ValueError):
+            records[0]
+        with self.assertRaises(ValueError):
+            view.index
+
+    def test_variable_length(self):
+        with self.assertRaises(UnsupportedOperationException):
+            RecordFile(Variable, self.path)
+
+
+class IndexedRecordFileTests(unittest.TestCase):
+    def setUp(self):
+        self.records = [Header(magic=index, version=2, flags=[3, 4], name='ab', length=index % 5,
+                               data=b'x' * (index % 5), crc=5, tag='t') for index in range(100)]
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.addCleanup(lambda: os.path.exists(self.path + INDEX_SUFFIX) and os.remove(self.path + INDEX_SUFFIX))
+
+    def _append(self, data):
+        with open(self.path, 'ab') as f:
+            f.write(data)
+
+    def _pack(self, records):
+        return b''.join(record.pack() for record in records)
+
+    def test_indexing(self):
+        self._append(self._pack(self.records))
+        with IndexedRecordFile(Header, self.path) as records:
+            self.assertEqual(len(records), 100)
+            self.assertEqual(records[0], self.records[0])
+            self.assertEqual(records[-1], self.records[-1])
+            self.assertEqual(records[10:20:3], self.records[10:20:3])
+            self.assertEqual(list(records), self.records)
+            self.assertEqual(records.view(42).magic, 42)
+            with self.assertRaises(IndexError):
+                records[100]
+
+    def test_index_persisted(self):
+        self._append(self._pack(self.records))
+        IndexedRecordFile(Header, self.path).close()
+        self.assertEqual(os.path.getsize(self.path + INDEX_SUFFIX), INDEX_HEADER.size + 100 * 8)
+        with IndexedRecordFile(Header, self.path) as records:
+            self.assertEqual(records[57], self.records[57])
+
+    def test_incremental(self):
+        self._append(self._pack(self.records[:60]))
+        with IndexedRecordFile(Header, self.path) as records:
+            self.assertEqual(len(records), 60)
+            # A partially written record is left out until it's complete
+            rest = self._pack(self.records[60:])
+            self._append(rest[:30])
+            records.refresh()
+            self.assertEqual(len(records), 61)
+            self._append(rest[30:])
+            records.refresh()
+            self.assertEqual(list(records), self.records)
+        with IndexedRecordFile(Header, self.path) as records:
+            self.assertEqual(list(records), self.records)
+
+    def test_truncated_file(self):
+        self._append(self._pack(self.records))
+        IndexedRecordFile(Header, self.path).close()
+        with open(self.path, 'wb') as f:
+            f.write(self._pack(self.records[:3]))
+        with IndexedRecordFile(Header, self.path) as records:
+            self.assertEqual(list(records), self.records[:3])
+        self.assertEqual(os.path.getsize(self.path + INDEX_SUFFIX), INDEX_HEADER.size + 3 * 8)
+
+    def test_rewritten_file(self):
+        self._append(self._pack(self.records))
+        IndexedRecordFile(Header, self.path).close()
+        # The same size, but different records
+        rewritten = [Header(magic=index, version=2, flags=[3, 4], name='ab', length=(index + 1) % 5,
+                            data=b'y' * ((index + 1) % 5), crc=5, tag='t') for index in range(100)]
+        with open(self.path, 'wb') as f:
+            f.write(self._pack(rewritten))
+        with IndexedRecordFile(Header, self.path) as records:
+            self.assertEqual(list(records), rewritten)
+
+    def test_corrupt_index(self):
+        self._append(self._pack(self.records))
+        for corrupt in (b'\x01\x02\x03', b'\x00' * (INDEX_HEADER.size + 8), b'x' * 808):
+            with open(self.path + INDEX_SUFFIX, 'wb') as f:
+                f.write(corrupt)
+            with IndexedRecordFile(Header, self.path) as records:
+                self.assertEqual(list(records), self.records)
+        with IndexedRecordFile(Header, self.path) as records:
+            self.assertEqual(records[99], self.records[99])
+
+    def test_torn_index(self):
+        self._append(self._pack(self.records))
+        IndexedRecordFile(Header, self.path).close()
+        with open(self.path + INDEX_SUFFIX, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path + INDEX_SUFFIX) - 3)
+        with IndexedRecordFile(Header, self.path) as records:
+            self.assertEqual(list(records), self.records)
+
+    def test_close_with_zero_copy_buffers(self):
+        records = [ZeroCopy(length=index % 4, data=b'z' * (index % 4), crc=index) for index in range(10)]
+        self._append(self._pack(records))
+        with IndexedRecordFile(ZeroCopy, self.path) as indexed:
+            data = indexed[3].data
+            self.assertIsInstance(data, memoryview)
+        # The buffer outlives the closed file
+        self.assertEqual(data, b'zzz')
+        data.release()
+
+    def test_close_while_iterating(self):
+        self._append(self._pack(self.records[:5]))
+        records = IndexedRecordFile(Header, self.path)
+        iterator = iter(records)
+        self.assertEqual(next(iterator), self.records[0])
+        records.close()
+        with self.assertRaises(ValueError):
+            next(iterator)
+        with self.assertRaises(ValueError):
+            list(records)
+
+    def test_custom_index_path(self):
+        self._append(self._pack(self.records[:5]))
+        index_path = self.path + '.offsets'
+        self.addCleanup(os.remove, index_path)
+        with IndexedRecordFile(Header, self.path, index_path=index_path) as records:
+            self.assertEqual(list(records), self.records[:5])
+        self.assertTrue(os.path.exists(index_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
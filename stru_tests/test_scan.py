@@ -0,0 +1,67 @@
+from stru import Struct, Endianess, FieldType, Validation
+from stru.struct_view import StructView
+
+import struct
+import unittest
+
+
+class Reading(Struct):
+    _endianess = Endianess.LittleEndian
+    device_id = FieldType.WORD
+    value = FieldType.SignedDWORD
+    unit = FieldType.String[3]
+
+
+class Packet(Struct):
+    _endianess = Endianess.LittleEndian
+    length = FieldType.BYTE
+    data = FieldType.Buffer(length)
+    device_id = FieldType.WORD
+
+
+class ScanTest(unittest.TestCase):
+    def setUp(self):
+        self.readings = [Reading(device_id=i % 3, value=i, unit='C') for i in range(9)]
+        self.buff = Struct.pack_many(self.readings)
+
+    def test_where_dict(self):
+        self.assertEqual(list(Reading.scan(self.buff, {'device_id': 1})), self.readings[1::3])
+        self.assertEqual(list(Reading.scan(self.buff, {'device_id': 2, 'value': 5})), [self.readings[5]])
+        self.assertEqual(list(Reading.scan(self.buff, {'unit': 'F'})), [])
+
+    def test_where_callable(self):
+        matches = list(Reading.scan(self.buff, lambda view: view.value >= 7))
+        self.assertEqual(matches, self.readings[7:])
+
+    def test_views(self):
+        matches = list(Reading.scan(self.buff, {'device_id': 0}, views=True))
+        self.assertTrue(all(isinstance(view, StructView) for view in matches))
+        self.assertEqual([view.to_struct() for view in matches], self.readings[::3])
+
+    def test_variable_length(self):
+        packets = [Packet(length=i, data=b'x' * i, device_id=i % 2) for i in range(5)]
+        buff = Struct.pack_many(packets)
+        self.assertEqual(list(Packet.scan(buff, {'device_id': 1})), packets[1::2])
+        self.assertEqual(list(Packet.scan(buff, lambda view: view.length > 2)), packets[3:])
+        with self.assertRaises(struct.error):
+            list(Packet.scan(buff[:-1], {'device_id': 1}))
+
+    def test_offset(self):
+        buff = b'\xff' + self.buff
+        self.assertEqual(list(Reading.scan(buff, {'device_id': 1}, 1)), self.readings[1::3])
+
+    def test_invalid_buffer(self):
+        with self.assertRaises(struct.error):
+            Reading.scan(self.buff[:-1], {'device_id': 1})
+
+    def test_unknown_field(self):
+        with self.assertRaises(AttributeError):
+            Reading.scan(self.buff, {'nothing': 1})
+
+    def test_validation(self):
+        buff = b'\x01\x00\x00\x00\x00\x80abc'
+        self.assertEqual(next(Reading.scan(buff, {'device_id': 1}, validation=Validation.Trusted)).value, -2 ** 31)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+from stru import Struct, Endianess, FieldType
+from stru.meta_struct import SlottedMetaStruct
+from stru_tests.struct_test_case import StructTestCase, const
+
+import copy
+import gc
+import pickle
+import tracemalloc
+import unittest
+
+
+class Base(Struct):
+    _endianess = Endianess.LittleEndian
+    _slots = True
+    a = FieldType.WORD
+    b = FieldType.String[4](default='ab')
+
+
+class Derived(Base):
+    c = FieldType.SignedDWORD
+    length = FieldType.BYTE
+    data = FieldType.Buffer(length)
+
+
+class Unslotted(Struct):
+    _endianess = Endianess.LittleEndian
+    a = FieldType.WORD
+    b = FieldType.String[4](default='ab')
+    c = FieldType.SignedDWORD
+
+
+class Slotted(Struct):
+    _endianess = Endianess.LittleEndian
+    _slots = True
+    a = FieldType.WORD
+    b = FieldType.String[4](default='ab')
+    c = FieldType.SignedDWORD
+
+
+class SlottedUnslotted(Unslotted):
+    _slots = True
+    d = FieldType.BYTE
+
+
+class SplitBase(Struct):
+    _endianess = Endianess.LittleEndian
+    _slots = True
+    length = FieldType.WORD
+
+
+class SplitDerived(SplitBase):
+    data = FieldType.Buffer(SplitBase.length)
+
+
+class SlotsTest(StructTestCase, unittest.TestCase):
+    def create_target(self):
+        obj = Derived(a=1, c=-2, length=2, data=b'xy')
+        buff = b'\x01\x00' b'ab\x00\x00' b'\xfe\xff\xff\xff' b'\x02' b'xy'
+        return obj, buff
+
+    def get_fields(self):
+        return [(Derived.a, const.WORD),
+                (Derived.c, const.SignedDWORD)]
+
+    def test_lengths(self):
+        self.assertEqual(len(Derived.b), 4)
+        self.assertEqual(len(self.obj), len(self.buff))
+
+    def test_slots(self):
+        self.assertIsInstance(Base, SlottedMetaStruct)
+        self.assertFalse(hasattr(self.obj, '__dict__'))
+        self.assertEqual(Base.__slots__, ('a', 'b'))
+        self.assertEqual(Derived.__slots__, ('c', 'length', 'data'))
+        with self.assertRaises(AttributeError):
+            self.obj.not_a_field = 5
+
+    def test_class_field_access(self):
+        self.assertIs(Derived.a, Base.a)
+        self.assertIs(Derived.data, Derived._fields_by_name['data'])
+        self.assertTrue(issubclass(type(Derived), type(Base)))
+        # Class attribute lookups aren't intercepted, only the fields have properties on the metaclass
+        self.assertNotIn('__getattribute__', vars(SlottedMetaStruct))
+        self.assertIsInstance(vars(type(Derived))['c'], property)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            self.obj.a = const.WORD.UPPER_LIMIT
+        with self.assertRaises(ValueError):
+            self.obj.data = b'xyz'
+        del self.obj.c
+        self.assertIsNone(self.obj.c)
+
+    def test_slotted_unslotted(self):
+        obj = SlottedUnslotted(a=1, c=2, d=3)
+        self.assertEqual(SlottedUnslotted.unpack(obj.pack()), obj)
+        self.assertIs(SlottedUnslotted.a, Unslotted.a)
+
+    def test_pickle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.obj)), self.obj)
+
+    def test_copy_dependency_in_base(self):
+        # The slots of the derived class are restored first, yet the buffer depends on the length of the base class
+        obj = SplitDerived(length=2, data=b'AB')
+        self.assertEqual(pickle.loads(pickle.dumps(obj)), obj)
+        self.assertEqual(copy.copy(obj), obj)
+        self.assertEqual(copy.deepcopy(obj), obj)
+        self.assertEqual(len(copy.copy(obj)), 4)
+
+    def test_memory(self):
+        def measure(cls):
+            gc.collect()
+            tracemalloc.start()
+            objects = [cls(a=i, c=i) for i in range(1000)]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del objects
+            return size
+
+        slotted_size = measure(Slotted)
+        unslotted_size = measure(Unslotted)
+        self.assertLess(slotted_size, unslotted_size * 0.8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+from stru import Struct, Endianess, FieldType
+from stru_tests.test_field_runs import Header
+
+import asyncio
+import unittest
+
+
+class Versioned(Struct):
+    _endianess = Endianess.BigEndian
+    version = FieldType.BYTE
+    data = FieldType.Union(version, {
+        1: FieldType.WORD,
+        2: FieldType.Struct(Header),
+    })
+
+
+class RecordingReader(object):
+    def __init__(self, buff):
+        self._buff = buff
+        self.amounts = []
+
+    async def readexactly(self, amount):
+        self.amounts.append(amount)
+        data, self._buff = self._buff[:amount], self._buff[amount:]
+        if len(data) < amount:
+            raise asyncio.IncompleteReadError(data, amount)
+        return data
+
+
+class UnpackAsyncTests(unittest.TestCase):
+    def setUp(self):
+        self.header = Header(magic=1, version=2, flags=[3, 4], name='ab', length=2, data=b'xy', crc=5, tag='t')
+
+    def test_reads_per_run(self):
+        buff = self.header.pack()
+        reader = RecordingReader(buff)
+        self.assertEqual(asyncio.run(Header.unpack_async(reader)), self.header)
+        # One read per primitive run, and one for the buffer
+        self.assertEqual(reader.amounts, [len(Header._runs[0]), 2, len(Header._runs[2])])
+
+    def test_union_of_struct(self):
+        obj = Versioned(version=2, data=self.header)
+        self.assertEqual(asyncio.run(Versioned.unpack_async(RecordingReader(obj.pack()))), obj)
+
+    def test_callable(self):
+        reads = []
+
+        async def read(amount, target, param=None):
+            reads.append((target, param))
+            return b'\x01' * amount
+
+        obj = asyncio.run(Versioned.unpack_async(read, 'target', param='param'))
+        self.assertEqual(obj, Versioned(version=1, data=0x0101))
+        self.assertEqual(reads, [('target', 'param')] * 2)
+
+    def test_incomplete(self):
+        with self.assertRaises(asyncio.IncompleteReadError):
+            asyncio.run(Header.unpack_async(RecordingReader(self.header.pack()[:-1])))
+
+    def test_unsupported_stream(self):
+        with self.assertRaises(TypeError):
+            asyncio.run(Header.unpack_async(b'\x00'))
+
+
+if __name__ == '__main__':
+    unittest.main()
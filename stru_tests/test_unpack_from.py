@@ -0,0 +1,38 @@
+from stru import Struct, Endianess, FieldType
+
+import array
+import mmap
+import struct
+import unittest
+
+
+class Record(Struct):
+    _endianess = Endianess.LittleEndian
+    a = FieldType.WORD
+    b = FieldType.WORD
+
+
+class UnpackFromTests(unittest.TestCase):
+    def test_array(self):
+        buffer = array.array('H', [1, 2, 3, 4])
+        self.assertEqual(Record.unpack_from(buffer, 4), (Record(a=3, b=4), 4))
+
+    def test_mmap(self):
+        buffer = mmap.mmap(-1, 8)
+        buffer[:] = b'\x01\x00\x02\x00\x03\x00\x04\x00'
+        self.assertEqual(Record.unpack_from(buffer, 2), (Record(a=2, b=3), 4))
+        buffer.close()
+
+    def test_consecutive(self):
+        buffer = b'\x01\x00\x02\x00\x03\x00\x04\x00'
+        first, size = Record.unpack_from(buffer)
+        second, _ = Record.unpack_from(buffer, size)
+        self.assertEqual([first, second], [Record(a=1, b=2), Record(a=3, b=4)])
+
+    def test_too_short(self):
+        with self.assertRaises(struct.error):
+            Record.unpack_from(b'\x01\x00\x02\x00', 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
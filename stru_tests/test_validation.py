@@ -0,0 +1,116 @@
+from stru import Struct, Endianess, FieldType, Validation
+
+import unittest
+
+
+class Eager(Struct):
+    _endianess = Endianess.LittleEndian
+    a = FieldType.BYTE
+    b = FieldType.SignedWORD
+    inner = FieldType.String[4]
+
+
+class AtPack(Struct):
+    _endianess = Endianess.LittleEndian
+    _validation = Validation.AtPack
+    a = FieldType.BYTE
+    b = FieldType.SignedWORD
+    inner = FieldType.String[4]
+
+
+class Trusted(Struct):
+    _endianess = Endianess.LittleEndian
+    _validation = Validation.Trusted
+    a = FieldType.BYTE
+    b = FieldType.SignedWORD
+    inner = FieldType.String[4]
+
+
+class DerivedAtPack(AtPack):
+    c = FieldType.BYTE
+
+
+class CustomPack(Struct):
+    _endianess = Endianess.LittleEndian
+    _validation = Validation.AtPack
+    a = FieldType.BYTE
+
+    def pack(self):
+        return super(CustomPack, self).pack()
+
+
+class ValidationTest(unittest.TestCase):
+    def test_eager(self):
+        obj = Eager()
+        with self.assertRaises(ValueError):
+            obj.a = 256
+        with self.assertRaises(TypeError):
+            obj.inner = 1
+
+    def test_eager_error_names_field(self):
+        with self.assertRaisesRegex(ValueError, r'Eager\.b'):
+            Eager(b=-2 ** 15 - 1)
+
+    def test_at_pack(self):
+        obj = AtPack(a=256, b=1, inner='ab')
+        self.assertEqual(obj.a, 256)
+        with self.assertRaises(ValueError):
+            obj.pack()
+        with self.assertRaises(ValueError):
+            obj.pack_into(bytearray(7))
+
+        obj.a = 1
+        self.assertEqual(obj.pack(), b'\x01\x01\x00ab\x00\x00')
+
+    def test_at_pack_inherited(self):
+        obj = DerivedAtPack(a=1, b=1, inner='ab', c=256)
+        with self.assertRaises(ValueError):
+            obj.pack()
+
+    def test_at_pack_custom_pack(self):
+        with self.assertRaises(ValueError):
+            CustomPack(a=256).pack()
+
+    def test_trusted(self):
+        obj = Trusted(a=256)
+        with self.assertRaises(ValueError):
+            obj.validate()
+
+    def test_validate(self):
+        Eager(a=1, b=-1, inner='ab').validate()
+        obj = AtPack(a=1, b=2 ** 15, inner='ab')
+        with self.assertRaisesRegex(ValueError, r'AtPack\.b'):
+            obj.validate()
+
+    def test_unknown_attribute(self):
+        for cls in (Eager, AtPack, Trusted):
+            with self.assertRaises(AttributeError):
+                cls().not_a_field = 1
+
+    def test_unpack_trusted(self):
+        buff = b'\x01\xff\xffab\x00\x00'
+        for method in (Eager.unpack, lambda buffer, **kwargs: Eager.unpack_from(buffer, **kwargs)[0]):
+            obj = method(buff, validation=Validation.Trusted)
+            self.assertEqual(obj, Eager(a=1, b=-1, inner='ab'))
+            # Later assignments are still validated by the class' mode
+            with self.assertRaises(ValueError):
+                obj.a = 256
+
+    def test_unpack_eager(self):
+        obj = AtPack.unpack(b'\x01\xff\xffab\x00\x00', validation=Validation.Eager)
+        self.assertEqual(obj, AtPack(a=1, b=-1, inner='ab'))
+
+    def test_bulk_unpack_trusted(self):
+        buff = b'\x01\xff\xffab\x00\x00' b'\x02\x01\x00cd\x00\x00'
+        expected = [Eager(a=1, b=-1, inner='ab'), Eager(a=2, b=1, inner='cd')]
+        self.assertEqual(list(Eager.iter_unpack(buff, validation=Validation.Trusted)), expected)
+        self.assertEqual(Eager.unpack_many(buff, 2, validation=Validation.Trusted), expected)
+
+    def test_precomputed_limits(self):
+        self.assertEqual((Eager.a.min, Eager.a.max), (0, 255))
+        self.assertEqual((Eager.b.min, Eager.b.max), (-2 ** 15, 2 ** 15 - 1))
+        self.assertEqual((Eager.b.lower_limit, Eager.b.upper_limit), (-2 ** 15 - 1, 2 ** 15))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+from stru import Struct, Endianess, FieldType, DependencyInvalidValueException
+from stru.struct_view import StructView
+from stru_tests.test_embedded_structs import VeryEmbedded, EmbeddedStructsTests
+from stru_tests.test_field_runs import Header
+from stru_tests.test_unions import Onion, MyWord
+
+import gc
+import unittest
+import weakref
+
+
+class Message(Struct):
+    _endianess = Endianess.BigEndian
+    msg_type = FieldType.BYTE
+    length = FieldType.WORD
+    payload = FieldType.Buffer(length)
+    seq = FieldType.DWORD
+    inner = FieldType.Struct(MyWord)
+    trailer = FieldType.Union(msg_type, {
+        1: FieldType.WORD,
+        2: FieldType.Struct(Header),
+    })
+    crc = FieldType.WORD
+
+
+class Shadowed(Struct):
+    _endianess = Endianess.BigEndian
+    to_struct = FieldType.BYTE
+    offset_of = FieldType.Buffer(to_struct)
+    struct_class = FieldType.BYTE
+
+
+class ViewsTests(unittest.TestCase):
+    def setUp(self):
+        self.obj = Message(msg_type=1, length=3, payload=b'abc', seq=7, inner=MyWord(a=5), trailer=9, crc=0xABCD)
+        self.buff = b'\xee' + self.obj.pack()
+
+    def test_fields(self):
+        view = Message.view(self.buff, 1)
+        self.assertIsInstance(view, StructView)
+        self.assertEqual(view.msg_type, 1)
+        self.assertEqual(view.crc, 0xABCD)
+        self.assertEqual(view.payload, b'abc')
+        self.assertEqual(view.seq, 7)
+        self.assertEqual(view.trailer, 9)
+        self.assertEqual(view.inner.a, 5)
+        self.assertEqual(len(view), len(self.obj))
+        self.assertEqual(view.to_struct(), self.obj)
+
+    def test_lazy(self):
+        view = Message.view(self.buff, 1)
+        self.assertEqual(view.seq, 7)
+        # Reaching seq requires the payload length, but not the payload itself
+        self.assertEqual(set(view._values), {'length', 'seq'})
+        self.assertEqual(view.offset_of('seq'), 1 + 1 + 2 + 3)
+
+    def test_variable_union(self):
+        header = Header(magic=1, version=2, flags=[3, 4], name='ab', length=2, data=b'xy', crc=5, tag='t')
+        self.obj.msg_type = 2
+        self.obj.trailer = header
+        view = Message.view(self.obj.pack())
+        self.assertEqual(view.crc, 0xABCD)
+        self.assertEqual(view.trailer, header)
+        self.assertEqual(len(view), len(self.obj.pack()))
+
+    def test_nested(self):
+        obj, buff = EmbeddedStructsTests('run').create_target()
+        view = VeryEmbedded.view(buff)
+        self.assertEqual(view.b.b.b.b.b, 'wxyzwxyz')
+        self.assertEqual(view.c, [255, 254, 253, 252])
+        self.assertEqual(view.to_struct(), obj)
+
+    def test_unions(self):
+        obj = Onion(a=1, b=400, c=1, d=MyWord(a=2))
+        view = Onion.view(obj.pack())
+        self.assertEqual(view.d, MyWord(a=2))
+        self.assertEqual(view.c, 1)
+        self.assertEqual(len(view), len(obj))
+
+    def test_read_only(self):
+        view = Message.view(self.buff, 1)
+        with self.assertRaises(AttributeError):
+            view.seq = 5
+        with self.assertRaises(AttributeError):
+            del view.seq
+        with self.assertRaises(AttributeError):
+            _ = view.nonexistent
+
+    def test_item_access(self):
+        view = Message.view(self.buff, 1)
+        self.assertEqual(view['seq'], 7)
+        self.assertEqual(view['inner']['a'], 5)
+        with self.assertRaises(KeyError):
+            _ = view['nonexistent']
+
+    def test_shadowed_fields(self):
+        # Fields named like attributes of the view are reached by item access, including as dependencies
+        view = Shadowed.view(b'\x02ab\x07')
+        self.assertEqual(view['to_struct'], 2)
+        self.assertEqual(view['offset_of'], b'ab')
+        self.assertEqual(view['struct_class'], 7)
+        self.assertIs(view.struct_class, Shadowed)
+        self.assertEqual(view.to_struct(), Shadowed(to_struct=2, offset_of=b'ab', struct_class=7))
+        self.assertEqual(len(view), 4)
+
+    def test_layout_stored_on_class(self):
+        layouts, indices = Message._view_layout
+        self.assertEqual(indices['crc'], len(layouts) - 1)
+        self.assertIsNot(Header._view_layout, Message._view_layout)
+
+    def test_viewed_class_collected(self):
+        class Temporary(Struct):
+            _endianess = Endianess.BigEndian
+            a = FieldType.BYTE
+
+        self.assertEqual(Temporary.view(b'\x01').a, 1)
+        reference = weakref.ref(Temporary)
+        del Temporary
+        gc.collect()
+        self.assertIsNone(reference())
+
+    def test_invalid_dependency(self):
+        class Weird(Struct):
+            _endianess = Endianess.BigEndian
+            length = FieldType.SignedBYTE
+            data = FieldType.Buffer(length)
+            after = FieldType.BYTE
+
+        with self.assertRaises(DependencyInvalidValueException):
+            _ = Weird.view(b'\xff\x01').after
+
+
+if __name__ == '__main__':
+    unittest.main()